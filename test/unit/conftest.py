@@ -0,0 +1,153 @@
+import os
+from collections import Counter
+
+import pytest
+from aioredis.exceptions import DataError
+
+
+class FakeRedis:
+
+    """
+    In-memory redis with the commands used by tracardi. Like redis, it returns values as bytes.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        if value is None:
+            raise DataError("Invalid input of type: 'NoneType'.")
+        return value if isinstance(value, bytes) else str(value).encode()
+
+    def get(self, key):
+        return self.data.get(key, None)
+
+    def mget(self, keys):
+        return [self.data.get(key, None) for key in keys]
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = self._encode(value)
+        return True
+
+    def delete(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def hget(self, key, field):
+        return self.data.get(key, {}).get(field, None)
+
+    def hset(self, key, field, value):
+        self.data.setdefault(key, {})[field] = self._encode(value)
+
+    def hsetnx(self, key, field, value):
+        value = self._encode(value)
+        if field in self.data.get(key, {}):
+            return False
+        self.hset(key, field, value)
+        return True
+
+    def hexists(self, key, field):
+        return field in self.data.get(key, {})
+
+    def hdel(self, key, *fields):
+        return sum(1 for field in fields if self.data.get(key, {}).pop(field, None) is not None)
+
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def sadd(self, key, *values):
+        self.data.setdefault(key, set()).update(self._encode(value) for value in values)
+
+    def rpush(self, key, *values):
+        self.data.setdefault(key, []).extend(self._encode(value) for value in values)
+        return len(self.data[key])
+
+    def blpop(self, key, timeout=0):
+        # Does not block, returns None as if the timeout passed.
+        values = self.data.get(key, None)
+        if not values:
+            return None
+        return key.encode(), values.pop(0)
+
+    def expire(self, key, ttl):
+        return key in self.data
+
+
+class FakePipeline:
+
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.commands.append((getattr(self.redis, name), args, kwargs))
+            return self
+        return command
+
+    async def execute(self):
+        commands, self.commands = self.commands, []
+        return [command(*args, **kwargs) for command, args, kwargs in commands]
+
+
+class FakeAsyncRedis:
+
+    """
+    Async client of FakeRedis, like aioredis. Counts the commands that were called outside of pipelines.
+    """
+
+    def __init__(self, redis: FakeRedis = None):
+        self.redis = FakeRedis() if redis is None else redis
+        self.calls = Counter()
+
+    def __getattr__(self, name):
+        command = getattr(self.redis, name)
+
+        async def call(*args, **kwargs):
+            self.calls[name] += 1
+            return command(*args, **kwargs)
+        return call
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.redis)
+
+
+class FakeAsyncRedisClient:
+
+    """
+    Replaces AsyncRedisClient.
+    """
+
+    def __init__(self):
+        self.client = FakeAsyncRedis()
+
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    return FakeRedis()
+
+
+@pytest.fixture
+def async_redis_client() -> FakeAsyncRedisClient:
+    return FakeAsyncRedisClient()
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: wall-clock benchmark, runs only with BENCHMARK=yes")
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.environ.get('BENCHMARK', 'no') == 'yes':
+        return
+    skip = pytest.mark.skip(reason="Benchmarks run only with BENCHMARK=yes.")
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
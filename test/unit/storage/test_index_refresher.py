@@ -0,0 +1,38 @@
+import asyncio
+
+import tracardi.service.storage.index_refresher as index_refresher
+from tracardi.service.storage.index_refresher import IndexRefresher
+
+
+class StorageMock:
+
+    def __init__(self, index, refreshed):
+        self.index = index
+        self.refreshed = refreshed
+
+    async def refresh(self):
+        self.refreshed.append(self.index)
+
+
+def test_should_refresh_requested_indices_once_per_interval(monkeypatch):
+    refreshed = []
+    monkeypatch.setattr(index_refresher, 'storage_manager', lambda index: StorageMock(index, refreshed))
+
+    async def main():
+        refresher = IndexRefresher()
+        refresher.interval = 0.1
+
+        for _ in range(10):
+            await refresher.refresh('session')
+            await refresher.refresh('profile')
+
+        assert refreshed == []
+        await asyncio.sleep(0.2)
+        assert sorted(refreshed) == ['profile', 'session']
+
+        # Immediate refresh
+        refresher.interval = 0
+        await refresher.refresh('session')
+        assert len(refreshed) == 3
+
+    asyncio.run(main())
@@ -1,21 +1,25 @@
-from time import sleep
+import asyncio
 from uuid import uuid4
 
 from tracardi.service.throttle import Limiter
 
 
 def test_should_limit_calls():
-    limit = 3
-    limiter = Limiter(limit=limit, ttl=10)
-    key = str(uuid4())
-    passes = 0
-    while True:
-        block, ttl = limiter.limit(key)
-
-        if block is False:
-            break
-        passes += 1
-        sleep(0.5)
-
-    assert passes == limit
+
+    async def main():
+        limit = 3
+        limiter = Limiter(limit=limit, ttl=10)
+        key = str(uuid4())
+        passes = 0
+        while True:
+            block, ttl = await limiter.limit(key)
+
+            if block is False:
+                break
+            passes += 1
+            await asyncio.sleep(0.5)
+
+        assert passes == limit
+
+    asyncio.run(main())
 
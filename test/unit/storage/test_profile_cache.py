@@ -0,0 +1,77 @@
+import asyncio
+
+from tracardi.domain.profile import Profile
+from tracardi.domain.storage_record import StorageRecord, RecordMetadata
+from tracardi.service.storage.redis.profile_cache import ProfileCache
+
+
+def _get_cache(redis_client) -> ProfileCache:
+    cache = ProfileCache(ttl=60, local_pool=100, enabled=True)
+    cache._redis = redis_client
+    return cache
+
+
+def _profile(id, ids) -> Profile:
+    profile = Profile(id=id, ids=ids)
+    return profile.set_meta_data(RecordMetadata(id=id, index="profile-index"))
+
+
+def test_should_load_profile_by_any_id(async_redis_client):
+    async def main():
+        cache = _get_cache(async_redis_client)
+        await cache.save([_profile("1", ["1", "2"])])
+
+        for id in ["1", "2"]:
+            record = await cache.load(id)
+            assert record['id'] == "1"
+            assert record.get_meta_data().index == "profile-index"
+
+        assert await cache.load("3") is None
+
+        # Version is cached locally, only the pointer is read from redis.
+        assert cache._redis.client.calls['get'] == 3
+
+    asyncio.run(main())
+
+
+def test_loaded_profile_should_not_replace_saved_one(async_redis_client):
+    async def main():
+        cache = _get_cache(async_redis_client)
+        await cache.save([_profile("1", ["1"])])
+
+        stale_record = StorageRecord(id="1", ids=["1"], traits={"stale": True})
+        stale_record.set_meta_data(RecordMetadata(id="1", index="profile-index"))
+        await cache.save_record(stale_record)
+
+        record = await cache.load("1")
+        assert 'stale' not in record['traits']
+
+    asyncio.run(main())
+
+
+def test_should_keep_merged_profile_when_duplicate_is_deleted(async_redis_client):
+    async def main():
+        cache = _get_cache(async_redis_client)
+        await cache.save([_profile("1", ["1"]), _profile("2", ["2"])])
+
+        # Profile 2 is merged into 1 and deleted.
+        await cache.save([_profile("1", ["1", "2"])])
+        await cache.delete(["2"])
+        assert (await cache.load("2"))['id'] == "1"
+
+        await cache.delete(["1"])
+        assert await cache.load("1") is None
+        assert await cache.load("2") is None
+
+    asyncio.run(main())
+
+
+def test_disabled_cache_should_not_call_redis():
+    async def main():
+        cache = ProfileCache(ttl=60, local_pool=100, enabled=False)
+        cache._redis = None
+        await cache.save([_profile("1", ["1"])])
+        assert await cache.load("1") is None
+        await cache.delete(["1"])
+
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+import asyncio
+
+from tracardi.domain.profile import Profile
+from tracardi.domain.storage_record import StorageRecord, RecordMetadata
+from tracardi.service.storage import index
+from tracardi.service.storage.drivers.elastic import profile as profile_db
+from tracardi.service.storage.redis.profile_directory import ProfileDirectory
+
+
+def _get_directory(redis_client) -> ProfileDirectory:
+    directory = ProfileDirectory(buckets=16, enabled=True)
+    directory._redis = redis_client
+    return directory
+
+
+def _profile(id, ids, profile_index=None) -> Profile:
+    profile = Profile(id=id, ids=ids)
+    if profile_index is not None:
+        profile.set_meta_data(RecordMetadata(id=id, index=profile_index))
+    return profile
+
+
+def test_should_find_index_of_profile_by_any_id(async_redis_client):
+    async def main():
+        directory = _get_directory(async_redis_client)
+        await directory.save([_profile("1", ["1", "2"], "profile-2022-01"), _profile("3", [])])
+
+        assert await directory.load("1") == ("profile-2022-01", "1")
+        assert await directory.load("2") == ("profile-2022-01", "1")
+        assert await directory.load("3") == (index.resources['profile'].get_write_index(), "3")
+        assert await directory.load("4") is None
+
+    asyncio.run(main())
+
+
+def test_should_keep_merged_profile_when_duplicate_is_deleted(async_redis_client):
+    async def main():
+        directory = _get_directory(async_redis_client)
+        await directory.save([_profile("1", ["1"], "profile-2022-01"), _profile("2", ["2"], "profile-2022-02")])
+
+        # Profile 2 is merged into 1 and deleted.
+        await directory.save([_profile("1", ["1", "2"], "profile-2022-01")])
+        await directory.delete(["2"])
+        assert await directory.load("2") == ("profile-2022-01", "1")
+
+        await directory.delete(["1"])
+        assert await directory.load("1") is None
+
+    asyncio.run(main())
+
+
+class FakeStorage:
+
+    def __init__(self, records: dict):
+        self.records = records
+        self.loads = []
+
+    async def load_from_index(self, id, index):
+        self.loads.append((id, index))
+        return self.records.get((id, index), None)
+
+
+def test_should_load_profile_with_get_from_one_index(monkeypatch, async_redis_client):
+    async def main():
+        directory = _get_directory(async_redis_client)
+        await directory.save([_profile("1", ["1", "2"], "profile-2022-01"), _profile("3", [], "profile-2022-02")])
+
+        record = StorageRecord(id="1", ids=["1", "2"])
+        record.set_meta_data(RecordMetadata(id="1", index="profile-2022-01"))
+        storage = FakeStorage({("1", "profile-2022-01"): record})
+
+        monkeypatch.setattr(profile_db, "profile_directory", directory)
+        monkeypatch.setattr(profile_db, "storage_manager", lambda name: storage)
+
+        assert await profile_db._load_from_directory("2") is record
+        assert storage.loads == [("1", "profile-2022-01")]
+
+        # Profile 3 is not in its index anymore, so it is forgotten and searched.
+        assert await profile_db._load_from_directory("3") is None
+        assert await directory.load("3") is None
+
+    asyncio.run(main())
+
+
+def test_disabled_directory_should_not_call_redis():
+    async def main():
+        directory = ProfileDirectory(buckets=16, enabled=False)
+        directory._redis = None
+        await directory.save([_profile("1", ["1"])])
+        assert await directory.load("1") is None
+        await directory.delete(["1"])
+
+    asyncio.run(main())
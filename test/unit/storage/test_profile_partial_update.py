@@ -0,0 +1,87 @@
+import asyncio
+
+from tracardi.domain.profile import Profile
+from tracardi.domain.storage_record import RecordMetadata
+from tracardi.domain.value_object.bulk_insert_result import BulkInsertResult
+from tracardi.service.plugin.runner import ActionRunner
+from tracardi.service.storage.drivers.elastic import profile as profile_driver
+from tracardi.service.storage.elastic_storage import ElasticStorage
+
+
+class FakeClient:
+
+    def __init__(self, conflicts):
+        self.conflicts = conflicts
+        self.actions = []
+
+    async def update_bulk(self, actions):
+        self.actions += actions
+        return [(False, {"update": {"_id": action["_id"], "status": 409}}) if action["_id"] in self.conflicts
+                else (True, {"update": {"_id": action["_id"], "_seq_no": 8, "_primary_term": 2}})
+                for action in actions]
+
+
+class FakeStorageManager:
+
+    def __init__(self, conflicts):
+        self.storage = ElasticStorage.__new__(ElasticStorage)
+        self.storage.storage = FakeClient(conflicts)
+        self.upserted = []
+
+    async def update_partial(self, documents):
+        return await self.storage.update_partial(documents)
+
+    async def upsert(self, data, replace_id=True, exclude=None):
+        self.upserted += data
+        return BulkInsertResult(saved=len(data), ids=[profile.id for profile in data])
+
+
+def _loaded_profile(id) -> Profile:
+    profile = Profile(id=id, traits={"public": {"name": "John"}})
+    profile.set_meta_data(RecordMetadata(id=id, index="profile-index", seq_no=7, primary_term=2))
+    profile.reset_changes()
+    profile.aux = {"key": "value"}
+    profile.metadata.aux["update"] = "now"
+    return profile
+
+
+def test_should_update_changed_data_and_upsert_conflicting_profiles(monkeypatch):
+    storage_manager = FakeStorageManager(conflicts={"2"})
+    monkeypatch.setattr(profile_driver, "storage_manager", lambda index: storage_manager)
+
+    updated, conflicting, new = _loaded_profile("1"), _loaded_profile("2"), Profile(id="3")
+    result = asyncio.run(profile_driver._save_partially([updated, conflicting, new]))
+
+    assert result.saved == 3
+    assert storage_manager.upserted == [new, conflicting]
+
+    action = storage_manager.storage.storage.actions[0]
+    assert action["_op_type"] == "update"
+    assert action["script"]["params"]["changes"] == [
+        {"path": ["aux", "key"], "value": "value"},
+        {"path": ["metadata", "aux", "update"], "value": updated.metadata.aux["update"]}
+    ]
+    assert (action["if_seq_no"], action["if_primary_term"]) == (7, 2)
+
+    assert updated.get_meta_data().seq_no == 8
+    # Upserted profile has a new version in the index.
+    assert conflicting.get_meta_data().seq_no is None
+
+
+def test_should_upsert_profile_updated_by_plugin(monkeypatch):
+    storage_manager = FakeStorageManager(conflicts=set())
+    monkeypatch.setattr(profile_driver, "storage_manager", lambda index: storage_manager)
+
+    profile = _loaded_profile("1")
+    # Plugin changes the profile in place and only calls update_profile.
+    profile.traits.public["name"] = "Jane"
+    plugin = ActionRunner()
+    plugin.profile = profile
+    plugin.update_profile()
+
+    asyncio.run(profile_driver._save_partially([profile]))
+
+    assert storage_manager.upserted == [profile]
+    assert storage_manager.storage.storage.actions == []
+    profile.reset_changes()
+    assert not profile.has_changes()
@@ -0,0 +1,49 @@
+import asyncio
+
+from tracardi.domain.profile import Profile
+from tracardi.domain.session import Session
+from tracardi.domain.storage_record import RecordMetadata
+from tracardi.service import cache_manager
+from tracardi.service.cache_manager import CacheManager
+from tracardi.service.storage.redis.recent_writes import RecentWrites
+
+
+def _profile(id, ids) -> Profile:
+    profile = Profile(id=id, ids=ids)
+    return profile.set_meta_data(RecordMetadata(id=id, index="profile-index"))
+
+
+def test_should_remove_deleted_profile_under_all_ids(async_redis_client):
+    async def main():
+        recent_profiles = RecentWrites('profile', ttl=60)
+        recent_profiles._redis = async_redis_client
+        await recent_profiles.save([_profile("1", ["1", "2"]), _profile("3", ["3"])])
+
+        # Profile 3 is merged into 1 and deleted.
+        await recent_profiles.save([_profile("1", ["1", "2", "3"])])
+        await recent_profiles.delete(["3"])
+        assert (await recent_profiles.load("3"))['id'] == "1"
+
+        await recent_profiles.delete(["1"])
+        assert all([await recent_profiles.load(id) is None for id in ["1", "2", "3"]])
+
+    asyncio.run(main())
+
+
+def test_cached_session_should_not_be_read_from_redis(monkeypatch, async_redis_client):
+    async def main():
+        recent_sessions = RecentWrites('session', ttl=60)
+        recent_sessions._redis = async_redis_client
+        await recent_sessions.save([Session(id="session-1", metadata={})])
+        monkeypatch.setattr(cache_manager, "recent_sessions", recent_sessions)
+
+        cache = CacheManager()
+        cache.session_cache().delete("session-1")
+        for _ in range(3):
+            session = await cache.session("session-1", ttl=10)
+            assert session.id == "session-1"
+        cache.session_cache().delete("session-1")
+
+        assert async_redis_client.client.calls['get'] == 1
+
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+from tracardi.worker.domain.migration_schema import MigrationSchema
+from tracardi.worker.domain.storage_record import StorageRecords
+from tracardi.worker.service.worker.migration_workers.utils.checkpoint import MigrationCheckpoint
+from tracardi.worker.service.worker.migration_workers.utils.migration_error import MigrationError
+from tracardi.worker.service.worker.migration_workers.utils.reindex_with_operation import BulkReindex
+
+
+class FakeElasticClient:
+
+    def __init__(self, documents: int, failing_slice: int = None):
+        self.documents = documents
+        self.failing_slice = failing_slice
+        self.read_slices = []
+        self.upserted = {}
+
+    def count(self, index):
+        return self.documents
+
+    def scroll_slice(self, index, slice_id, slices, size):
+        self.read_slices.append(slice_id)
+        ids = [id for id in range(self.documents) if id % slices == slice_id]
+        for start in range(0, len(ids), size):
+            records = StorageRecords()
+            records.set_data(records=[{"_id": str(id), "_index": index, "_source": {"value": id}}
+                                      for id in ids[start:start + size]], total=len(ids))
+            yield records
+
+    def bulk_upsert(self, index, records, script, chunk_size):
+        if records and int(records[0].get_meta_data().id) % 4 == self.failing_slice:
+            return 0, [{"update": {"error": "mapping error"}}]
+        for record in records:
+            self.upserted[record.get_meta_data().id] = dict(record)
+        return len(records), []
+
+
+def _schema() -> MigrationSchema:
+    return MigrationSchema(id="1", copy_index={"from_index": "from", "to_index": "to", "multi": False},
+                           worker="reindex", asynchronous=False)
+
+
+def _transform(records: StorageRecords):
+    records = list(records)
+    for record in records:
+        record['value'] *= 10
+    return records
+
+
+def _reindex(client, checkpoint) -> BulkReindex:
+    return BulkReindex(client, _schema(), _transform, checkpoint, slices=4, batch_size=3, chunk_size=2,
+                       progress_interval=0.01)
+
+
+def test_should_move_all_slices_in_batches(fake_redis):
+    checkpoint = MigrationCheckpoint("from", "to", 4, client=fake_redis)
+    client = FakeElasticClient(20)
+
+    reindex = _reindex(client, checkpoint)
+    reindex.run(None)
+
+    assert sorted(client.read_slices) == [0, 1, 2, 3]
+    assert len(client.upserted) == 20
+    assert client.upserted["7"] == {"value": 70, "id": "7"}
+    assert reindex.moved_records == 20
+    assert checkpoint.finished_slices() == set()
+
+
+def test_should_resume_failed_migration_from_checkpoint(fake_redis):
+    checkpoint = MigrationCheckpoint("from", "to", 4, client=fake_redis)
+
+    client = FakeElasticClient(20, failing_slice=2)
+    try:
+        _reindex(client, checkpoint).run(None)
+        assert False, "Migration should fail"
+    except MigrationError:
+        pass
+    assert checkpoint.finished_slices() == {0, 1, 3}
+
+    client = FakeElasticClient(20)
+    _reindex(client, checkpoint).run(None)
+    assert client.read_slices == [2]
+    assert checkpoint.finished_slices() == set()
@@ -0,0 +1,171 @@
+import asyncio
+from time import perf_counter
+
+import pytest
+from lark.exceptions import VisitError
+
+from tracardi.domain.event import Event, EventSession
+from tracardi.domain.event_metadata import EventMetadata
+from tracardi.domain.profile import Profile
+from tracardi.domain.resource import Resource
+from tracardi.domain.time import EventTime
+from tracardi.process_engine.tql.condition import Condition
+from tracardi.process_engine.tql.parser import Parser
+from tracardi.process_engine.tql.transformer.expr_compiler import ExprCompiler
+from tracardi.process_engine.tql.transformer.expr_transformer import ExprTransformer
+from tracardi.service.notation.dot_accessor import DotAccessor
+
+payload = {
+    "a": {
+        "b": 1,
+        "c": [1, 2, 3, "4"],
+        "d": {"aa": 1},
+        "e": "test",
+        'f': 1,
+        'g': True,
+        'h': None,
+        'i': "2021-01-10",
+        'j': [],
+        'k': {},
+        'l': "",
+        'm': 1650976227,
+        'text': 'Hello world',
+        'x y': 1
+    }
+}
+
+event = Event(id="event-id",
+              type="type",
+              metadata=EventMetadata(time=EventTime()),
+              source=Resource(id="3", type="event"),
+              context={},
+              profile=Profile(id="1"),
+              session=EventSession(id="2"))
+
+dot = DotAccessor(Profile(id="1"), EventSession(id="2"), payload, event)
+
+parser = Parser(Parser.read('grammar/uql_expr.lark'), start='expr')
+
+conditions = [
+    'payload@a.d.aa between 1 and 2',
+    'payload@a.b == payload@a.c',
+    'payload@a.e == "test"',
+    'payload@a.g == True',
+    'payload@a.h == null',
+    'payload@a.b >= 1',
+    'payload@a.b => 1',
+    'payload@a.b =< 1',
+    'payload@a.b < -1.845',
+    'payload@a.b != payload@a.f',
+    'payload@A["x y"] exists',
+    'payload@a["x y"] == 1',
+    'datetime(payload@a.i) == datetime("2021-01-10")',
+    'datetime(payload@a.i) between datetime("2020-01-01") and datetime("2022-01-01")',
+    'datetime.from_timestamp(payload@a.m) == datetime.from_timestamp(payload@a.m)',
+    'datetime.offset(payload@a.missing, "-1m") < now()',
+    'lowercase(payload@a.text) == "hello world"',
+    'uppercase(payload@a.text) == "HELLO WORLD"',
+    'payload@a.h is null',
+    'payload@a.h is not null',
+    'payload@a.h exists',
+    'payload@a.h.h not exists',
+    'payload@a.missing between 1 and 2',
+    'payload@a.missing exists AND payload@a.missing==1',
+    '(payload@a.missing exists OR payload@a.b==1) AND payload@a.missing not exists',
+    'payload@a.j EMPTY',
+    'payload@a.e NOT EMPTY AND payload@a.e == "test"',
+    'payload@a.c CONTAINS 2',
+    'payload@a.text CONTAINS "world"',
+    'payload@a.text CONTAINS 1',
+    'payload@a.b CONTAINS 1',
+    'payload@a.text STARTS WITH "Hello"',
+    'payload@a.c ENDS WITH "4"',
+    'payload@a.b STARTS WITH 1',
+    'unknown(payload@a.b) == 1',
+    'payload@a.b == [1,2]',
+]
+
+
+def _transform(condition):
+    try:
+        return ExprTransformer(dot=dot).transform(parser.parse(condition))
+    except VisitError as e:
+        return e
+
+
+def _compiled(condition):
+    try:
+        return ExprCompiler().compile(condition, parser.parse(condition)).evaluate(dot)
+    except VisitError as e:
+        return e
+
+
+def _same(result1, result2):
+    if isinstance(result1, Exception):
+        return type(result1) is type(result2) and str(result1) == str(result2)
+    return result1 == result2
+
+
+@pytest.mark.parametrize("condition", conditions)
+def test_compiled_condition_should_return_the_same_result_as_transformer(condition):
+    assert _same(_transform(condition), _compiled(condition))
+
+
+def test_condition_should_cache_compiled_conditions():
+    condition = Condition()
+    assert condition.compile('payload@a.b == 1') is condition.compile('payload@a.b == 1')
+    assert condition.parse('payload@a.b == 1') is condition.compile('payload@a.b == 1').tree
+
+    async def main():
+        assert await condition.evaluate('payload@a.b == 1', dot) is True
+        assert await condition.evaluate('payload@a.b == 2', dot) is False
+
+    asyncio.run(main())
+
+
+def test_condition_should_parse_once_and_evaluate_without_transformer(monkeypatch):
+    condition = Condition()
+    parse = condition.parser.parse
+    calls = {"parse": 0, "transform": 0}
+
+    def counting_parse(*args, **kwargs):
+        calls["parse"] += 1
+        return parse(*args, **kwargs)
+
+    def counting_transform(self, tree):
+        calls["transform"] += 1
+
+    monkeypatch.setattr(condition.parser, "parse", counting_parse)
+    monkeypatch.setattr(ExprTransformer, "transform", counting_transform)
+
+    async def main():
+        for _ in range(10):
+            assert await condition.evaluate('payload@a.b == 1 AND payload@a.e == "test" AND payload@a.f == 1',
+                                            dot) is True
+
+    asyncio.run(main())
+
+    assert calls == {"parse": 1, "transform": 0}
+
+
+def _time_per_call(function, repeats) -> float:
+    start = perf_counter()
+    for _ in range(repeats):
+        function()
+    return (perf_counter() - start) / repeats
+
+
+@pytest.mark.benchmark
+def test_condition_evaluation_benchmark():
+    condition = '(payload@a.missing exists OR payload@a.b==1) AND payload@a.e == "test" AND ' \
+                'payload@a.d.aa between 1 and 2 AND lowercase(payload@a.text) == "hello world"'
+
+    tree = parser.parse(condition)
+    compiled = ExprCompiler().compile(condition, tree)
+
+    cold_parse = _time_per_call(lambda: ExprTransformer(dot=dot).transform(parser.parse(condition)), 20)
+    cached_tree = _time_per_call(lambda: ExprTransformer(dot=dot).transform(tree), 500)
+    compiled_closure = _time_per_call(lambda: compiled.evaluate(dot), 500)
+
+    assert cached_tree < cold_parse
+    assert compiled_closure < cached_tree
@@ -0,0 +1,150 @@
+import asyncio
+
+from tracardi.service.connection_pools import ConnectionPoolRegistry
+
+
+class FakeClient:
+
+    def __init__(self, credentials):
+        self.credentials = credentials
+        self.closed = False
+        self.healthy = True
+
+    def close(self):
+        self.closed = True
+
+    def check(self):
+        return self.healthy
+
+
+async def _acquire(registry: ConnectionPoolRegistry, resource_id, credentials, created: list):
+    async def create():
+        await asyncio.sleep(0.01)
+        client = FakeClient(credentials)
+        created.append(client)
+        return client
+
+    return await registry.acquire("fake", resource_id, credentials, create, FakeClient.close, FakeClient.check)
+
+
+def test_should_share_client_of_resource():
+    async def main():
+        registry = ConnectionPoolRegistry()
+        created = []
+        pools = await asyncio.gather(*[_acquire(registry, "1", {"password": "a"}, created) for _ in range(5)])
+        other = await _acquire(registry, "2", {"password": "a"}, created)
+
+        assert len(created) == 2
+        assert all(pool is pools[0] for pool in pools)
+        assert pools[0].users == 5
+        assert other is not pools[0]
+
+        for pool in [*pools, other]:
+            await registry.release(pool)
+        assert pools[0].users == 0
+        assert not pools[0].client.closed
+
+        await registry.close_all()
+        assert all(client.closed for client in created)
+        assert len(registry) == 0
+
+    asyncio.run(main())
+
+
+def test_should_replace_client_when_credentials_change():
+    async def main():
+        registry = ConnectionPoolRegistry()
+        created = []
+        old = await _acquire(registry, "1", {"password": "a"}, created)
+        new = await _acquire(registry, "1", {"password": "b"}, created)
+
+        assert new is not old
+        # Old client is in use, so it is closed when released.
+        assert not old.client.closed
+        await registry.release(old)
+        assert old.client.closed
+        assert not new.client.closed
+
+        await registry.invalidate("1")
+        assert not new.client.closed
+        await registry.release(new)
+        assert new.client.closed
+
+    asyncio.run(main())
+
+
+def test_should_reconnect_unhealthy_client():
+    async def main():
+        registry = ConnectionPoolRegistry(health_check_interval=0)
+        created = []
+        pool = await _acquire(registry, "1", {}, created)
+        await registry.release(pool)
+
+        pool.client.healthy = False
+        new = await _acquire(registry, "1", {}, created)
+
+        assert new is not pool
+        assert pool.client.closed
+        assert len(created) == 2
+
+    asyncio.run(main())
+
+
+def test_should_close_least_recently_used_clients_over_limit():
+    async def main():
+        registry = ConnectionPoolRegistry(max_pools=2)
+        created = []
+        first = await _acquire(registry, "1", {}, created)
+        second = await _acquire(registry, "2", {}, created)
+        await registry.release(first)
+        await registry.release(second)
+
+        await registry.release(await _acquire(registry, "1", {}, created))
+        third = await _acquire(registry, "3", {}, created)
+
+        assert len(registry) == 2
+        assert second.client.closed
+        assert not first.client.closed
+        assert not third.client.closed
+
+    asyncio.run(main())
+
+
+def test_should_not_hand_out_client_closed_during_health_check():
+    async def main():
+        registry = ConnectionPoolRegistry(health_check_interval=0)
+        created = []
+        pool = await _acquire(registry, "1", {}, created)
+        await registry.release(pool)
+
+        async def check(client):
+            # Client is closed by another request while it is checked.
+            await registry.invalidate("1")
+            return True
+
+        pool.check = check
+        new = await _acquire(registry, "1", {}, created)
+
+        assert pool.client.closed
+        assert new is not pool
+        assert not new.client.closed
+
+    asyncio.run(main())
+
+
+def test_should_not_cancel_shared_connection_with_the_first_request():
+    async def main():
+        registry = ConnectionPoolRegistry()
+        created = []
+        first = asyncio.create_task(_acquire(registry, "1", {}, created))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(_acquire(registry, "1", {}, created))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        pool = await second
+        assert first.cancelled()
+        assert len(created) == 1
+        assert pool.users == 1
+
+    asyncio.run(main())
@@ -0,0 +1,179 @@
+import asyncio
+import json
+from copy import deepcopy
+from time import perf_counter
+
+import pytest
+
+from tracardi.domain.event import Event, EventSession
+from tracardi.domain.event_metadata import EventMetadata
+from tracardi.domain.flow import Flow
+from tracardi.domain.profile import Profile
+from tracardi.domain.resource import Resource
+from tracardi.domain.time import EventTime
+from tracardi.process_engine.action.v1.flow.start.start_action import StartAction
+from tracardi.process_engine.action.v1.increase_views_action import IncreaseViewsAction
+from tracardi.service.plugin.domain.result import Result
+from tracardi.service.plugin.runner import ActionRunner
+from tracardi.service.wf.domain import graph_invoker
+from tracardi.service.wf.domain.debug_info import DebugInfo, FlowDebugInfo
+from tracardi.service.wf.domain.entity import Entity
+from tracardi.service.wf.service.builders import action
+from tracardi.service.wf.service.execution_plan_cache import compile_execution_plan
+from tracardi.service.wf.utils import copy_on_write
+from tracardi.service.wf.utils.copy_on_write import share, CopyOnWriteDict, CopyOnWriteList
+
+
+def test_changes_should_not_reach_shared_data():
+    data = {"a": {"b": [1, {"c": 1}]}, "d": [{"e": 1}], "f": 1}
+    original = deepcopy(data)
+
+    payload = share(data)
+    payload["a"]["b"][1]["c"] = 2
+    payload["a"]["b"].append(3)
+    payload["d"][0]["e"] = 2
+    payload.get("d").insert(0, {})
+    payload["f"] = 2
+    dict(share(data))["a"]["x"] = 1
+    {**share(data)}["d"].pop()
+    for value in share(data).values():
+        if isinstance(value, dict):
+            value.clear()
+    for item in share(data)["d"]:
+        item["e"] = 2
+
+    assert data == original
+    assert payload == {"a": {"b": [1, {"c": 2}, 3]}, "d": [{}, {"e": 2}], "f": 2}
+    assert isinstance(payload, dict) and isinstance(payload["d"], list)
+    assert json.loads(json.dumps(payload)) == payload
+
+
+def test_copies_should_be_plain_containers():
+    payload = share({"a": {"b": [1]}})
+    assert type(deepcopy(payload)) is dict
+    assert type(deepcopy(payload)["a"]["b"]) is list
+    assert isinstance(payload.copy(), CopyOnWriteDict)
+    assert isinstance(payload["a"]["b"].copy(), CopyOnWriteList)
+    assert payload | {"c": 1} == {"a": {"b": [1]}, "c": 1}
+
+
+def test_list_should_track_items_it_owns():
+    data = [{"a": 1}, {"a": 2}, {"a": 3}]
+    items = share(data)
+
+    items[-1]["a"] = 4
+    items.pop()["a"] = 5
+    items[0] = {"a": 6}
+    items.append({"a": 7})
+    items.sort(key=lambda item: item["a"])
+    items[0]["a"] = 8
+
+    assert data == [{"a": 1}, {"a": 2}, {"a": 3}]
+    assert items == [{"a": 8}, {"a": 6}, {"a": 7}]
+
+
+class ReadPlugin(ActionRunner):
+
+    async def run(self, payload: dict, in_edge=None):
+        assert len(payload["items"]) > 0
+        return Result(port="payload", value=payload)
+
+
+class ChangePlugin(ActionRunner):
+
+    async def run(self, payload: dict, in_edge=None):
+        payload["items"][0]["name"] = "changed"
+        return Result(port="payload", value=payload)
+
+
+class EndPlugin(ActionRunner):
+    payloads = []
+
+    async def run(self, payload: dict, in_edge=None):
+        EndPlugin.payloads.append(payload)
+        return None
+
+
+def _event() -> Event:
+    return Event(id="1",
+                 type="purchase",
+                 metadata=EventMetadata(time=EventTime()),
+                 source=Resource(id="3", type="event"),
+                 properties={},
+                 context={},
+                 profile=Profile(id="1"),
+                 session=EventSession(id="2"))
+
+
+async def _run_linear_flow(payload: dict, nodes: int, plugin_classes: dict):
+    flow_nodes = [action(StartAction), *[action(IncreaseViewsAction) for _ in range(nodes - 1)]]
+
+    flow = Flow.build("Linear - flow", id="linear")
+    for node, next_node in zip(flow_nodes, flow_nodes[1:]):
+        flow += node('payload') >> next_node('payload')
+
+    plan = compile_execution_plan(flow)
+    plan.plugin_classes = {flow_nodes[0].id: ReadPlugin, flow_nodes[-1].id: EndPlugin,
+                           **{node.id: plugin_classes.get(number, ReadPlugin)
+                              for number, node in enumerate(flow_nodes[1:-1], start=1)}}
+
+    invoker = plan.make_invoker()
+    event = _event()
+    debug_info = DebugInfo(timestamp=0, flow=FlowDebugInfo(id=flow.id, name=flow.name), event=Entity(id=event.id))
+    await invoker.init(debug_info, [], flow, None, event, None, None, None, [])
+    return await invoker.run(payload, event, None, None, debug_info, [])
+
+
+def _payload() -> dict:
+    return {"items": [{"id": i, "name": f"product-{i}", "tags": ["a", "b"], "price": {"value": i, "currency": "USD"}}
+                      for i in range(12000)]}
+
+
+def test_nodes_should_not_change_payload_of_other_nodes():
+    payload = _payload()
+    EndPlugin.payloads = []
+    asyncio.run(_run_linear_flow(payload, 5, {2: ChangePlugin}))
+
+    assert payload == _payload()
+    assert EndPlugin.payloads[0]["items"][0]["name"] == "changed"
+
+
+def test_nodes_that_only_read_payload_should_not_copy_it(monkeypatch):
+    copies = []
+
+    def counting_deepcopy(value, memo=None):
+        copies.append(value)
+        return deepcopy(value, memo)
+
+    monkeypatch.setattr(copy_on_write, "deepcopy", counting_deepcopy)
+    payload = _payload()
+    EndPlugin.payloads = []
+    asyncio.run(_run_linear_flow(payload, 20, {}))
+
+    assert copies == []
+    assert EndPlugin.payloads[0] == payload
+
+
+def _run(payload: dict) -> float:
+    EndPlugin.payloads = []
+    start = perf_counter()
+    asyncio.run(_run_linear_flow(payload, 20, {}))
+    return perf_counter() - start
+
+
+@pytest.mark.benchmark
+def test_linear_flow_payload_benchmark():
+    payload = _payload()
+    payload_size = len(json.dumps(payload))
+    assert payload_size > 1024 * 1024
+
+    try:
+        # Payload is deep copied for every node the way it was done before copy-on-write payloads.
+        graph_invoker.share = deepcopy
+        deep_copy_time = _run(payload)
+    finally:
+        graph_invoker.share = share
+    copy_on_write_time = _run(payload)
+
+    assert EndPlugin.payloads[0] == payload
+    assert copy_on_write_time < deep_copy_time
@@ -0,0 +1,166 @@
+from collections import defaultdict
+from time import perf_counter
+
+import pytest
+
+from tracardi.service.wf.domain.connection import Connection
+from tracardi.service.wf.domain.dag_graph import DagGraph
+from tracardi.service.wf.domain.edge import Edge
+from tracardi.service.wf.domain.node import Node
+from tracardi.service.wf.utils.dag_graph_sorter import DagGraphSorter
+from tracardi.service.wf.utils.dag_processor import DagProcessor
+
+
+class GraphBuilder:
+
+    def __init__(self):
+        self.nodes = []
+        self.edges = []
+
+    def node(self, start: bool = False) -> str:
+        node_id = str(len(self.nodes))
+        self.nodes.append(Node(id=node_id, start=start, className="Action", module="module"))
+        return node_id
+
+    def connect(self, source: str, target: str):
+        self.edges.append(Edge(id=f"{source}-{target}",
+                               source=Connection(node_id=source, param="payload"),
+                               target=Connection(node_id=target, param="payload")))
+
+    def build(self) -> DagGraph:
+        return DagGraph(nodes=self.nodes, edges=self.edges)
+
+
+def _assert_sorted(sorted_nodes, dag_graph: DagGraph):
+    position = {node.id: number for number, node in enumerate(sorted_nodes)}
+    for edge in dag_graph.edges:
+        assert position[edge.source.node_id] < position[edge.target.node_id]
+
+
+def _diamond_graph(diamonds: int) -> DagGraph:
+    builder = GraphBuilder()
+    node = builder.node(start=True)
+    for _ in range(diamonds):
+        left, right, bottom = builder.node(), builder.node(), builder.node()
+        builder.connect(node, left)
+        builder.connect(node, right)
+        builder.connect(left, bottom)
+        builder.connect(right, bottom)
+        node = bottom
+    builder.connect(node, builder.node())
+    return builder.build()
+
+
+def _wide_graph(nodes: int) -> DagGraph:
+    builder = GraphBuilder()
+    start = builder.node(start=True)
+    middle = [builder.node() for _ in range(nodes - 2)]
+    end = builder.node()
+    for node in middle:
+        builder.connect(start, node)
+        builder.connect(node, end)
+    return builder.build()
+
+
+def test_should_compile_diamond_flows_in_linear_time():
+    dag_graph = _diamond_graph(100)
+    dag = DagProcessor(dag_graph)
+    exec_dag = dag.make_execution_dag(start_nodes=dag.find_start_nodes())
+
+    assert len(exec_dag.graph) == 302
+    _assert_sorted(exec_dag.graph, dag_graph)
+    assert sum(len(node.graph.in_edges) for node in exec_dag.graph) == len(dag_graph.edges)
+    assert sum(len(node.graph.out_edges) for node in exec_dag.graph) == len(dag_graph.edges)
+
+
+def test_should_keep_nodes_of_cycles():
+    graph = DagGraphSorter(["a", "b", "c", "d"])
+    graph.add_edge("a", "b")
+    graph.add_edge("b", "c")
+    graph.add_edge("c", "b")
+    graph.add_edge("a", "d")
+
+    assert graph.topological_sort() == ["a", "d", "b", "c"]
+
+
+class RecursiveDagProcessor(DagProcessor):
+
+    """
+    Compiles flows the way it was done before adjacency maps: edges are scanned for every node, and
+    the passes recurse without remembering visited nodes.
+    """
+
+    def _find_out_edges(self, node):
+        return [(edge.source.param, edge) for _, edge in self._edges.items() if node.id == edge.source.node_id]
+
+    def _find_in_edges(self, node):
+        return [(edge.target.param, edge) for _, edge in self._edges.items() if node.id == edge.target.node_id]
+
+    def _forward_pass(self, start_node_ids):
+        for start_node_id in start_node_ids:
+            node = self._find_node(start_node_id)
+            edges = self._find_out_edges(node)
+            if edges:
+                for _, edge in edges:
+                    node.graph.out_edges.add(edge)
+                    self._forward_pass([edge.target.node_id])
+            else:
+                self._last_nodes.add(node.id)
+        return self._last_nodes
+
+    def _back_pass(self, last_node_ids):
+        for last_node_id in last_node_ids:
+            node = self._find_node(last_node_id)
+            for _, edge in self._find_in_edges(node):
+                node.graph.in_edges.add(edge)
+                self._back_pass([edge.source.node_id])
+
+
+def _recursive_topological_sort(sorter: DagGraphSorter):
+    visited = defaultdict(bool)
+    stack = []
+
+    def sort(v):
+        visited[v] = True
+        for i in sorter.graph[v]:
+            if not visited[i]:
+                sort(i)
+        stack.insert(0, v)
+
+    for node in sorter.V:
+        if not visited[node]:
+            sort(node)
+    return stack
+
+
+def _compile(dag_graph: DagGraph, processor_class) -> float:
+    dag_graph = dag_graph.copy(deep=True)
+    start = perf_counter()
+    dag = processor_class(dag_graph)
+    exec_dag = dag.make_execution_dag(start_nodes=dag.find_start_nodes())
+    compile_time = perf_counter() - start
+    _assert_sorted(exec_dag.graph, dag_graph)
+    return compile_time
+
+
+@pytest.mark.benchmark
+def test_flow_compilation_benchmark(monkeypatch):
+    timings = []
+    for nodes in [50, 100, 250, 500]:
+        dag_graph = _wide_graph(nodes)
+        compile_time = _compile(dag_graph, DagProcessor)
+        with monkeypatch.context() as patch:
+            patch.setattr(DagGraphSorter, "topological_sort", _recursive_topological_sort)
+            recursive_time = _compile(dag_graph, RecursiveDagProcessor)
+        timings.append((nodes, recursive_time, compile_time))
+
+    diamond_graph = _diamond_graph(12)
+    with monkeypatch.context() as patch:
+        patch.setattr(DagGraphSorter, "topological_sort", _recursive_topological_sort)
+        diamond_recursive_time = _compile(diamond_graph, RecursiveDagProcessor)
+    diamond_time = _compile(diamond_graph, DagProcessor)
+
+    for nodes, recursive_time, compile_time in timings:
+        assert compile_time < recursive_time, f"{nodes} nodes: recursive {recursive_time * 1000:.3f}ms, " \
+                                              f"adjacency maps {compile_time * 1000:.3f}ms"
+    assert diamond_time < diamond_recursive_time
@@ -0,0 +1,126 @@
+import asyncio
+from time import monotonic
+from types import SimpleNamespace
+
+import pytest
+
+from tracardi.config import tracardi
+from tracardi.event_server.utils.memory_cache import CacheItem
+from tracardi.service.destinations import dispatchers
+from tracardi.service.destinations.resource_cache import memory_cache as resource_cache, invalidate_resource
+
+
+def test_should_dispatch_concurrently_with_limit(monkeypatch):
+    monkeypatch.setattr(tracardi, "destination_concurrency", 2)
+    monkeypatch.setattr(tracardi, "destination_timeout", 5)
+    running = []
+    max_running = []
+
+    async def dispatch():
+        running.append(1)
+        max_running.append(len(running))
+        await asyncio.sleep(0.1)
+        running.pop()
+
+    async def main():
+        start = monotonic()
+        await dispatchers._dispatch_all([(str(i), dispatch) for i in range(4)])
+        return monotonic() - start
+
+    duration = asyncio.run(main())
+
+    assert max(max_running) == 2
+    assert 0.2 <= duration < 0.35
+
+
+def test_should_time_out_slow_destination_and_run_others(monkeypatch):
+    monkeypatch.setattr(tracardi, "destination_concurrency", 10)
+    monkeypatch.setattr(tracardi, "destination_timeout", 0.05)
+    dispatched = []
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def fast():
+        dispatched.append(1)
+
+    async def main():
+        await dispatchers._dispatch_all([("slow", slow), ("fast", fast)])
+
+    start = monotonic()
+    with pytest.raises(TimeoutError):
+        asyncio.run(main())
+
+    assert monotonic() - start < 0.5
+    assert dispatched == [1]
+
+
+def test_should_invalidate_cached_resource():
+    resource_cache["resource-id"] = CacheItem(data="resource", ttl=30)
+    assert "resource-id" in resource_cache
+    invalidate_resource("resource-id")
+    assert "resource-id" not in resource_cache
+
+
+def _patch_destinations(monkeypatch, error: BaseException, dispatched: list):
+    monkeypatch.setattr(tracardi, "postpone_destination_sync", 0)
+
+    class FailingDestination:
+
+        def __init__(self, debug, resource, destination):
+            pass
+
+        async def dispatch_profile(self, data, profile, session):
+            dispatched.append(data)
+            raise RuntimeError("Destination failed.")
+
+    async def get_destination_dispatchers(destinations, dot, template):
+        yield SimpleNamespace(name="first"), None, "data"
+        raise error
+
+    async def load_destinations(ttl):
+        return []
+
+    monkeypatch.setattr(dispatchers, "_get_destination_dispatchers", get_destination_dispatchers)
+    monkeypatch.setattr(dispatchers, "_get_destination_class", lambda destination: FailingDestination)
+    return load_destinations
+
+
+def test_should_dispatch_prepared_destinations_and_raise_original_error(monkeypatch):
+    dispatched = []
+    load_destinations = _patch_destinations(monkeypatch, ConnectionError("Disabled resource."), dispatched)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(dispatchers.profile_destination_dispatch(load_destinations, None, None, False))
+    assert dispatched == ["data"]
+
+
+def test_should_not_dispatch_when_cancelled(monkeypatch):
+    dispatched = []
+    load_destinations = _patch_destinations(monkeypatch, asyncio.CancelledError(), dispatched)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(dispatchers.profile_destination_dispatch(load_destinations, None, None, False))
+    assert dispatched == []
+
+
+def test_should_dispatch_events_of_one_destination_in_order(monkeypatch):
+    monkeypatch.setattr(tracardi, "destination_concurrency", 10)
+    monkeypatch.setattr(tracardi, "destination_timeout", 5)
+    dispatched = []
+
+    def dispatch(event, delay):
+        async def _dispatch():
+            await asyncio.sleep(delay)
+            dispatched.append(event)
+        return _dispatch
+
+    async def main():
+        await dispatchers._dispatch_all([("first", dispatch("first-1", 0.05)),
+                                         ("second", dispatch("second-1", 0.02)),
+                                         ("first", dispatch("first-2", 0))])
+
+    asyncio.run(main())
+
+    # Events of one destination keep their order, destinations run concurrently.
+    assert dispatched == ["second-1", "first-1", "first-2"]
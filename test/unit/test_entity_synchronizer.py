@@ -1,5 +1,7 @@
 import asyncio
 
+from tracardi.service import synchronizer
+from tracardi.service.metrics import MetricsRegistry, PROFILE_LOCK_WAIT
 from tracardi.service.synchronizer import ProfileTracksSynchronizer
 
 
@@ -7,9 +9,41 @@ def test_should_wait_for_unlock():
 
     async def main():
         es = ProfileTracksSynchronizer(ttl=3)
-        es.lock_entity("1")
-        assert es.is_locked("1")
-        assert not es.is_locked("2")
-        await es.wait_for_unlock("1")
+        lock = await es.lock("1")
+        assert await es.is_locked("1")
+        assert not await es.is_locked("2")
+
+        order = []
+
+        async def second():
+            second_lock = await es.lock("1")
+            order.append("second")
+            await es.unlock(second_lock)
+
+        task = asyncio.create_task(second())
+        await asyncio.sleep(0.1)
+        order.append("first")
+        await es.unlock(lock)
+        await task
+
+        assert order == ["first", "second"]
+        assert not await es.is_locked("1")
+        assert es.get_stats()['acquired'] == 2
+        assert es.get_stats()['contended'] == 1
+
+    asyncio.run(main())
+
+
+def test_should_observe_lock_wait_time(monkeypatch, async_redis_client):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(synchronizer, "metrics", registry)
+
+    async def main():
+        es = ProfileTracksSynchronizer(ttl=3)
+        es.redis = async_redis_client
+        await es.lock("1")
 
     asyncio.run(main())
+
+    collected = {labels: histogram.count for name, labels, histogram in registry.collect() if name == PROFILE_LOCK_WAIT}
+    assert collected == {(("contended", "false"),): 1}
@@ -0,0 +1,169 @@
+from time import perf_counter
+
+import pytest
+from dotty_dict import dotty
+
+from tracardi.domain.event import Event, EventSession
+from tracardi.domain.event_metadata import EventMetadata
+from tracardi.domain.event_to_profile import EventToProfile
+from tracardi.domain.profile import Profile
+from tracardi.domain.resource import Resource
+from tracardi.domain.storage_record import StorageRecords
+from tracardi.domain.time import EventTime
+from tracardi.service.console_log import ConsoleLog
+from tracardi.service.event_to_profile_copy import EventToProfileCopier, CopyPlan, get_copy_plans, EQUALS, \
+    EQUALS_IF_NOT_EXISTS, APPEND
+
+
+def _event(id, properties) -> Event:
+    return Event(id=id,
+                 type="purchase",
+                 metadata=EventMetadata(time=EventTime()),
+                 source=Resource(id="3", type="event"),
+                 properties=properties,
+                 context={},
+                 profile=Profile(id="1"),
+                 session=EventSession(id="2"))
+
+
+def _schema(mappings, condition=None) -> EventToProfile:
+    return EventToProfile(
+        id="1",
+        name="Copy",
+        event_type="purchase",
+        enabled=True,
+        config={"condition": condition} if condition else {},
+        event_to_profile=[{
+            "event": {"value": event_ref, "ref": True},
+            "profile": {"value": profile_ref, "ref": True},
+            "op": op
+        } for event_ref, profile_ref, op in mappings]
+    )
+
+
+def _copy(profile, events, plans, console_log=None):
+    copier = EventToProfileCopier(profile, None, console_log if console_log is not None else ConsoleLog())
+    for event in events:
+        copier.copy(event, dotty(event.dict()), plans)
+    return copier.commit()
+
+
+def test_should_copy_all_events_and_track_changes():
+    profile = Profile(id="1", traits={"public": {"city": "Paris"}})
+    profile.reset_changes()
+
+    plans = [CopyPlan(_schema([
+        ("properties.product", "traits.public.products", APPEND),
+        ("properties.city", "traits.public.city", EQUALS_IF_NOT_EXISTS),
+        ("properties.name", "pii.name", EQUALS),
+    ]))]
+    events = [_event("1", {"product": "a", "city": "Berlin", "name": "John"}),
+              _event("2", {"product": "b", "city": "Berlin", "name": "Anna"})]
+
+    assert _copy(profile, events, plans) is True
+    assert profile.traits.public == {"city": "Paris", "products": ["a", "b"]}
+    assert profile.pii.name == "Anna"
+    assert profile.get_changes() == {"traits.public.products", "pii.name"}
+
+
+def test_should_copy_only_if_condition_is_met():
+    profile = Profile(id="1")
+    plans = [CopyPlan(_schema([("properties.value", "traits.public.value", EQUALS)],
+                              condition='event@properties.value > 1'))]
+
+    _copy(profile, [_event("1", {"value": 2}), _event("2", {"value": 1})], plans)
+    assert profile.traits.public == {"value": 2}
+
+
+def test_should_not_change_profile_if_copied_data_is_invalid():
+    profile = Profile(id="1")
+    profile.reset_changes()
+    console_log = ConsoleLog()
+    plans = [CopyPlan(_schema([
+        ("properties.visits", "stats.visits", EQUALS),
+        ("properties.missing", "aux.value", EQUALS),
+    ]))]
+
+    assert _copy(profile, [_event("1", {"visits": "many"})], plans, console_log) is False
+    assert not profile.has_changes()
+    assert [log.type for log in console_log] == ["warning", "error"]
+
+
+def test_should_drop_only_data_of_event_with_invalid_data():
+    profile = Profile(id="1")
+    console_log = ConsoleLog()
+    plans = [CopyPlan(_schema([
+        ("properties.visits", "stats.visits", EQUALS),
+        ("properties.product", "traits.public.products", APPEND),
+    ]))]
+    events = [_event("1", {"visits": 1, "product": "a"}),
+              _event("2", {"visits": "many", "product": "b"}),
+              _event("3", {"product": "c"})]
+
+    assert _copy(profile, events, plans, console_log) is False
+    assert profile.stats.visits == 1
+    assert profile.traits.public == {"products": ["a", "c"]}
+    assert [(log.type, log.event_id) for log in console_log] == [("warning", "3"), ("error", "2")]
+
+
+def test_should_compile_copy_schemas_once():
+    schemas = StorageRecords()
+    schemas.set_data(records=[{"_id": "1", "_index": "index", "_source": _schema([]).dict()}], total=1)
+
+    assert get_copy_plans("purchase", schemas) is get_copy_plans("purchase", schemas)
+
+
+def _copy_with_profile_rebuild(profile: Profile, events, schema: EventToProfile) -> Profile:
+    # Copy the way it was done before copy plans: the whole profile is converted and validated for every event.
+    for event in events:
+        flat_profile = dotty(profile.dict())
+        flat_event = dotty(event.dict())
+        for event_ref, profile_ref, operation in schema.items():
+            flat_profile[profile_ref] = flat_event[event_ref]
+        profile = Profile(**flat_profile)
+    return profile
+
+
+def test_should_validate_profile_once_for_all_events(monkeypatch):
+    schema = _schema([(f"properties.value{i}", f"traits.public.value{i}", EQUALS) for i in range(20)])
+    events = [_event(str(n), {f"value{i}": n * i for i in range(20)}) for n in range(50)]
+    profile = Profile(id="1")
+
+    calls = {"init": 0, "update_fields": 0}
+    init = Profile.__init__
+    update_fields = Profile.update_fields
+
+    def counting_init(self, **data):
+        calls["init"] += 1
+        init(self, **data)
+
+    def counting_update_fields(self, data):
+        calls["update_fields"] += 1
+        update_fields(self, data)
+
+    monkeypatch.setattr(Profile, "__init__", counting_init)
+    monkeypatch.setattr(Profile, "update_fields", counting_update_fields)
+
+    assert _copy(profile, events, [CopyPlan(schema)]) is True
+    assert calls == {"init": 0, "update_fields": 1}
+    assert profile.traits.public["value19"] == 49 * 19
+
+
+@pytest.mark.benchmark
+def test_event_to_profile_copy_benchmark():
+    schema = _schema([(f"properties.value{i}", f"traits.public.value{i}", EQUALS) for i in range(20)])
+    events = [_event(str(n), {f"value{i}": n * i for i in range(20)}) for n in range(50)]
+    traits = {"public": {f"trait{i}": {"nested": list(range(20))} for i in range(100)}}
+
+    profile = Profile(id="1", traits=traits)
+    start = perf_counter()
+    rebuilt_profile = _copy_with_profile_rebuild(profile, events, schema)
+    rebuild_time = perf_counter() - start
+
+    profile = Profile(id="1", traits=traits)
+    start = perf_counter()
+    _copy(profile, events, [CopyPlan(schema)])
+    plan_time = perf_counter() - start
+
+    assert profile.traits == rebuilt_profile.traits
+    assert plan_time < rebuild_time
@@ -0,0 +1,66 @@
+from tracardi.domain.flow import Flow
+from tracardi.process_engine.action.v1.end_action import EndAction
+from tracardi.process_engine.action.v1.flow.start.start_action import StartAction
+from tracardi.process_engine.action.v1.increase_views_action import IncreaseViewsAction
+from tracardi.service.wf.service.builders import action
+from tracardi.service.wf.service.execution_plan_cache import get_execution_plan, invalidate_execution_plan
+
+
+def _build_flow(id) -> Flow:
+    start = action(StartAction)
+    increase_views = action(IncreaseViewsAction)
+    end = action(EndAction)
+
+    flow = Flow.build("Plan cache - flow", id=id)
+    flow += start('payload') >> increase_views('payload')
+    flow += increase_views('payload') >> end('payload')
+    return flow
+
+
+def test_should_cache_plan_of_production_flow():
+    flow = _build_flow("plan-cache-1")
+    flow.set_revision("rev-1")
+
+    plan = get_execution_plan(flow)
+    assert get_execution_plan(flow) is plan
+    assert len(plan) == 3
+    assert plan.plugin_classes[plan.graph[0].id] is StartAction
+    assert plan.get_node_by_id(plan.graph[2].id) is plan.graph[2]
+
+    # New revision
+    flow.set_revision("rev-2")
+    assert get_execution_plan(flow) is not plan
+
+
+def test_should_invalidate_plan():
+    flow = _build_flow("plan-cache-2")
+    flow.set_revision("rev-1")
+
+    plan = get_execution_plan(flow)
+    invalidate_execution_plan(flow.id)
+    assert get_execution_plan(flow) is not plan
+
+
+def test_should_not_cache_draft_flow():
+    flow = _build_flow("plan-cache-3")
+    assert flow.get_revision() is None
+    assert get_execution_plan(flow) is not get_execution_plan(flow)
+
+
+def test_invokers_should_not_share_nodes_and_edges():
+    flow = _build_flow("plan-cache-4")
+    flow.set_revision("rev-1")
+
+    plan = get_execution_plan(flow)
+    invoker1 = plan.make_invoker()
+    invoker2 = plan.make_invoker(debug=True)
+
+    assert invoker1.graph[0] is not invoker2.graph[0]
+    assert invoker2.debug is True
+
+    # Disabling out edges of the start node in one invoker disables the input edges of the next node
+    # in the same invoker only.
+    invoker1.graph[0].graph.out_edges.set_edges(False)
+    assert not list(invoker1.graph[1].graph.in_edges.get_enabled_edges())
+    assert list(invoker2.graph[1].graph.in_edges.get_enabled_edges())
+    assert list(plan.graph[1].graph.in_edges.get_enabled_edges())
@@ -0,0 +1,128 @@
+import asyncio
+
+from tracardi.domain.event import Event, EventSession
+from tracardi.domain.event_metadata import EventMetadata
+from tracardi.domain.flow import Flow
+from tracardi.domain.profile import Profile
+from tracardi.domain.resource import Resource
+from tracardi.domain.time import EventTime
+from tracardi.process_engine.action.v1.end_action import EndAction
+from tracardi.process_engine.action.v1.flow.start.start_action import StartAction
+from tracardi.process_engine.action.v1.increase_views_action import IncreaseViewsAction
+from tracardi.service.plugin.domain.result import Result
+from tracardi.service.plugin.runner import ActionRunner
+from tracardi.service.wf.domain.debug_info import DebugInfo, FlowDebugInfo
+from tracardi.service.wf.domain.entity import Entity
+from tracardi.service.wf.domain import graph_invoker
+from tracardi.service.wf.service.builders import action
+from tracardi.service.wf.service.execution_plan_cache import compile_execution_plan
+
+
+class StartPlugin(ActionRunner):
+
+    async def run(self, payload: dict, in_edge=None):
+        return Result(port="payload", value=payload)
+
+
+class VendorPlugin(ActionRunner):
+    running = 0
+    max_running = 0
+
+    async def run(self, payload: dict, in_edge=None):
+        VendorPlugin.running += 1
+        VendorPlugin.max_running = max(VendorPlugin.running, VendorPlugin.max_running)
+        await asyncio.sleep(0.05)
+        VendorPlugin.running -= 1
+        return Result(port="payload", value={**payload, self.node.id: True})
+
+
+class EndPlugin(ActionRunner):
+    payloads = []
+
+    async def run(self, payload: dict, in_edge=None):
+        EndPlugin.payloads.append(payload)
+        return None
+
+
+def _event() -> Event:
+    return Event(id="1",
+                 type="purchase",
+                 metadata=EventMetadata(time=EventTime()),
+                 source=Resource(id="3", type="event"),
+                 properties={},
+                 context={},
+                 profile=Profile(id="1"),
+                 session=EventSession(id="2"))
+
+
+class FailingPlugin(ActionRunner):
+
+    async def run(self, payload: dict, in_edge=None):
+        raise ValueError("Vendor failed.")
+
+
+class LoggingPlugin(ActionRunner):
+
+    async def run(self, payload: dict, in_edge=None):
+        self.console.log("Vendor called.")
+        return Result(port="payload", value=payload)
+
+
+async def _run_fan_out_flow(vendors: int, vendor_classes: list = None):
+    start = action(StartAction)
+    vendor_nodes = [action(IncreaseViewsAction) for _ in range(vendors)]
+    end = action(EndAction)
+
+    flow = Flow.build("Fan out - flow", id="fan-out")
+    for vendor in vendor_nodes:
+        flow += start('payload') >> vendor('payload')
+        flow += vendor('payload') >> end('payload')
+
+    plan = compile_execution_plan(flow)
+    plan.plugin_classes = {start.id: StartPlugin, end.id: EndPlugin,
+                           **{vendor.id: VendorPlugin for vendor in vendor_nodes}}
+    if vendor_classes is not None:
+        plan.plugin_classes.update({vendor.id: vendor_class for vendor, vendor_class in zip(vendor_nodes,
+                                                                                            vendor_classes)})
+
+    invoker = plan.make_invoker()
+    event = _event()
+    debug_info = DebugInfo(timestamp=0, flow=FlowDebugInfo(id=flow.id, name=flow.name), event=Entity(id=event.id))
+    await invoker.init(debug_info, [], flow, None, event, None, None, None, [])
+    return await invoker.run({}, event, None, None, debug_info, [])
+
+
+def _run(vendors: int, concurrency: int):
+    VendorPlugin.max_running = 0
+    EndPlugin.payloads = []
+    graph_invoker.tracardi.flow_node_concurrency = concurrency
+    asyncio.run(_run_fan_out_flow(vendors))
+
+
+def test_should_run_independent_branches_concurrently():
+    concurrency = graph_invoker.tracardi.flow_node_concurrency
+    try:
+        _run(3, concurrency=1)
+        assert VendorPlugin.max_running == 1
+        assert len(EndPlugin.payloads) == 3
+
+        _run(3, concurrency=10)
+        assert VendorPlugin.max_running == 3
+        assert len(EndPlugin.payloads) == 3
+
+        _run(3, concurrency=2)
+        assert VendorPlugin.max_running == 2
+        assert len(EndPlugin.payloads) == 3
+    finally:
+        graph_invoker.tracardi.flow_node_concurrency = concurrency
+
+
+def test_should_keep_logs_of_nodes_running_with_failed_node(monkeypatch):
+    monkeypatch.setattr(graph_invoker.tracardi, "flow_node_concurrency", 10)
+    EndPlugin.payloads = []
+
+    _, log_list, _, _ = asyncio.run(_run_fan_out_flow(2, [FailingPlugin, LoggingPlugin]))
+
+    assert [log.type for log in log_list if "Vendor failed." in log.message] == ["error"]
+    assert [log.message for log in log_list if log.message == "Vendor called."] == ["Vendor called."]
+    assert EndPlugin.payloads == []
@@ -0,0 +1,89 @@
+from datetime import datetime
+
+import requests
+
+from tracardi.worker.service.import_dispatcher import ImportDispatcher
+from tracardi.worker.service.worker.mysql_worker import MySQLImporter
+
+
+class FakeResponse:
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.text = ""
+
+
+class FakeSession:
+
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.posted = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def post(self, url, json, verify, timeout):
+        self.posted.append((url, json))
+        status = self.statuses.get(json['id'], [200]).pop(0)
+        if status is None:
+            raise requests.ConnectionError("Connection refused")
+        return FakeResponse(status)
+
+
+class FakeImporter:
+
+    def data(self, credentials):
+        yield [{"id": 1}, {"id": 2}], 50, 1
+        yield [{"id": 3}], 100, 2
+
+
+class FakeDispatcher(ImportDispatcher):
+
+    def __init__(self, session: FakeSession):
+        super().__init__(None, FakeImporter(), "/collect/import/1", concurrency=2, retries=2, retry_backoff=0)
+        self.session = session
+
+    def _get_session(self):
+        return self.session
+
+
+def test_should_report_progress_per_batch_and_retry_failed_records():
+    session = FakeSession({2: [503, None, 200], 3: [400]})
+
+    assert list(FakeDispatcher(session).run("http://localhost:8686/")) == [(50, 1), (100, 2)]
+    assert sorted(data['id'] for _, data in session.posted) == [1, 2, 2, 2, 3]
+    assert {url for url, _ in session.posted} == {"http://localhost:8686/collect/import/1"}
+
+
+class FakeCursor:
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+        self._result = []
+
+    def execute(self, sql, params=None):
+        self.queries.append(sql)
+        if "WHERE" in sql:
+            last_id, size = params
+            self._result = [row for row in self.rows if row['id'] > last_id][:size]
+        else:
+            self._result = self.rows[:params[0]]
+
+    def fetchall(self):
+        return self._result
+
+
+def test_mysql_importer_should_read_table_by_primary_key():
+    importer = MySQLImporter(database_name={"id": "db", "name": "db"}, table_name={"id": "t", "name": "t"},
+                             batch=2)
+    cursor = FakeCursor([{"id": id, "date": datetime(2022, 1, id)} for id in range(1, 6)])
+
+    batches = list(importer._read_by_key(cursor, ["id"]))
+    assert [[row['id'] for row in rows] for rows in batches] == [[1, 2], [3, 4], [5]]
+    assert all("LIMIT %s" in query and "OFFSET" not in query for query in cursor.queries)
+    assert importer._to_json_data(batches[0][0]) == {"id": 1, "date": "2022-01-01 00:00:00"}
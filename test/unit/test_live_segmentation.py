@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from tracardi.domain.storage_record import StorageRecord, RecordMetadata
+from tracardi.service import live_segmentation
+from tracardi.service.live_segmentation import LiveSegmentation
+from tracardi.service.storage.drivers.elastic import profile as profile_db, segment as segment_db
+from tracardi.service.storage.redis.collections import Queue
+
+
+class FakeCheckpoint:
+
+    def __init__(self, finished_slices=None):
+        self.finished = set(finished_slices or [])
+        self.cleared = False
+
+    async def finished_slices(self):
+        return set(self.finished)
+
+    async def finish(self, slice_id: int):
+        self.finished.add(slice_id)
+
+    async def clear(self):
+        self.finished = set()
+        self.cleared = True
+
+
+def _profile(id: int, visits: int, segments) -> StorageRecord:
+    record = StorageRecord(id=str(id), stats={"visits": visits}, segments=segments)
+    return record.set_meta_data(RecordMetadata(id=str(id), index="profile-index", seq_no=1, primary_term=1))
+
+
+def _patch_storage(monkeypatch, profiles, conflicts=()):
+    updates = {}
+    scanned_slices = []
+
+    async def load_enabled_segments(limit=1000):
+        return [{"id": "1", "name": "Frequent", "condition": "profile@stats.visits > 5"},
+                {"id": "2", "name": "New", "condition": "profile@stats.visits == 0"},
+                {"id": "3", "name": "Broken", "condition": "profile@stats.visits >"}]
+
+    async def count(query=None):
+        return {"count": len(profiles)}
+
+    async def scan_slice(slice_id, slices, batch=1000):
+        scanned_slices.append(slice_id)
+        for number, profile in enumerate(profiles):
+            if number % slices == slice_id:
+                yield profile
+
+    async def update_segments(changes):
+        responses = []
+        for metadata, segments in changes:
+            if metadata.id in conflicts:
+                responses.append((False, {"update": {"status": 409}}))
+            else:
+                updates[metadata.id] = segments
+                responses.append((True, {"update": {"status": 200}}))
+        return responses
+
+    monkeypatch.setattr(segment_db, "load_enabled_segments", load_enabled_segments)
+    monkeypatch.setattr(profile_db, "count", count)
+    monkeypatch.setattr(profile_db, "scan_slice", scan_slice)
+    monkeypatch.setattr(profile_db, "update_segments", update_segments)
+    return updates, scanned_slices
+
+
+def _profiles():
+    return [_profile(number, visits=number, segments=["vip", "frequent"] if number % 2 else [])
+            for number in range(10)]
+
+
+def test_should_update_only_changed_segments(monkeypatch):
+    updates, _ = _patch_storage(monkeypatch, _profiles(), conflicts={"0"})
+    checkpoint = FakeCheckpoint()
+    stats = asyncio.run(LiveSegmentation(slices=2, processes=0, batch_size=3, checkpoint=checkpoint,
+                                         remove_unmatched=True).run())
+
+    assert updates == {
+        "1": ["vip"], "3": ["vip"], "5": ["vip"],
+        "6": ["frequent"], "8": ["frequent"]
+    }
+    assert (stats.processed, stats.changed, stats.conflicts, stats.errors) == (10, 5, 1, 10)
+    assert checkpoint.cleared
+
+
+def test_should_evaluate_segments_in_process_pool(monkeypatch):
+    updates, _ = _patch_storage(monkeypatch, _profiles())
+    stats = asyncio.run(LiveSegmentation(slices=1, processes=2, batch_size=4, checkpoint=FakeCheckpoint()).run())
+
+    assert stats.processed == 10
+    assert "9" not in updates
+    assert updates["0"] == ["new"] and updates["6"] == ["frequent"]
+
+
+def test_should_resume_from_unfinished_slices(monkeypatch):
+    _, scanned_slices = _patch_storage(monkeypatch, _profiles())
+    stats = asyncio.run(LiveSegmentation(slices=4, processes=0, checkpoint=FakeCheckpoint({0, 2})).run())
+
+    assert sorted(scanned_slices) == [1, 3]
+    assert stats.processed == 5
+    assert stats.total == 5
+
+
+def test_segments_should_be_kept_if_not_removed(monkeypatch):
+    updates, _ = _patch_storage(monkeypatch, _profiles())
+    asyncio.run(LiveSegmentation(slices=1, processes=0, checkpoint=FakeCheckpoint()).run())
+
+    # Profiles 1, 3 and 5 keep segment frequent.
+    assert updates == {"0": ["new"], "6": ["frequent"], "8": ["frequent"]}
+
+
+def test_worker_should_run_scheduled_live_segmentation(monkeypatch, async_redis_client):
+    jobs = []
+
+    class FakeLiveSegmentation:
+
+        def __init__(self, remove_unmatched: bool):
+            self.remove_unmatched = remove_unmatched
+
+        async def run(self, resume: bool):
+            jobs.append((resume, self.remove_unmatched))
+            # Stops the worker after the first job.
+            raise asyncio.CancelledError()
+
+    async def stop():
+        pass
+
+    monkeypatch.setattr(live_segmentation, "AsyncRedisClient", lambda: async_redis_client)
+    monkeypatch.setattr(live_segmentation, "LiveSegmentation", FakeLiveSegmentation)
+    monkeypatch.setattr(live_segmentation.log_shipper, "stop", stop)
+
+    async def main():
+        await live_segmentation.schedule_live_segmentation(resume=False, remove_unmatched=True)
+        await live_segmentation.live_segmentation_worker()
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(main())
+
+    assert jobs == [(False, True)]
+    assert async_redis_client.client.redis.data[Queue.segmentation] == []
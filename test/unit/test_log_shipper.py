@@ -0,0 +1,150 @@
+import asyncio
+import logging
+
+from tracardi.domain.console import Console
+from tracardi.exceptions.log_handler import ElasticLogHandler
+from tracardi.service import logger_manager
+from tracardi.service.console_log import ConsoleLog
+from tracardi.service.logger_manager import LogShipper
+
+
+class FakeLogDriver:
+
+    def __init__(self, exists: bool):
+        self.index_exists = exists
+        self.exists_calls = 0
+        self.saved = []
+
+    async def exists(self):
+        self.exists_calls += 1
+        return self.index_exists
+
+    async def save(self, logs):
+        self.saved.append(logs)
+
+
+class FakeConsoleLogDriver:
+
+    def __init__(self):
+        self.saved = []
+
+    async def save_all(self, logs):
+        self.saved.append(logs)
+
+
+class FakeDriver:
+
+    def __init__(self, exists: bool):
+        self.log = FakeLogDriver(exists)
+        self.console_log = FakeConsoleLogDriver()
+
+
+class FakeStorage:
+
+    def __init__(self, exists: bool = True):
+        self.driver = FakeDriver(exists)
+
+
+def _console_log(size) -> ConsoleLog:
+    console_log = ConsoleLog()
+    for n in range(size):
+        console_log.append(Console(origin='event', class_name='Test', module='test', type='error',
+                                   message=str(n), traceback=[]))
+    return console_log
+
+
+def _log(handler: ElasticLogHandler, message: str):
+    handler.emit(logging.LogRecord('test', logging.ERROR, 'test.py', 1, message, None, None))
+
+
+def test_log_handler_should_drop_oldest_logs_when_full():
+    handler = ElasticLogHandler(max_size=3)
+    for n in range(5):
+        _log(handler, str(n))
+
+    assert [log['message'] for log in handler.collection] == ['2', '3', '4']
+    assert handler.dropped == 2
+    assert [log['message'] for log in handler.drain(2)] == ['2', '3']
+    assert len(handler.collection) == 1
+
+
+def test_should_save_logs_in_batches(monkeypatch):
+    storage = FakeStorage()
+    handler = ElasticLogHandler(max_size=100)
+    monkeypatch.setattr(logger_manager, 'storage', storage)
+    monkeypatch.setattr(logger_manager, 'log_handler', handler)
+
+    async def main():
+        shipper = LogShipper(interval=0.05, batch_size=2, max_size=3)
+        for _ in range(3):
+            shipper.ship_console_log(_console_log(2))
+            _log(handler, 'error')
+
+        assert shipper.dropped_console_logs == 3
+        assert storage.driver.console_log.saved == []
+
+        await asyncio.sleep(0.1)
+        assert [len(batch) for batch in storage.driver.console_log.saved] == [2, 1]
+        assert [len(batch) for batch in storage.driver.log.saved] == [2, 1]
+
+        _log(handler, 'error')
+        await shipper.stop()
+        assert [len(batch) for batch in storage.driver.log.saved] == [2, 1, 1]
+        assert storage.driver.log.exists_calls == 1
+
+    asyncio.run(main())
+
+
+def test_should_keep_logs_until_log_index_exists(monkeypatch):
+    storage = FakeStorage(exists=False)
+    handler = ElasticLogHandler(max_size=100)
+    monkeypatch.setattr(logger_manager, 'storage', storage)
+    monkeypatch.setattr(logger_manager, 'log_handler', handler)
+
+    async def main():
+        shipper = LogShipper(interval=10, batch_size=10)
+        _log(handler, 'error')
+
+        await shipper.flush()
+        assert storage.driver.log.saved == []
+        assert len(handler.collection) == 1
+
+        storage.driver.log.index_exists = True
+        await shipper.flush()
+        assert [len(batch) for batch in storage.driver.log.saved] == [1]
+
+    asyncio.run(main())
+
+
+def test_should_save_buffered_logs_when_event_loop_closes(monkeypatch):
+    storage = FakeStorage()
+    monkeypatch.setattr(logger_manager, 'storage', storage)
+
+    async def main():
+        shipper = LogShipper(interval=10, batch_size=10)
+        shipper.ship_console_log(_console_log(2))
+        await asyncio.sleep(0)
+
+    # Event loop cancels the shipper task when it closes.
+    asyncio.run(main())
+    assert [len(batch) for batch in storage.driver.console_log.saved] == [2]
+
+
+def test_save_logs_should_save_logs_at_once(monkeypatch):
+    storage = FakeStorage(exists=False)
+    handler = ElasticLogHandler(max_size=100)
+    monkeypatch.setattr(logger_manager, 'storage', storage)
+    monkeypatch.setattr(logger_manager, 'log_handler', handler)
+    monkeypatch.setattr(logger_manager, 'log_shipper', LogShipper(interval=10, batch_size=10))
+    monkeypatch.setattr(logger_manager.tracardi, 'save_logs', True)
+
+    async def main():
+        _log(handler, 'error')
+        assert await logger_manager.save_logs() is False
+
+        storage.driver.log.index_exists = True
+        assert await logger_manager.save_logs() is True
+        assert [len(batch) for batch in storage.driver.log.saved] == [1]
+        assert await logger_manager.save_logs() is None
+
+    asyncio.run(main())
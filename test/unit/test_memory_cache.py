@@ -1,3 +1,4 @@
+import asyncio
 from time import sleep
 
 import pytest
@@ -75,3 +76,108 @@ def test_should_be_purged():
     assert not cache.memory_buffer
 
     print(cache.memory_buffer)
+
+
+def test_should_evict_least_recently_used():
+    cache = MemoryCache("test", max_pool=2)
+    cache['test1'] = CacheItem(data='xxx', ttl=10)
+    cache['test2'] = CacheItem(data='yyy', ttl=10)
+
+    # Use test1 so test2 becomes the least recently used
+    assert cache['test1'].data == 'xxx'
+    cache['test3'] = CacheItem(data='zzz', ttl=10)
+
+    assert 'test1' in cache
+    assert 'test2' not in cache
+    assert 'test3' in cache
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_should_share_concurrent_loads():
+    cache = MemoryCache("test")
+    calls = []
+
+    async def load(value):
+        calls.append(value)
+        await asyncio.sleep(0.1)
+        return value
+
+    async def main():
+        return await asyncio.gather(*[MemoryCache.cache(cache, 'key', 10, load, True, 'xxx') for _ in range(10)])
+
+    assert asyncio.run(main()) == ['xxx'] * 10
+    assert calls == ['xxx']
+
+    stats = cache.get_stats()
+    assert stats['misses'] == 10
+    assert stats['loads'] == 1
+    assert stats['shared_loads'] == 9
+
+    assert asyncio.run(MemoryCache.cache(cache, 'key', 10, load, True, 'yyy')) == 'xxx'
+    assert cache.get_stats()['hits'] == 1
+
+
+def test_should_share_load_errors():
+    cache = MemoryCache("test")
+
+    async def load():
+        await asyncio.sleep(0.1)
+        raise ValueError("error")
+
+    async def main():
+        return await asyncio.gather(*[MemoryCache.cache(cache, 'key', 10, load, True) for _ in range(3)],
+                                    return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert 'key' not in cache
+    assert not cache._in_flight
+
+
+def test_should_serve_stale_value_while_reloading():
+    cache = MemoryCache("test", stale_ttl=5)
+    values = iter(['xxx', 'yyy'])
+
+    async def load():
+        return next(values)
+
+    async def main():
+        assert await MemoryCache.cache(cache, 'key', 0.1, load, True) == 'xxx'
+        await asyncio.sleep(0.2)
+        # Expired but within the stale period
+        assert await MemoryCache.cache(cache, 'key', 0.1, load, True) == 'xxx'
+        await asyncio.sleep(0)
+        assert await MemoryCache.cache(cache, 'key', 0.1, load, True) == 'yyy'
+
+    asyncio.run(main())
+    assert cache.get_stats()['stale_hits'] == 1
+
+
+def test_should_not_cancel_shared_load_with_the_first_request():
+    cache = MemoryCache("test")
+
+    async def load():
+        await asyncio.sleep(0.1)
+        return 'xxx'
+
+    async def main():
+        first = asyncio.create_task(MemoryCache.cache(cache, 'key', 10, load, True))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(MemoryCache.cache(cache, 'key', 10, load, True))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == 'xxx'
+        assert first.cancelled()
+
+    asyncio.run(main())
+    assert cache['key'].data == 'xxx'
+
+
+def test_should_replace_item_that_expires_at_the_same_time():
+    cache = MemoryCache("test")
+    cache['test'] = CacheItem(data='xxx', ttl=10)
+    item = CacheItem(data='yyy', ttl=10)
+    item.ttl = cache['test'].ttl
+    cache['test'] = item
+
+    assert cache['test'].data == 'yyy'
@@ -0,0 +1,80 @@
+import asyncio
+
+from tracardi.service.metrics import MetricsRegistry, MetricsExporter, Histogram, NODE_RUN
+
+
+def test_histogram_should_count_values_in_buckets():
+    histogram = Histogram(buckets=(0.1, 1.))
+    for value in [0.05, 0.1, 0.5, 2.]:
+        histogram.observe(value)
+
+    assert histogram.count == 4
+    assert histogram.sum == 2.65
+    assert histogram.cumulative_counts() == [2, 3, 4]
+    assert histogram.quantile(.5) == 0.1
+    assert histogram.quantile(.75) == 1.
+    assert histogram.quantile(.99) == float('inf')
+    assert Histogram().quantile(.99) is None
+
+
+def test_registry_should_keep_histogram_per_labels():
+    registry = MetricsRegistry(buckets=(0.1, 1.))
+    registry.observe(NODE_RUN, 0.5, flow="f1", node="n1", plugin="A")
+    registry.observe(NODE_RUN, 0.5, flow="f1", node="n1", plugin="A")
+    registry.observe(NODE_RUN, 0.05, flow="f1", node="n2", plugin="B")
+
+    with registry.time(NODE_RUN, flow="f1", node="n2", plugin="B"):
+        pass
+
+    collected = {labels: histogram.count for _, labels, histogram in registry.collect()}
+    assert collected == {
+        (("flow", "f1"), ("node", "n1"), ("plugin", "A")): 2,
+        (("flow", "f1"), ("node", "n2"), ("plugin", "B")): 2
+    }
+
+
+def test_disabled_registry_should_not_observe():
+    registry = MetricsRegistry(enabled=False)
+    registry.observe(NODE_RUN, 0.5)
+    with registry.time(NODE_RUN):
+        pass
+    assert registry.collect() == []
+    assert registry.to_prometheus() == ""
+
+
+def test_registry_should_render_prometheus_text():
+    registry = MetricsRegistry(buckets=(0.1, 1.))
+    registry.observe(NODE_RUN, 0.5, flow='f"1', plugin="A")
+
+    lines = registry.to_prometheus().splitlines()
+
+    assert f"# TYPE {NODE_RUN} histogram" in lines
+    assert f'{NODE_RUN}_bucket{{flow="f\\"1",plugin="A",le="0.1"}} 0' in lines
+    assert f'{NODE_RUN}_bucket{{flow="f\\"1",plugin="A",le="1.0"}} 1' in lines
+    assert f'{NODE_RUN}_bucket{{flow="f\\"1",plugin="A",le="+Inf"}} 1' in lines
+    assert f'{NODE_RUN}_sum{{flow="f\\"1",plugin="A"}} 0.5' in lines
+    assert f'{NODE_RUN}_count{{flow="f\\"1",plugin="A"}} 1' in lines
+
+
+def test_registry_should_call_exporters():
+    class BrokenExporter(MetricsExporter):
+        async def export(self, registry):
+            raise ValueError("error")
+
+    class ListExporter(MetricsExporter):
+        def __init__(self):
+            self.exported = []
+
+        async def export(self, registry):
+            self.exported.append(registry.to_prometheus())
+
+    registry = MetricsRegistry()
+    registry.observe(NODE_RUN, 0.5)
+    exporter = ListExporter()
+    registry.add_exporter(BrokenExporter())
+    registry.add_exporter(exporter)
+
+    asyncio.run(registry.export())
+
+    assert len(exporter.exported) == 1
+    assert exporter.exported[0] == registry.to_prometheus()
@@ -0,0 +1,219 @@
+import asyncio
+
+from tracardi.domain.flow import Flow
+from tracardi.domain.resource import Resource
+from tracardi.process_engine.action.v1.end_action import EndAction
+from tracardi.process_engine.action.v1.flow.start.start_action import StartAction
+from tracardi.process_engine.action.v1.increase_views_action import IncreaseViewsAction
+from tracardi.service.plugin.domain.result import Result
+from tracardi.service.plugin.runner import ActionRunner
+import tracardi.service.wf.service.life_cycle as life_cycle
+from tracardi.service.wf.domain import graph_invoker
+from tracardi.service.wf.domain.graph_invoker import GraphInvoker
+from tracardi.service.wf.domain.tasks_results import ActionsResults
+from tracardi.service.wf.service.builders import action
+from tracardi.service.wf.service.execution_plan_cache import get_execution_plan
+from tracardi.service.wf.service.plugin_instance_pool import PluginInstancePool, plugin_instances
+
+
+class ReusablePlugin(ActionRunner):
+    reusable = True
+    set_ups = 0
+    closed = 0
+
+    async def set_up(self, init):
+        ReusablePlugin.set_ups += 1
+
+    async def run(self, payload: dict, in_edge=None):
+        return None
+
+    async def close(self):
+        ReusablePlugin.closed += 1
+
+
+def _build_flow(id) -> Flow:
+    start = action(StartAction)
+    increase_views = action(IncreaseViewsAction)
+    end = action(EndAction)
+
+    flow = Flow.build("Plugin instance pool - flow", id=id)
+    flow += start('payload') >> increase_views('payload')
+    flow += increase_views('payload') >> end('payload')
+    return flow
+
+
+async def _invoke(flow: Flow, node_id: str, init: dict = None) -> ActionRunner:
+    plan = get_execution_plan(flow)
+    plan.plugin_classes[node_id] = ReusablePlugin
+
+    invoker = plan.make_invoker()
+    if init is not None:
+        invoker.graph[plan.node_index[node_id]].init = init
+    await invoker.init(None, [], flow, None, None, None, None, None, [])
+    node = invoker.graph[plan.node_index[node_id]]
+    await life_cycle.plugin.execute(node, {"payload": {}})
+    plugin = node.object
+    await invoker.close()
+    return plugin
+
+
+def test_should_set_up_reusable_plugin_once_per_flow_revision_and_node():
+    ReusablePlugin.set_ups = 0
+    ReusablePlugin.closed = 0
+
+    async def main():
+        flow = _build_flow("plugin-instance-pool-1")
+        flow.set_revision("rev-1")
+        node_id = get_execution_plan(flow).graph[1].id
+
+        plugin = await _invoke(flow, node_id)
+        assert plugin.profile is None
+        assert await _invoke(flow, node_id) is plugin
+        assert ReusablePlugin.set_ups == 1
+        assert ReusablePlugin.closed == 0
+
+        # Drafts are not reused
+        draft = _build_flow("plugin-instance-pool-1")
+        draft_node_id = get_execution_plan(draft).graph[1].id
+        await _invoke(draft, draft_node_id)
+        assert ReusablePlugin.set_ups == 2
+        assert ReusablePlugin.closed == 1
+
+        await plugin_instances.invalidate(flow.id)
+        assert ReusablePlugin.closed == 2
+        assert await _invoke(flow, node_id) is not plugin
+
+        await plugin_instances.invalidate(flow.id)
+
+    asyncio.run(main())
+
+
+def test_should_close_least_recently_used_instances():
+    ReusablePlugin.closed = 0
+
+    async def main():
+        pool = PluginInstancePool(max_instances=2, idle_ttl=60)
+        instances = [ReusablePlugin() for _ in range(3)]
+        for number, instance in enumerate(instances):
+            pool.release(("flow", "rev", str(number), False, None, None), instance)
+
+        await asyncio.sleep(0)
+        assert len(pool) == 2
+        assert ReusablePlugin.closed == 1
+        assert pool.acquire(("flow", "rev", "0", False, None, None)) is None
+        assert pool.acquire(("flow", "rev", "2", False, None, None)) is instances[2]
+        assert len(pool) == 1
+
+    asyncio.run(main())
+
+
+def test_should_close_instances_released_after_invalidation():
+    ReusablePlugin.closed = 0
+
+    async def main():
+        pool = PluginInstancePool(max_instances=10, idle_ttl=60)
+        key = ("flow", "rev", "1", False, "resource-1", None)
+        instance = ReusablePlugin()
+
+        generation = pool.generation
+        await pool.invalidate("flow")
+        pool.release(key, instance, generation)
+        await asyncio.sleep(0)
+        assert len(pool) == 0
+        assert ReusablePlugin.closed == 1
+
+        generation = pool.generation
+        await pool.close_all()
+        pool.release(key, instance, generation)
+        await asyncio.sleep(0)
+        assert ReusablePlugin.closed == 2
+
+        pool.release(key, instance, pool.generation)
+        assert pool.acquire(key) is instance
+
+    asyncio.run(main())
+
+
+def test_should_close_only_instances_of_changed_resource():
+    ReusablePlugin.closed = 0
+
+    async def main():
+        pool = PluginInstancePool(max_instances=10, idle_ttl=60)
+        instances = [ReusablePlugin() for _ in range(3)]
+        keys = [("flow", "rev", "1", False, "resource-1", None),
+                ("flow", "rev", "2", False, "resource-2", None),
+                ("flow", "rev", "3", False, None, None)]
+        generation = pool.generation
+        pool.release(keys[0], instances[0], generation)
+        pool.release(keys[2], instances[2], generation)
+
+        await pool.invalidate_resource("resource-1")
+        await pool.invalidate_resource("resource-2")
+        # Instance of resource 2 was in use when the resource was changed.
+        pool.release(keys[1], instances[1], generation)
+        await asyncio.sleep(0)
+
+        assert ReusablePlugin.closed == 2
+        assert pool.acquire(keys[0]) is None
+        assert pool.acquire(keys[1]) is None
+        assert pool.acquire(keys[2]) is instances[2]
+
+    asyncio.run(main())
+
+
+class FailingPlugin(ReusablePlugin):
+
+    async def run(self, payload: dict, in_edge=None):
+        raise asyncio.CancelledError()
+
+
+def test_should_not_reuse_instance_of_failed_node():
+    ReusablePlugin.closed = 0
+
+    async def main():
+        flow = _build_flow("plugin-instance-pool-2")
+        flow.set_revision("rev-1")
+        plan = get_execution_plan(flow)
+        node_id = plan.graph[1].id
+        plan.plugin_classes[node_id] = FailingPlugin
+
+        invoker = plan.make_invoker()
+        await invoker.init(None, [], flow, None, None, None, None, None, [])
+        start_node = invoker.graph[0]
+        node = invoker.graph[plan.node_index[node_id]]
+        results = GraphInvoker._add_results(ActionsResults(), start_node, Result(port="payload", value={}))
+        async for _ in invoker.run_node(node, {}, results):
+            pass
+        await invoker.close()
+
+        assert ReusablePlugin.closed == 1
+        assert plugin_instances.acquire((flow.id, "rev-1", node_id, invoker.debug, None, None)) is None
+
+    asyncio.run(main())
+
+
+def test_should_not_reuse_instance_with_changed_resource_credentials(monkeypatch):
+    ReusablePlugin.closed = 0
+    resources = {"resource-1": Resource(id="resource-1", type="api", credentials={"production": {"url": "old"}})}
+
+    async def load_resource(resource_id):
+        return resources[resource_id]
+
+    monkeypatch.setattr(graph_invoker, "load_resource", load_resource)
+
+    async def main():
+        flow = _build_flow("plugin-instance-pool-3")
+        flow.set_revision("rev-1")
+        node_id = get_execution_plan(flow).graph[1].id
+        init = {"source": {"id": "resource-1"}}
+
+        plugin = await _invoke(flow, node_id, init)
+        assert await _invoke(flow, node_id, init) is plugin
+
+        # Resource was saved by another worker, so this worker was not invalidated.
+        resources["resource-1"] = Resource(id="resource-1", type="api", credentials={"production": {"url": "new"}})
+        assert await _invoke(flow, node_id, init) is not plugin
+
+        await plugin_instances.invalidate(flow.id)
+
+    asyncio.run(main())
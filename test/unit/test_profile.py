@@ -1,6 +1,73 @@
+import pytest
+from pydantic import ValidationError
+
 from tracardi.domain.profile import Profile
+from tracardi.domain.profile_traits import ProfileTraits
 
 
 def test_profile_must_have_id_in_ids():
     profile = Profile(id="1")
     assert profile.id in profile.ids
+
+
+def test_should_track_changed_fields():
+    profile = Profile(id="1", traits={"public": {"name": "John", "age": 20}})
+    profile.reset_changes()
+    profile.operation.update = False
+
+    profile.segments = []
+    profile.traits = ProfileTraits(public={"name": "John", "age": 20})
+    assert not profile.has_changes()
+
+    profile.traits = ProfileTraits(public={"name": "John", "age": 21, "city": "Paris"})
+    profile.increase_visits()
+
+    assert profile.get_changes() == {"traits.public.age", "traits.public.city", "stats.visits"}
+    assert profile.operation.update is True
+
+
+def test_should_track_changes_of_replaced_profile():
+    profile = Profile(id="1", segments=["a", "b"])
+    profile.reset_changes()
+
+    same_profile = Profile(**profile.dict())
+    same_profile.segments = ["b", "a"]
+    profile.replace(same_profile)
+    assert not profile.has_changes()
+
+    profile.replace(Profile(id="1", segments=["a"], aux={"key": "value"}))
+    assert profile.get_changes() == {"segments", "aux.key"}
+
+
+def test_should_update_valid_fields_only():
+    profile = Profile(id="1")
+    profile.reset_changes()
+
+    with pytest.raises(ValidationError):
+        profile.update_fields({"stats": {"visits": "many"}, "aux": {"key": "value"}})
+    assert not profile.has_changes()
+
+    profile.update_fields({"stats": {"visits": "2"}, "unknown": 1})
+    assert profile.stats.visits == 2
+    assert profile.get_changes() == {"stats.visits"}
+
+
+def test_should_return_partial_update_of_changes():
+    profile = Profile(id="1", traits={"public": {"name": "John", "city": "Paris"}})
+    profile.reset_changes()
+
+    profile.traits = ProfileTraits(public={"name": "Anna"})
+    profile.aux = {"key": {"nested": 1}}
+
+    values, removed = profile.get_partial_update("stats.visits")
+    assert values == {"traits.public.name": "Anna", "aux.key": {"nested": 1}, "stats.visits": 0}
+    assert removed == {"traits.public.city"}
+
+    # Marked path replaces changes inside it.
+    profile.mark_dirty("traits.public")
+    values, removed = profile.get_partial_update()
+    assert values == {"traits.public": {"name": "Anna"}, "aux.key": {"nested": 1}}
+    assert removed == set()
+
+    profile.mark_dirty("traits.unknown.key")
+    assert profile.get_partial_update() is None
@@ -0,0 +1,104 @@
+import asyncio
+
+from tracardi.domain.profile import Profile
+from tracardi.domain.segment import Segment
+from tracardi.service import segmentation
+from tracardi.service.segmentation import SegmentIndex, segment_profile, get_segment_index, invalidate_segments
+
+
+def _segment(id, condition, event_types=None, enabled=True) -> Segment:
+    return Segment(id=id, name=id, condition=condition, eventType=event_types, enabled=enabled)
+
+
+def _index() -> SegmentIndex:
+    return SegmentIndex([
+        _segment("visits", "profile@stats.visits > 1"),
+        _segment("city", 'profile@traits.public.city == "Paris"', event_types=["purchase"]),
+        _segment("event", 'event@type == "purchase"'),
+        _segment("disabled", "profile@stats.visits > 1", enabled=False),
+    ])
+
+
+def _segment_profile(profile: Profile, event_types, index: SegmentIndex, force=False) -> list:
+    async def main():
+        return [result async for result in segment_profile(profile, event_types, index, force)]
+    return asyncio.run(main())
+
+
+def test_should_index_segments_by_profile_data():
+    index = _index()
+    assert len(index) == 3
+    assert [segment.id for segment in index.get_segments_reading({"stats.visits"})] == ["event", "visits"]
+    assert [segment.id for segment in index.get_segments_reading({"traits"})] == ["event", "city"]
+    assert [segment.id for segment in index.get_segments_reading({"traits.private.name"})] == ["event"]
+    assert len(index.get_segments_reading(None)) == 3
+
+
+def test_should_evaluate_only_segments_reading_changed_data():
+    profile = Profile(id="1", traits={"public": {"city": "Paris"}})
+    profile.reset_changes()
+    profile.increase_visits(2)
+
+    results = _segment_profile(profile, ["purchase"], _index())
+
+    # City segment does not read visits so it is not evaluated.
+    assert results == [("purchase", "visits", None)]
+    assert profile.segments == ["visits"]
+
+
+def test_should_evaluate_all_segments_when_forced():
+    profile = Profile(id="1", traits={"public": {"city": "Paris"}})
+    profile.reset_changes()
+    profile.increase_visits(2)
+
+    results = _segment_profile(profile, ["purchase"], _index(), force=True)
+    assert {id for _, id, error in results if error is None} == {"visits", "city"}
+    assert set(profile.segments) == {"visits", "city"}
+
+
+def test_should_evaluate_all_segments_of_new_profile():
+    index = SegmentIndex([
+        _segment("not-vip", "profile@traits.public.vip NOT EXISTS"),
+        _segment("visits", "profile@stats.visits > 1"),
+    ])
+    profile = Profile.new()
+    profile.operation.new = True
+    profile.reset_changes()
+    profile.increase_visits(2)
+
+    results = _segment_profile(profile, ["page-view"], index)
+    assert {id for _, id, error in results if error is None} == {"not-vip", "visits"}
+    assert set(profile.segments) == {"not-vip", "visits"}
+
+
+def test_should_match_segment_event_types():
+    profile = Profile(id="1", traits={"public": {"city": "Paris"}})
+
+    results = _segment_profile(profile, ["page-view"], _index(), force=True)
+    assert "city" not in {id for _, id, _ in results}
+
+
+def test_should_load_segments_once():
+    calls = []
+
+    async def load_segments():
+        calls.append(1)
+        return [_segment("visits", "profile@stats.visits > 1").dict()]
+
+    async def main():
+        invalidate_segments()
+        first = await get_segment_index(load_segments)
+        second = await get_segment_index(load_segments)
+        assert first is second
+        invalidate_segments()
+        assert await get_segment_index(load_segments) is not first
+
+    ttl = segmentation.memory_cache_config.segment_cache_ttl
+    segmentation.memory_cache_config.segment_cache_ttl = 60
+    try:
+        asyncio.run(main())
+    finally:
+        segmentation.memory_cache_config.segment_cache_ttl = ttl
+        invalidate_segments()
+
+    assert len(calls) == 2
@@ -0,0 +1,152 @@
+import pytest
+from lark import Tree, Token
+from lark.exceptions import UnexpectedInput
+
+from tracardi.process_engine.tql.parser import Parser
+
+earley_parser = Parser(Parser.read('grammar/uql_expr.lark'), start='expr')
+lalr_parser = Parser(Parser.read('grammar/uql_expr_lalr.lark'), start='expr', parser='lalr')
+parser_with_fallback = Parser(Parser.read('grammar/uql_expr_lalr.lark'), start='expr', parser='lalr',
+                              fallback=earley_parser)
+
+# Conditions that LALR grammar must parse to the same tree as Earley grammar.
+conditions = [
+    'payload@a.d.aa between 1 and 2',
+    'payload@a.d.aa between 1 and 2 and payload@a.e == "test"',
+    'payload@a.d.aa between 1 and 2 or payload@a.e != "test"',
+    'datetime(payload@a.i) between datetime("2020-01-01") and datetime("2022-01-01")',
+    'payload@a between now() and now.offset("1m")',
+    'payload@a.b == payload@a.c',
+    'payload@a.e == "test"',
+    'payload@a.e == "AND"',
+    'payload@a == " AND payload@b == 1"',
+    'payload@a.g == True',
+    'payload@a.h == null',
+    'payload@a.h == NULL',
+    'payload@a.b == 1',
+    'payload@a.b >= 1',
+    'payload@a.b => 1',
+    'payload@a.b > 0',
+    'payload@a.b <= 1',
+    'payload@a.b =< 1',
+    'payload@a.b != 1',
+    'payload@a.b > .54543',
+    'payload@a.b > 1.54543',
+    'payload@a.b < -1.845',
+    'payload@a > +5',
+    'payload@a == 10m',
+    'payload@a == 1 and 2',
+    'payload@a == [1, 2, "3", true, null]',
+    'payload@a == []',
+    'payload@a == foo(1, "a")',
+    'payload@a   ==   1',
+    '  payload@a == 1  ',
+    'payload@a == 1\tAND\tpayload@b == 2',
+    'payload@a == 1\n AND payload@b == 2',
+    'payload@a["b c"] == 1',
+    'payload@a["b \\" c"].d == 1',
+    'payload@a.b-c == 1',
+    'memory@a == 1',
+    'flow@id == "1"',
+    'session@context.browser.local.device.platform == "MacIntel"',
+    'datetime(payload@a.i) == datetime("2021-01-10")',
+    'datetime(payload@a.i) < datetime("2021-01-10 00:00:01")',
+    'datetime.from_timestamp(payload@a.m) == datetime.from_timestamp(payload@a.m)',
+    'datetime.offset(payload@a.i, "-1m") < now()',
+    'datetime.timezone(payload@a.i, "europe/warsaw") < now.timezone("europe/paris")',
+    'now.offset("-1m") < now()',
+    'now() == now()',
+    'now() == payload@a',
+    'payload@a == now()',
+    'lowercase(payload@a.text) == "hello world"',
+    'unknown(payload@a.b) == 1',
+    'payload@a.h is null',
+    'payload@a IS NULL',
+    'payload@a.h is not null',
+    'now() IS NULL',
+    'payload@a.h exists',
+    'payload@a.h.h not exists',
+    'payload@a  NOT   EXISTS',
+    'payload@missing EMPTY',
+    'payload@a.j NOT EMPTY',
+    'payload@a NOT  EMPTY',
+    'now() NOT EMPTY',
+    'lowercase(payload@a) NOT EMPTY',
+    'payload@a.c CONTAINS 2',
+    'payload@a CONTAINS [1]',
+    'payload@a.text STARTS WITH "Hello"',
+    'payload@a ENDS WITH now()',
+    'payload@a.e NOT EMPTY AND payload@a.e == "test"',
+    'payload@a.missing exists AND payload@a.missing==1',
+    'payload@a.missing exists OR payload@a.b==1',
+    '(payload@a.missing exists OR payload@a.b==1) AND payload@a.missing not exists',
+    'payload@a == 1 AND payload@b == 2 AND payload@c == 3',
+    'payload@a == 1 AND payload@b == 2 AND payload@c == 3 AND payload@d == 4',
+    'payload@a == 1 AND payload@b == 2 AND payload@c == 3 AND payload@d == 4 AND payload@e exists',
+    'payload@a == 1 OR payload@b == 2 OR payload@c == 3 OR profile@d NOT EXISTS',
+    '(payload@a == 1 AND payload@b == 2) OR (payload@c == 3 AND payload@d == 4)',
+    'payload@a == 1 AND (payload@b == 2 OR payload@c == 3) AND payload@d == 4',
+    'payload@a == 1 OR (payload@b == 2 AND (payload@c == 3 OR payload@d == 4))',
+    '((payload@a == 1))',
+    'event@type == "page-view" AND event@properties.url STARTS WITH "https"',
+    'profile@traits.age between 18 and 65 AND profile@traits.x == "a"',
+]
+
+# Conditions that LALR grammar does not accept, but Earley does.
+fallback_conditions = [
+    'payload@a == 1 AND now() > payload@b',
+    'payload@a == 1e5',
+    'payload@a == foo(abc)',
+    'payload@a > 5.',
+    'payload@a between 1 and 2 and 3',
+]
+
+# Conditions that neither of the grammars accept.
+invalid_conditions = [
+    'payload@a == 1 AND payload@b == 2 OR payload@c == 3',
+    'a.b > 1',
+    'payload@... > 1',
+    'payload@a = 1',
+    'payload@a <> 1',
+    'payload@a == 1.2.3',
+    'payload@a == trueish',
+]
+
+
+def _normalize(node):
+    """
+    Returns comparable form of the tree. Chains of AND/OR conditions are flattened, as Earley parser nests them
+    in either direction and LALR parser always nests them to the left. Both evaluate to the same value.
+    """
+    if isinstance(node, Tree):
+        children = [_normalize(child) for child in node.children]
+        if node.data in ('and_expr', 'or_expr'):
+            flat_children = []
+            for child in children:
+                if isinstance(child, tuple) and child[0] == node.data:
+                    flat_children += child[1]
+                else:
+                    flat_children.append(child)
+            children = flat_children
+        return str(node.data), children
+    if isinstance(node, Token):
+        return node.type, str(node)
+    return node
+
+
+@pytest.mark.parametrize("condition", conditions)
+def test_lalr_and_earley_should_build_the_same_tree(condition):
+    assert _normalize(lalr_parser.parse(condition)) == _normalize(earley_parser.parse(condition))
+
+
+@pytest.mark.parametrize("condition", fallback_conditions)
+def test_should_fallback_to_earley(condition):
+    with pytest.raises(UnexpectedInput):
+        lalr_parser.parse(condition)
+    assert parser_with_fallback.parse(condition) == earley_parser.parse(condition)
+
+
+@pytest.mark.parametrize("condition", invalid_conditions)
+def test_both_parsers_should_reject_invalid_conditions(condition):
+    with pytest.raises(UnexpectedInput):
+        parser_with_fallback.parse(condition)
@@ -0,0 +1,94 @@
+import asyncio
+
+from tracardi.domain.value_object.bulk_insert_result import BulkInsertResult
+from tracardi.domain.value_object.collect_result import CollectResult
+from tracardi.service.console_log import ConsoleLog
+from tracardi.service.tracker_persister import TrackerResultPersister
+from tracardi.service.tracker_result_batcher import TrackerResultBatcher
+
+
+def _get_batcher(max_size, max_wait) -> TrackerResultBatcher:
+    batcher = TrackerResultBatcher()
+    batcher.max_size = max_size
+    batcher.max_wait = max_wait
+    return batcher
+
+
+def test_should_split_bulk_result_by_request():
+    result = BulkInsertResult(saved=5, errors=[], ids=['1', '2', '3', '4', '5'])
+    split = TrackerResultPersister._split_result(result, [['1', '2'], [], ['3', '4', '5']])
+
+    assert [item.ids for item in split] == [['1', '2'], [], ['3', '4', '5']]
+    assert [item.saved for item in split] == [2, 0, 3]
+
+    result = BulkInsertResult(saved=0, errors=['error'], ids=['1', '2'])
+    split = TrackerResultPersister._split_result(result, [['1'], ['2']])
+    assert all(item.saved == 0 and item.errors == ['error'] for item in split)
+
+
+def test_should_report_record_errors_only_to_request_of_record():
+    error = {'index': {'_id': '3', 'status': 400, 'error': {'type': 'mapper_parsing_exception'}}}
+    result = BulkInsertResult(saved=4, errors=[error], ids=['1', '2', '3', '4', '5'])
+    split = TrackerResultPersister._split_result(result, [['1', '2'], ['3', '4'], ['5']])
+
+    assert [item.saved for item in split] == [2, 0, 1]
+    assert [item.errors for item in split] == [[], [error], []]
+    assert TrackerResultPersister._get_failed_ids(split[1]) == ['3']
+
+
+def test_should_save_concurrent_results_in_one_batch(monkeypatch):
+    batches = []
+
+    async def persist_batch(batch):
+        batches.append(batch)
+        return [CollectResult(session=[], events=[], profile=[BulkInsertResult(ids=tracker_results)])
+                for _, tracker_results in batch]
+
+    monkeypatch.setattr(TrackerResultPersister, 'persist_batch', staticmethod(persist_batch))
+
+    async def main():
+        batcher = _get_batcher(max_size=3, max_wait=0.05)
+        # Size limit
+        results = await asyncio.gather(*[batcher.persist([str(i)], ConsoleLog()) for i in range(3)])
+        assert [result.profile[0].ids for result in results] == [['0'], ['1'], ['2']]
+        assert len(batches) == 1
+
+        # Time limit
+        results = await asyncio.gather(*[batcher.persist([str(i)], ConsoleLog()) for i in range(2)])
+        assert [result.profile[0].ids for result in results] == [['0'], ['1']]
+        assert len(batches) == 2
+
+    asyncio.run(main())
+
+
+def test_should_pass_errors_to_all_requests_in_batch(monkeypatch):
+
+    async def persist_batch(batch):
+        raise ValueError("error")
+
+    monkeypatch.setattr(TrackerResultPersister, 'persist_batch', staticmethod(persist_batch))
+
+    async def main():
+        batcher = _get_batcher(max_size=10, max_wait=0.01)
+        results = await asyncio.gather(*[batcher.persist([str(i)], ConsoleLog()) for i in range(2)],
+                                       return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+
+    asyncio.run(main())
+
+
+def test_should_cancel_requests_if_save_is_cancelled(monkeypatch):
+
+    async def persist_batch(batch):
+        raise asyncio.CancelledError()
+
+    monkeypatch.setattr(TrackerResultPersister, 'persist_batch', staticmethod(persist_batch))
+
+    async def main():
+        batcher = _get_batcher(max_size=10, max_wait=0.01)
+        results = await asyncio.wait_for(
+            asyncio.gather(*[batcher.persist([str(i)], ConsoleLog()) for i in range(2)], return_exceptions=True),
+            timeout=1)
+        assert all(isinstance(result, asyncio.CancelledError) for result in results)
+
+    asyncio.run(main())
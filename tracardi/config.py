@@ -37,6 +37,14 @@ class MemoryCacheConfig:
             env['EVENT_DESTINATION_CACHE_TTL']) if 'EVENT_DESTINATION_CACHE_TTL' in env else 2
         self.profile_destination_cache_ttl = int(
             env['PROFILE_DESTINATION_CACHE_TTL']) if 'PROFILE_DESTINATION_CACHE_TTL' in env else 2
+        self.destination_resource_cache_ttl = int(
+            env['DESTINATION_RESOURCE_CACHE_TTL']) if 'DESTINATION_RESOURCE_CACHE_TTL' in env else 30
+        self.flow_execution_plan_cache_ttl = int(
+            env['FLOW_EXECUTION_PLAN_CACHE_TTL']) if 'FLOW_EXECUTION_PLAN_CACHE_TTL' in env else 600
+        self.segment_cache_ttl = int(env['SEGMENT_CACHE_TTL']) if 'SEGMENT_CACHE_TTL' in env else 10
+        self.condition_cache_size = int(
+            env['CONDITION_CACHE_SIZE']) if 'CONDITION_CACHE_SIZE' in env else 1000
+        self.stale_ttl = float(env['MEMORY_CACHE_STALE_TTL']) if 'MEMORY_CACHE_STALE_TTL' in env else 0
 
 
 class ElasticConfig:
@@ -60,6 +68,9 @@ class ElasticConfig:
 
         self.refresh_profiles_after_save = (env['ELASTIC_REFRESH_PROFILES_AFTER_SAVE'].lower() == 'yes') \
             if 'ELASTIC_REFRESH_PROFILES_AFTER_SAVE' in env else False
+        self.partial_profile_updates = (env['ELASTIC_PARTIAL_PROFILE_UPDATES'].lower() == 'yes') \
+            if 'ELASTIC_PARTIAL_PROFILE_UPDATES' in env else False
+        self.refresh_interval = float(env['ELASTIC_REFRESH_INTERVAL']) if 'ELASTIC_REFRESH_INTERVAL' in env else 1
 
         self.host = self.get_host()
         self.http_auth_username = self.env.get('ELASTIC_HTTP_AUTH_USERNAME', None)
@@ -100,6 +111,8 @@ class RedisConfig:
         self.env = env
         self.redis_host = env['REDIS_HOST'] if 'REDIS_HOST' in env else 'redis://localhost:6379'
         self.redis_password = env.get('REDIS_PASSWORD', None)
+        self.redis_max_connections = int(env['REDIS_MAX_CONNECTIONS']) if 'REDIS_MAX_CONNECTIONS' in env else 50
+        self.redis_pool_timeout = float(env['REDIS_POOL_TIMEOUT']) if 'REDIS_POOL_TIMEOUT' in env else 20
         # self._unset_credentials()
 
     def get_redis_with_password(self):
@@ -134,13 +147,51 @@ class TracardiConfig:
         _production = (env['PRODUCTION'].lower() == 'yes') if 'PRODUCTION' in env else False
         self.track_debug = (env['TRACK_DEBUG'].lower() == 'yes') if 'TRACK_DEBUG' in env else False
         self.save_logs = (env['SAVE_LOGS'].lower() == 'yes') if 'SAVE_LOGS' in env else True
+        self.log_buffer_size = int(env['LOG_BUFFER_SIZE']) if 'LOG_BUFFER_SIZE' in env else 10000
+        self.log_ship_interval = float(env['LOG_SHIP_INTERVAL']) if 'LOG_SHIP_INTERVAL' in env else 5
+        self.log_ship_batch_size = int(env['LOG_SHIP_BATCH_SIZE']) if 'LOG_SHIP_BATCH_SIZE' in env else 500
         self.cache_profiles = (env['CACHE_PROFILE'].lower() == 'yes') if 'CACHE_PROFILE' in env else False
+        self.profile_cache_ttl = int(env['PROFILE_CACHE_TTL']) if 'PROFILE_CACHE_TTL' in env else 300
+        self.profile_cache_size = int(env['PROFILE_CACHE_SIZE']) if 'PROFILE_CACHE_SIZE' in env else 10000
+        self.profile_directory = (
+            env['PROFILE_DIRECTORY'].lower() == 'yes') if 'PROFILE_DIRECTORY' in env else False
+        self.profile_directory_buckets = int(
+            env['PROFILE_DIRECTORY_BUCKETS']) if 'PROFILE_DIRECTORY_BUCKETS' in env else 65536
         self.sync_profile_tracks_max_repeats = int(
             env['SYNC_PROFILE_TRACKS_MAX_REPEATS']) if 'SYNC_PROFILE_TRACKS_MAX_REPEATS' in env else 10
         self.sync_profile_tracks_wait = int(
             env['SYNC_PROFILE_TRACKS_WAIT']) if 'SYNC_PROFILE_TRACKS_WAIT' in env else 1
         self.postpone_destination_sync = int(
             env['POSTPONE_DESTINATION_SYNC']) if 'POSTPONE_DESTINATION_SYNC' in env else 20
+        self.destination_concurrency = int(
+            env['DESTINATION_CONCURRENCY']) if 'DESTINATION_CONCURRENCY' in env else 10
+        self.destination_timeout = float(env['DESTINATION_TIMEOUT']) if 'DESTINATION_TIMEOUT' in env else 5
+        self.connection_pools_max = int(env['CONNECTION_POOLS_MAX']) if 'CONNECTION_POOLS_MAX' in env else 100
+        self.connection_pool_size = int(env['CONNECTION_POOL_SIZE']) if 'CONNECTION_POOL_SIZE' in env else 10
+        self.connection_pool_idle_ttl = float(
+            env['CONNECTION_POOL_IDLE_TTL']) if 'CONNECTION_POOL_IDLE_TTL' in env else 300
+        self.connection_pool_health_check_interval = float(
+            env['CONNECTION_POOL_HEALTH_CHECK_INTERVAL']) if 'CONNECTION_POOL_HEALTH_CHECK_INTERVAL' in env else 30
+        self.flow_node_concurrency = int(env['FLOW_NODE_CONCURRENCY']) if 'FLOW_NODE_CONCURRENCY' in env else 1
+        self.plugin_instances_max = int(env['PLUGIN_INSTANCES_MAX']) if 'PLUGIN_INSTANCES_MAX' in env else 1000
+        self.plugin_instance_idle_ttl = float(
+            env['PLUGIN_INSTANCE_IDLE_TTL']) if 'PLUGIN_INSTANCE_IDLE_TTL' in env else 300
+        self.live_segmentation_slices = int(
+            env['LIVE_SEGMENTATION_SLICES']) if 'LIVE_SEGMENTATION_SLICES' in env else 16
+        self.live_segmentation_concurrency = int(
+            env['LIVE_SEGMENTATION_CONCURRENCY']) if 'LIVE_SEGMENTATION_CONCURRENCY' in env else 4
+        self.live_segmentation_processes = int(
+            env['LIVE_SEGMENTATION_PROCESSES']) if 'LIVE_SEGMENTATION_PROCESSES' in env else (os.cpu_count() or 1)
+        self.live_segmentation_batch_size = int(
+            env['LIVE_SEGMENTATION_BATCH_SIZE']) if 'LIVE_SEGMENTATION_BATCH_SIZE' in env else 1000
+        self.live_segmentation_progress_interval = float(
+            env['LIVE_SEGMENTATION_PROGRESS_INTERVAL']) if 'LIVE_SEGMENTATION_PROGRESS_INTERVAL' in env else 30
+        self.live_segmentation_checkpoint_ttl = int(
+            env['LIVE_SEGMENTATION_CHECKPOINT_TTL']) if 'LIVE_SEGMENTATION_CHECKPOINT_TTL' in env else 604800
+        self.track_batch_size = int(env['TRACK_BATCH_SIZE']) if 'TRACK_BATCH_SIZE' in env else 0
+        self.track_batch_wait = int(env['TRACK_BATCH_WAIT']) / 1000 if 'TRACK_BATCH_WAIT' in env else 0.005
+        self.recent_writes_ttl = int(env['RECENT_WRITES_TTL']) if 'RECENT_WRITES_TTL' in env else 10
+        self.metrics = (env['METRICS'].lower() == 'yes') if 'METRICS' in env else True
         self.storage_driver = env['STORAGE_DRIVER'] if 'STORAGE_DRIVER' in env else 'elastic'
         self.query_language = env['QUERY_LANGUAGE'] if 'QUERY_LANGUAGE' in env else 'kql'
         self.tracardi_pro_host = env['TRACARDI_PRO_HOST'] if 'TRACARDI_PRO_HOST' in env else 'pro.tracardi.com'
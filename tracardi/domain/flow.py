@@ -1,4 +1,5 @@
 import uuid
+from hashlib import md5
 from tracardi.service.wf.domain.flow import Flow as GraphFlow
 from .named_entity import NamedEntity
 from .value_object.storage_info import StorageInfo
@@ -96,7 +97,13 @@ class Flow(GraphFlow):
         if 'type' not in decrypted:
             decrypted['type'] = record.type
 
-        return Flow(**decrypted)
+        flow = Flow(**decrypted)
+
+        if output != 'draft' and record.production:
+            # Revision identifies the deployed version of the flow. It is used to key compiled execution plans.
+            flow.set_revision(md5(record.production.encode()).hexdigest())
+
+        return flow
 
     @staticmethod
     def new(id: str = None) -> 'Flow':
@@ -1,8 +1,7 @@
 import uuid
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Set
-from pydantic import BaseModel
-from tracardi.service.notation.dot_accessor import DotAccessor
+from typing import Optional, List, Dict, Any, Set, Iterator, Tuple
+from pydantic import BaseModel, PrivateAttr, ValidationError
 from .entity import Entity
 from .metadata import ProfileMetadata
 from .pii import PII
@@ -13,14 +12,44 @@ from .value_object.operation import Operation
 from .value_object.storage_info import StorageInfo
 from ..service.dot_notation_converter import DotNotationConverter
 from .profile_stats import ProfileStats
-from .segment import Segment
-from ..process_engine.tql.condition import Condition
 
 
 class ConsentRevoke(BaseModel):
     revoke: Optional[datetime] = None
 
 
+def _is_same_list(old: list, new: list) -> bool:
+    # Order of items is ignored, e.g. segments are made unique with a set.
+    return len(old) == len(new) and all(item in new for item in old) and all(item in old for item in new)
+
+
+def _changed_paths(old, new, path: str) -> Iterator[str]:
+    if isinstance(old, BaseModel) and type(old) is type(new):
+        for field in old.__fields__:
+            yield from _changed_paths(getattr(old, field), getattr(new, field), f"{path}.{field}")
+    elif isinstance(old, dict) and isinstance(new, dict):
+        for key in {*old, *new}:
+            if key not in old or key not in new:
+                yield f"{path}.{key}"
+            else:
+                yield from _changed_paths(old[key], new[key], f"{path}.{key}")
+    elif isinstance(old, list) and isinstance(new, list):
+        if not _is_same_list(old, new):
+            yield path
+    elif old != new:
+        yield path
+
+
+def _to_document(value):
+    if isinstance(value, BaseModel):
+        return value.dict()
+    elif isinstance(value, dict):
+        return {key: _to_document(item) for key, item in value.items()}
+    elif isinstance(value, list):
+        return [_to_document(item) for item in value]
+    return value
+
+
 class Profile(Entity):
     ids: Optional[List[str]] = []
     metadata: Optional[ProfileMetadata] = ProfileMetadata(time=ProfileTime(insert=datetime.utcnow()))
@@ -34,10 +63,107 @@ class Profile(Entity):
     active: bool = True
     aux: Optional[dict] = {}
 
+    _changes: Set[str] = PrivateAttr(default_factory=set)
+    _all_changed: bool = PrivateAttr(default=False)
+
     def __init__(self, **data: Any):
         super().__init__(**data)
         self._add_id_to_ids()
 
+    def __setattr__(self, name, value):
+        if name in self.__fields__ and name != 'operation':
+            self.mark_dirty(*_changed_paths(getattr(self, name), value, name))
+        super().__setattr__(name, value)
+
+    def mark_dirty(self, *paths: str):
+        """
+        Records dotted paths of changed data, e.g. `traits.public.name`. Fields that are assigned are tracked
+        automatically. Data changed in place, e.g. `profile.stats.visits += 1`, must be marked.
+        """
+        if paths:
+            self._changes.update(paths)
+            self.operation.update = True
+
+    def mark_all_dirty(self):
+        """
+        Records that data was changed in place without marking the paths, e.g. by plugins that only call
+        `update_profile`. Such profile is saved as a whole and all its segments are evaluated.
+        """
+        self._all_changed = True
+        self.operation.update = True
+
+    def is_all_dirty(self) -> bool:
+        return self._all_changed
+
+    def get_changes(self) -> Set[str]:
+        return set(self._changes)
+
+    def has_changes(self) -> bool:
+        return self._all_changed or len(self._changes) > 0
+
+    def reset_changes(self):
+        self._changes.clear()
+        self._all_changed = False
+
+    def _get_path_value(self, keys: List[str]):
+        value = self
+        for key in keys:
+            if isinstance(value, BaseModel) and key in value.__fields__:
+                value = getattr(value, key)
+            elif isinstance(value, dict):
+                value = value[key]
+            else:
+                raise KeyError('.'.join(keys))
+        return value
+
+    def get_partial_update(self, *paths: str) -> Optional[Tuple[Dict[str, Any], Set[str]]]:
+        """
+        Returns values of changed data and the given paths, and paths of removed data. Returns None if changes can
+        not be expressed with paths, e.g. when a dict key contains a dot.
+        """
+
+        values = {}
+        removed = set()
+        for path in sorted({*self._changes, *paths}, key=len):
+            keys = path.split('.')
+            parents = ['.'.join(keys[:i]) for i in range(1, len(keys))]
+            if any(parent in values or parent in removed for parent in parents):
+                continue
+            try:
+                values[path] = _to_document(self._get_path_value(keys))
+            except KeyError:
+                try:
+                    parent = self._get_path_value(keys[:-1])
+                except KeyError:
+                    return None
+                if not isinstance(parent, dict):
+                    return None
+                removed.add(path)
+
+        return values, removed
+
+    def update_fields(self, data: dict):
+        """
+        Validates and sets profile fields from data. Data with keys that are not profile fields is ignored.
+        """
+
+        values = {}
+        errors = []
+        for name, value in data.items():
+            if name not in self.__fields__ or name == 'operation':
+                continue
+            value, error = self.__fields__[name].validate(value, values, loc=name, cls=type(self))
+            if error:
+                errors.append(error)
+            else:
+                values[name] = value
+
+        if errors:
+            raise ValidationError(errors, type(self))
+
+        for name, value in values.items():
+            setattr(self, name, value)
+
     def serialize(self):
         return {
             "profile": self.dict(),
@@ -68,6 +194,9 @@ class Profile(Entity):
             self.interests = profile.interests
             self.aux = profile.aux
 
+            if self.has_changes():
+                self.operation.update = True
+
     def get_merge_key_values(self) -> List[tuple]:
         converter = DotNotationConverter(self)
         return [converter.get_profile_file_value_pair(key) for key in self.operation.merge]
@@ -83,63 +212,18 @@ class Profile(Entity):
     def _add_id_to_ids(self):
         if self.id not in self.ids:
             self.ids.append(self.id)
-            self.operation.update = True
+            self.mark_dirty('ids')
 
     def get_consent_ids(self) -> Set[str]:
         return set([consent_id for consent_id, _ in self.consents.items()])
 
-    async def segment(self, event_types, load_segments):
-
-        """
-        This method mutates current profile. Loads segments and adds segments to current profile.
-        """
-
-        # todo cache segments for 30 sec
-        flat_profile = DotAccessor(
-            profile=self
-            # it has access only to profile. Other data is irrelevant because we check only profile.
-        )
-
-        for event_type in event_types:  # type: str
-
-            # Segmentation is run for every event
-
-            # todo segments are loaded one by one - maybe it is possible to load it at once
-            # todo segments are loaded event if they are disabled. It is checked later. Maybe we can filter it here.
-            segments = await load_segments(event_type, limit=500)
-
-            for segment in segments:
-
-                segment = Segment(**segment)
-
-                if segment.enabled is False:
-                    continue
-
-                segment_id = segment.get_id()
-
-                try:
-                    condition = Condition()
-                    if await condition.evaluate(segment.condition, flat_profile):
-                        segments = set(self.segments)
-                        segments.add(segment_id)
-                        self.segments = list(segments)
-
-                        # Yield only if segmentation triggered
-                        yield event_type, segment_id, None
-
-                except Exception as e:
-                    msg = 'Condition id `{}` could not evaluate `{}`. The following error was raised: `{}`'.format(
-                        segment_id, segment.condition, str(e).replace("\n", " "))
-
-                    yield event_type, segment_id, msg
-
     def increase_visits(self, value=1):
         self.stats.visits += value
-        self.operation.update = True
+        self.mark_dirty('stats.visits')
 
     def increase_views(self, value=1):
         self.stats.views += value
-        self.operation.update = True
+        self.mark_dirty('stats.views')
 
     @staticmethod
     def storage_info() -> StorageInfo:
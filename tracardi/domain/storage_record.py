@@ -8,6 +8,8 @@ T = TypeVar('T')
 class RecordMetadata(BaseModel):
     id: str
     index: str
+    seq_no: Optional[int] = None
+    primary_term: Optional[int] = None
 
 
 class StorageRecord(dict):
@@ -21,7 +23,12 @@ class StorageRecord(dict):
     @staticmethod
     def build_from_elastic(elastic_record: dict) -> 'StorageRecord':
         record = StorageRecord(**elastic_record['_source'])
-        record.set_meta_data(RecordMetadata(id=elastic_record['_id'], index=elastic_record['_index']))
+        record.set_meta_data(RecordMetadata(
+            id=elastic_record['_id'],
+            index=elastic_record['_index'],
+            seq_no=elastic_record.get('_seq_no', None),
+            primary_term=elastic_record.get('_primary_term', None)
+        ))
         if 'inner_hits' in elastic_record:
             for name, inner_hits in StorageRecord._get_inner_hits(elastic_record):
                 record.set_inner_hits(name, inner_hits)
@@ -1,61 +1,105 @@
 import asyncio
+import heapq
+from collections import OrderedDict
+from itertools import count
 from time import time
-from typing import Any, Dict, List
-
-from pydantic import BaseModel
+from typing import Any, List, Dict, Tuple
 
 from tracardi.exceptions.exception import ExpiredException
 
 
-class CacheItem(BaseModel):
-    data: Any
-    ttl: float = 60
+class CacheItem:
+
+    __slots__ = ('data', 'ttl')
+
+    def __init__(self, data: Any = None, ttl: float = 60):
+        self.data = data
+        # Ttl is converted to the time of expiration
+        self.ttl = time() + float(ttl)
+
+    def expired(self, now: float = None):
+        return (time() if now is None else now) > self.ttl
+
+
+def _retrieve_exception(task: asyncio.Task):
+    # Marks exception as retrieved if no one waits for the task.
+    if not task.cancelled():
+        task.exception()
+
 
-    def __init__(self, **data: Any):
-        if 'ttl' in data:
-            data['ttl'] = time() + float(data['ttl'])
+class CacheStats:
 
-        super().__init__(**data)
+    __slots__ = ('hits', 'misses', 'stale_hits', 'evictions', 'expirations', 'loads', 'shared_loads')
 
-    def expired(self):
-        return time() > self.ttl
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.loads = 0
+        self.shared_loads = 0
+
+    def dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
 
 
 class MemoryCache:
 
-    def __init__(self, name: str, max_pool=1000, allow_null_values=False):
-        self.memory_buffer: Dict[str, CacheItem] = {}
+    """
+    In-memory LRU cache with expiring items.
+
+    Items are kept in the order of use. When the cache has more than `max_pool` items, the expired items are
+    removed first and then the least recently used ones. Both operations do not scan the cache.
+
+    `MemoryCache.cache` loads missing items. Concurrent misses of the same key share one load. If `stale_ttl` is
+    set, an expired item is returned for `stale_ttl` seconds after its expiration while it is reloaded in the
+    background (stale-while-revalidate).
+    """
+
+    def __init__(self, name: str, max_pool=1000, allow_null_values=False, stale_ttl: float = 0):
+        self.memory_buffer: Dict[str, CacheItem] = OrderedDict()
         self.name = name
         self.max_pool = max_pool
-        self.counter = 0
         self.allow_null_values = allow_null_values
+        self.stale_ttl = stale_ttl
+        self.stats = CacheStats()
+        # Counter orders items that expire at the same time, as items can not be compared.
+        self._expiry_heap: List[Tuple[float, int, str, CacheItem]] = []
+        self._expiry_counter = count()
+        self._in_flight: Dict[str, asyncio.Task] = {}
 
     def __len__(self):
         return len(self.memory_buffer)
 
     def __contains__(self, key: str):
-        if key in self.memory_buffer:
-            if self.memory_buffer[key].expired():
-                del self.memory_buffer[key]
-
-        return key in self.memory_buffer
+        cache_item = self.memory_buffer.get(key, None)
+        if cache_item is None:
+            return False
+        if cache_item.expired():
+            del self.memory_buffer[key]
+            self.stats.expirations += 1
+            return False
+        return True
 
     def __getitem__(self, item: str) -> [CacheItem, None]:
-        if item in self.memory_buffer:
-            cache_item = self.memory_buffer[item]  # type: CacheItem
-            if cache_item.expired():
-                del self.memory_buffer[item]
-                raise ExpiredException("MemoryCache item expired")
-            return cache_item
-        return None
+        cache_item = self.memory_buffer.get(item, None)
+        if cache_item is None:
+            return None
+        if cache_item.expired():
+            del self.memory_buffer[item]
+            self.stats.expirations += 1
+            raise ExpiredException("MemoryCache item expired")
+        self.memory_buffer.move_to_end(item)
+        return cache_item
 
     def __setitem__(self, key: str, value: CacheItem):
         if not isinstance(value, CacheItem):
             raise ValueError("MemoryCache item must be CacheItem type.")
         self.memory_buffer[key] = value
-        self.counter += 1
-        if self.counter > self.max_pool:
-            self.purge()
+        self.memory_buffer.move_to_end(key)
+        heapq.heappush(self._expiry_heap, (value.ttl + self.stale_ttl, next(self._expiry_counter), key, value))
+        self.purge()
 
     def __delitem__(self, key):
         if key in self.memory_buffer:
@@ -69,20 +113,87 @@ class MemoryCache:
             del self[key]
 
     def purge(self):
-        for key, value in self.memory_buffer.copy().items():
-            if value.expired():
+        """
+        Removes items that expired (including the stale period) and, if the cache is still over its size,
+        the least recently used items.
+        """
+        now = time()
+        heap = self._expiry_heap
+        while heap and heap[0][0] < now:
+            _, _, key, cache_item = heapq.heappop(heap)
+            # The heap may hold items that were already replaced or removed.
+            if self.memory_buffer.get(key, None) is cache_item:
                 del self.memory_buffer[key]
+                self.stats.expirations += 1
 
-    @staticmethod
-    async def cache(cache: 'MemoryCache', key, ttl, load_callable, awaitable, *args):
-        if key not in cache:
+        while len(self.memory_buffer) > self.max_pool:
+            self.memory_buffer.popitem(last=False)
+            self.stats.evictions += 1
+
+        # Drop references to replaced and evicted items once they dominate the heap.
+        if len(heap) > 2 * self.max_pool and len(heap) > 2 * len(self.memory_buffer):
+            self._expiry_heap = [entry for entry in heap if self.memory_buffer.get(entry[2], None) is entry[3]]
+            heapq.heapify(self._expiry_heap)
+
+    async def _load(self, key, ttl, load_callable, awaitable, *args):
+        self.stats.loads += 1
+        try:
             result = load_callable(*args)
             if awaitable:
                 result = await result
 
-            if result is None and not cache.allow_null_values:
-                return None
+            if result is not None or self.allow_null_values:
+                self[key] = CacheItem(data=result, ttl=ttl)
+
+            return result
+
+        finally:
+            if self._in_flight.get(key, None) is asyncio.current_task():
+                del self._in_flight[key]
+
+    def _get_load(self, key, ttl, load_callable, awaitable, *args) -> asyncio.Task:
+        """
+        Returns the running load of the key or starts a new one. Load runs in its own task, so it is not
+        cancelled with the request that started it.
+        """
+        task = self._in_flight.get(key, None)
+        if task is None:
+            task = asyncio.create_task(self._load(key, ttl, load_callable, awaitable, *args))
+            task.add_done_callback(_retrieve_exception)
+            self._in_flight[key] = task
+        return task
+
+    def _revalidate(self, key, ttl, load_callable, awaitable, *args):
+        # Stale value is still served. Load error will surface on the next load when the value is gone.
+        self._get_load(key, ttl, load_callable, awaitable, *args)
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats.dict(),
+            "size": len(self.memory_buffer),
+            "max_pool": self.max_pool
+        }
+
+    @staticmethod
+    async def cache(cache: 'MemoryCache', key, ttl, load_callable, awaitable, *args):
+        cache_item = cache.memory_buffer.get(key, None)
+
+        if cache_item is not None:
+            now = time()
+            if not cache_item.expired(now):
+                cache.memory_buffer.move_to_end(key)
+                cache.stats.hits += 1
+                return cache_item.data
+
+            if cache.stale_ttl > 0 and now <= cache_item.ttl + cache.stale_ttl:
+                cache.stats.stale_hits += 1
+                cache._revalidate(key, ttl, load_callable, awaitable, *args)
+                return cache_item.data
+
+        cache.stats.misses += 1
 
-            cache[key] = CacheItem(data=result, ttl=ttl)
+        if key in cache._in_flight:
+            cache.stats.shared_loads += 1
 
-        return cache[key].data
+        # Shielded so the cancelled request does not cancel the load for other requests.
+        return await asyncio.shield(cache._get_load(key, ttl, load_callable, awaitable, *args))
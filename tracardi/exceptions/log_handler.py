@@ -1,18 +1,25 @@
+from collections import deque
 from datetime import datetime
 from logging import Handler, LogRecord
-from time import time
+from typing import List
+
 from tracardi.config import tracardi
 
 
 class ElasticLogHandler(Handler):
 
-    def __init__(self, level=0, collection=None):
+    """
+    Collects logs in a ring buffer of `max_size` logs. When the buffer is full the oldest log is dropped and
+    counted in `dropped`. Logs are saved by the log shipper.
+    """
+
+    def __init__(self, level=0, collection=None, max_size: int = None):
         super().__init__(level)
 
-        if collection is None:
-            collection = []
-        self.collection = collection
-        self.last_save = time()
+        if max_size is None:
+            max_size = tracardi.log_buffer_size
+        self.collection = deque(collection or [], maxlen=max_size)
+        self.dropped = 0
 
     def emit(self, record: LogRecord):
         log = {
@@ -27,15 +34,15 @@ class ElasticLogHandler(Handler):
         }
 
         if tracardi.save_logs:
+            if len(self.collection) == self.collection.maxlen:
+                self.dropped += 1
             self.collection.append(log)
 
     def has_logs(self):
-        return tracardi.save_logs is True and isinstance(self.collection, list) and (
-                len(self.collection) > 100 or (time() - self.last_save) > 30)
+        return tracardi.save_logs is True and len(self.collection) > 0
 
-    def reset(self):
-        self.collection = []
-        self.last_save = time()
+    def drain(self, size: int) -> List[dict]:
+        return [self.collection.popleft() for _ in range(min(size, len(self.collection)))]
 
 
 log_handler = ElasticLogHandler()
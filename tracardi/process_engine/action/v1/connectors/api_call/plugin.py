@@ -1,7 +1,10 @@
 import asyncio
+from typing import Optional
+
 import aiohttp
 from aiohttp import ClientConnectorError, ContentTypeError
 
+from tracardi.service.connection_pools import connection_pools, PooledClient
 from tracardi.service.notation.dict_traverser import DictTraverser
 from json import JSONDecodeError
 
@@ -23,6 +26,8 @@ class RemoteCallAction(ActionRunner):
 
     credentials: ApiCredentials
     config: RemoteCallConfiguration
+    http_session: Optional[PooledClient] = None
+    reusable = True
 
     async def set_up(self, init):
         config = RemoteCallConfiguration(**init)
@@ -31,6 +36,21 @@ class RemoteCallAction(ActionRunner):
         self.config = config
         self.credentials = resource.credentials.get_credentials(self, ApiCredentials)
 
+        if self.http_session is None:
+            # Session keeps open connections to the api, so it is shared by all runs that use the resource.
+            self.http_session = await connection_pools.acquire(
+                "api-call",
+                resource.id,
+                self.credentials,
+                HttpClient.create_session,
+                HttpClient.close_session,
+                HttpClient.is_session_open
+            )
+
+    async def close(self):
+        http_session, self.http_session = self.http_session, None
+        await connection_pools.release(http_session)
+
     @staticmethod
     def _validate_key_value(values, label):
         for name, value in values.items():
@@ -65,7 +85,7 @@ class RemoteCallAction(ActionRunner):
 
             content = None
             timeout = aiohttp.ClientTimeout(total=self.config.timeout)
-            async with HttpClient(timeout=timeout, retries=node.on_connection_error_repeat) as session:
+            async with HttpClient(retries=node.on_connection_error_repeat, session=self.http_session.client) as session:
 
                 params = self.config.get_params(dot, **kwargs)
                 url = self.credentials.get_url(dot=dot, endpoint=self.config.endpoint)
@@ -83,6 +103,7 @@ class RemoteCallAction(ActionRunner):
                         cookies=cookies,
                         ssl=self.config.ssl_check,
                         proxy=self.credentials.proxy,
+                        timeout=timeout,
                         **params
                 ) as response:
 
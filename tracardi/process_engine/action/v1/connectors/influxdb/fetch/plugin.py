@@ -1,5 +1,8 @@
+from typing import Optional
+
 from tracardi.service.plugin.domain.register import Plugin, Spec, MetaData, Documentation, PortDoc, Form, FormGroup, \
     FormField, FormComponent
+from tracardi.service.connection_pools import connection_pools, PooledClient
 from tracardi.service.plugin.runner import ActionRunner
 from tracardi.service.storage.driver import storage
 from .model.config import Config, InfluxCredentials
@@ -14,9 +17,10 @@ def validate(config: dict) -> Config:
 
 class InfluxFetcher(ActionRunner):
 
-    client: InfluxDBClient
+    client: Optional[PooledClient] = None
     credentials: InfluxCredentials
     config: Config
+    reusable = True
 
     async def set_up(self, init):
         config = Config(**init)
@@ -24,7 +28,19 @@ class InfluxFetcher(ActionRunner):
 
         self.config = config
         self.credentials = resource.credentials.get_credentials(self, InfluxCredentials)
-        self.client = InfluxDBClient(self.credentials.url, self.credentials.token)
+        if self.client is None:
+            # Client keeps http connection pool, so it is shared by all runs of plugins that use the resource.
+            self.client = await connection_pools.acquire(
+                "influxdb",
+                resource.id,
+                self.credentials,
+                lambda: InfluxDBClient(self.credentials.url, self.credentials.token),
+                InfluxDBClient.close
+            )
+
+    async def close(self):
+        client, self.client = self.client, None
+        await connection_pools.release(client)
 
     async def run(self, payload: dict, in_edge=None) -> Result:
         dot = self._get_dot_accessor(payload)
@@ -46,7 +62,7 @@ class InfluxFetcher(ActionRunner):
 
         self.console.log(f"Filtering data with the following query: {query}")
 
-        query_api = self.client.query_api()
+        query_api = self.client.client.query_api()
 
         try:
             result = query_api.query(query, self.config.organization, {"Content-Type": "text/plain"})
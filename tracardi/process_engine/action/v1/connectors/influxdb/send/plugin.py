@@ -1,6 +1,8 @@
 from datetime import datetime
+from typing import Optional
 from tracardi.service.plugin.domain.register import Plugin, Spec, MetaData, Documentation, PortDoc, Form, FormGroup, \
     FormField, FormComponent
+from tracardi.service.connection_pools import connection_pools, PooledClient
 from tracardi.service.plugin.runner import ActionRunner
 from tracardi.service.plugin.domain.result import Result
 from .model.config import Config, InfluxCredentials
@@ -17,9 +19,10 @@ def validate(config: dict) -> Config:
 
 class InfluxSender(ActionRunner):
 
-    client: InfluxDBClient
+    client: Optional[PooledClient] = None
     credentials: InfluxCredentials
     config: Config
+    reusable = True
 
     async def set_up(self, init):
         config = Config(**init)
@@ -27,7 +30,19 @@ class InfluxSender(ActionRunner):
 
         self.config = config
         self.credentials = resource.credentials.get_credentials(self, InfluxCredentials)
-        self.client = InfluxDBClient(self.credentials.url, self.credentials.token)
+        if self.client is None:
+            # Client keeps http connection pool, so it is shared by all runs of plugins that use the resource.
+            self.client = await connection_pools.acquire(
+                "influxdb",
+                resource.id,
+                self.credentials,
+                lambda: InfluxDBClient(self.credentials.url, self.credentials.token),
+                InfluxDBClient.close
+            )
+
+    async def close(self):
+        client, self.client = self.client, None
+        await connection_pools.release(client)
 
     async def run(self, payload: dict, in_edge=None) -> Result:
         dot = self._get_dot_accessor(payload)
@@ -67,7 +82,7 @@ class InfluxSender(ActionRunner):
         self.console.log("Record {} for bucket {} in organisation {}".format(record, self.config.bucket,
                                                                              self.config.organization))
 
-        writer = self.client.write_api(write_options=SYNCHRONOUS)
+        writer = self.client.client.write_api(write_options=SYNCHRONOUS)
         try:
             writer.write(
                 self.config.bucket,
@@ -19,6 +19,9 @@ class MongoClient:
         database = self.client[database]
         return await database.list_collection_names()
 
+    async def ping(self):
+        await self.client.admin.command('ping')
+
     async def close(self):
         if self.client:
-            await self.client.close()
+            self.client.close()
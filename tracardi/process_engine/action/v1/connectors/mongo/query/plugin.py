@@ -1,7 +1,9 @@
 import json
 from json import JSONDecodeError
+from typing import Optional
 
 from tracardi.domain.resource_config import ResourceConfig
+from tracardi.service.connection_pools import connection_pools, PooledClient
 from tracardi.service.plugin.plugin_endpoint import PluginEndpoint
 from tracardi.service.storage.driver import storage
 from tracardi.service.plugin.domain.register import Plugin, Spec, MetaData, Form, FormGroup, FormField, FormComponent
@@ -23,14 +25,24 @@ def validate(config: dict) -> PluginConfiguration:
 class MongoConnectorAction(ActionRunner):
 
     config: PluginConfiguration
-    client: MongoClient
+    client: Optional[PooledClient] = None
+    reusable = True
 
     async def set_up(self, init):
         config = PluginConfiguration(**init)
         resource = await storage.driver.resource.load(config.source.id)
 
-        mongo_config = resource.credentials.get_credentials(self, output=MongoConfiguration)  # type: MongoConfiguration
-        self.client = MongoClient(mongo_config)
+        if self.client is None:
+            mongo_config = resource.credentials.get_credentials(self, output=MongoConfiguration)  # type: MongoConfiguration
+            # Mongo client keeps its own connection pool, so one client is shared by all runs.
+            self.client = await connection_pools.acquire(
+                "mongo",
+                resource.id,
+                mongo_config,
+                lambda: MongoClient(mongo_config),
+                MongoClient.close,
+                MongoClient.ping
+            )
         self.config = config
 
     async def run(self, payload: dict, in_edge=None) -> Result:
@@ -39,11 +51,12 @@ class MongoConnectorAction(ActionRunner):
         except JSONDecodeError as e:
             raise ValueError("Can not parse this data as JSON. Error: `{}`".format(str(e)))
 
-        result = await self.client.find(self.config.database.id, self.config.collection.id, query)
+        result = await self.client.client.find(self.config.database.id, self.config.collection.id, query)
         return Result(port="payload", value={"result": result})
 
-    # async def close(self):
-    #     await self.client.close()
+    async def close(self):
+        client, self.client = self.client, None
+        await connection_pools.release(client)
 
 
 class Endpoint(PluginEndpoint):
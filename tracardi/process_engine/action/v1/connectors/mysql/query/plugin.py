@@ -1,8 +1,11 @@
 import json
-from typing import Any
+from typing import Optional
 
 import aiomysql
 from datetime import datetime, date
+
+from tracardi.config import tracardi
+from tracardi.service.connection_pools import connection_pools, PooledClient
 from tracardi.service.notation.dict_traverser import DictTraverser
 from tracardi.service.storage.driver import storage
 from tracardi.service.plugin.domain.register import Plugin, Spec, MetaData, Form, FormGroup, FormField, FormComponent, \
@@ -21,7 +24,8 @@ class MysqlConnectorAction(ActionRunner):
 
     connection: Connection
     config: Configuration
-    pool: Any = None
+    pool: Optional[PooledClient] = None
+    reusable = True
 
     async def set_up(self, init):
 
@@ -31,6 +35,17 @@ class MysqlConnectorAction(ActionRunner):
         self.config = configuration
         self.connection = resource.credentials.get_credentials(self, output=Connection)
 
+        if self.pool is None:
+            # Pool is shared by all runs of plugins that use the resource.
+            self.pool = await connection_pools.acquire(
+                "mysql",
+                resource.id,
+                self.connection,
+                lambda: self.connection.connect(self.config.timeout, maxsize=tracardi.connection_pool_size),
+                Connection.close,
+                Connection.ping
+            )
+
     async def run(self, payload: dict, in_edge=None) -> Result:
         try:
             # Prepare statement data
@@ -38,9 +53,7 @@ class MysqlConnectorAction(ActionRunner):
             data = template.reshape(self.config.data)
             self.console.log("Executing query: {} with data: {}".format(self.config.query, data))
 
-            self.pool = await self.connection.connect(self.config.timeout)
-
-            async with self.pool.acquire() as conn:
+            async with self.pool.client.acquire() as conn:
                 async with conn.cursor(aiomysql.DictCursor) as cursor:
                     if self.config.type == 'call':
                         # todo implement
@@ -68,9 +81,8 @@ class MysqlConnectorAction(ActionRunner):
             return Result(port="error", value={"payload": payload, "error": str(e)})
 
     async def close(self):
-        if self.pool:
-            self.pool.close()
-            await self.pool.wait_closed()
+        pool, self.pool = self.pool, None
+        await connection_pools.release(pool)
 
     async def on_error(self, *args, **kwargs):
         await self.close()
@@ -15,3 +15,20 @@ class Connection(BaseModel):
                                      password=self.password,
                                      host=self.host,
                                      port=self.port)
+
+    async def create_pool(self, max_size=10) -> asyncpg.pool.Pool:
+        return await asyncpg.create_pool(database=self.database,
+                                         user=self.user,
+                                         password=self.password,
+                                         host=self.host,
+                                         port=self.port,
+                                         min_size=1,
+                                         max_size=max_size)
+
+    @staticmethod
+    async def close(pool: asyncpg.pool.Pool):
+        await pool.close()
+
+    @staticmethod
+    async def ping(pool: asyncpg.pool.Pool):
+        await pool.fetchval("SELECT 1")
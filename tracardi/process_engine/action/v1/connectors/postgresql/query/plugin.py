@@ -2,8 +2,10 @@ import json
 from datetime import datetime, date
 from decimal import Decimal
 
-import asyncpg
+from typing import Optional
 
+from tracardi.config import tracardi
+from tracardi.service.connection_pools import connection_pools, PooledClient
 from tracardi.service.storage.driver import storage
 from tracardi.service.plugin.domain.register import Plugin, Spec, MetaData, Form, FormGroup, FormField, FormComponent, \
     Documentation, PortDoc
@@ -20,9 +22,10 @@ def validate(config: dict) -> Configuration:
 
 class PostgreSQLConnectorAction(ActionRunner):
 
-    db: asyncpg.connection.Connection
+    db: Optional[PooledClient] = None
     timeout: int
     query: str
+    reusable = True
 
     async def set_up(self, init):
         config = validate(init)
@@ -30,11 +33,22 @@ class PostgreSQLConnectorAction(ActionRunner):
 
         self.query = config.query
         self.timeout = config.timeout
-        self.db = await resource.credentials.get_credentials(self, Connection).connect()
+
+        if self.db is None:
+            connection = resource.credentials.get_credentials(self, Connection)  # type: Connection
+            # Pool is shared by all runs of plugins that use the resource.
+            self.db = await connection_pools.acquire(
+                "postgresql",
+                resource.id,
+                connection,
+                lambda: connection.create_pool(max_size=tracardi.connection_pool_size),
+                Connection.close,
+                Connection.ping
+            )
 
     async def run(self, payload: dict, in_edge=None) -> Result:
         try:
-            result = await self.db.fetch(self.query, timeout=self.timeout)
+            result = await self.db.client.fetch(self.query, timeout=self.timeout)
             result = [self.to_dict(record) for record in result]
             return Result(port="result", value={"result": result})
 
@@ -43,8 +57,8 @@ class PostgreSQLConnectorAction(ActionRunner):
             return Result(port="error", value={"payload": payload, "error": str(e)})
 
     async def close(self):
-        if self.db:
-            await self.db.close()
+        db, self.db = self.db, None
+        await connection_pools.release(db)
 
     @staticmethod
     def to_dict(record):
@@ -42,6 +42,7 @@ class ConsentAdder(ActionRunner):
                         consent_type = ConsentType(**consent_type_data)
                         if consent_type.revokable is False:
                             self.profile.consents[consent_id] = ConsentRevoke(revoke=None)
+                            self.profile.mark_dirty(f'consents.{consent_id}')
                         else:
                             revoke_offset = parse(consent_type.auto_revoke)
 
@@ -54,6 +55,7 @@ class ConsentAdder(ActionRunner):
                                 self.event.metadata.time.insert.timestamp() +
                                 parse(consent_type.auto_revoke
                                       )))
+                            self.profile.mark_dirty(f'consents.{consent_id}')
                     else:
                         self.console.warning(
                             f"The consent id `{consent_id}` was not appended to profile as there is no consent "
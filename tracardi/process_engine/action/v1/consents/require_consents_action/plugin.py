@@ -30,6 +30,7 @@ class RequireConsentsAction(ActionRunner):
             revoke = self.profile.consents[consent_id].revoke
             if revoke is not None and revoke < self.event.metadata.time.insert:
                 self.profile.consents.pop(consent_id)
+                self.profile.mark_dirty(f'consents.{consent_id}')
 
         for consent_id in consent_ids:
             consent_type = await storage.driver.consent_type.get_by_id(consent_id)
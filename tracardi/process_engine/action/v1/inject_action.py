@@ -62,12 +62,15 @@ class InjectAction(ActionRunner):
             self.profile.pii = inject
         elif self.config.destination == 'profile-traits-public':
             self.profile.traits.public = inject
+            self.profile.mark_dirty('traits.public')
         elif self.config.destination == 'profile-traits-private':
             self.profile.traits.private = inject
+            self.profile.mark_dirty('traits.private')
         elif self.config.destination == 'profile-interests':
             self.profile.interests = inject
         elif self.config.destination == 'profile-counters':
             self.profile.stats.counters = inject
+            self.profile.mark_dirty('stats.counters')
         elif self.config.destination == 'profile-consents':
             self.profile.consents = inject
         elif self.config.destination == 'session-context':
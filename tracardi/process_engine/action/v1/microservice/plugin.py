@@ -1,13 +1,14 @@
 import json
 from pprint import pprint
 
-import aiohttp
 from pydantic import BaseModel
 
+from tracardi.service.connection_pools import connection_pools
 from tracardi.service.plugin.domain.register import Plugin, Spec, MetaData, Documentation, PortDoc, MicroserviceConfig
 from tracardi.service.plugin.domain.result import Result
 from tracardi.service.plugin.runner import ActionRunner
 from tracardi.service.plugin.service import plugin_context
+from tracardi.service.tracardi_http_client import HttpClient
 from tracardi.service.wf.domain.node import Node
 
 
@@ -51,11 +52,19 @@ class MicroserviceAction(ActionRunner):
                            f"?service_id={service_id}" \
                            f"&action_id={action_id}"
 
-        async with aiohttp.ClientSession(headers={
-            'Authorization': f"Bearer {microservice_credentials.token}"
-        }) as client:
-            async with client.post(
+        # Session keeps open connections to the microservice, so it is shared by all runs.
+        pool = await connection_pools.acquire(
+            "microservice",
+            microservice_credentials.url,
+            microservice_credentials,
+            HttpClient.create_session,
+            HttpClient.close_session,
+            HttpClient.is_session_open
+        )
+        try:
+            async with pool.client.post(
                     url=microservice_url,
+                    headers={'Authorization': f"Bearer {microservice_credentials.token}"},
                     json=config) as remote_response:
                 result = await remote_response.json()
                 if remote_response.status != 200:
@@ -75,6 +84,8 @@ class MicroserviceAction(ActionRunner):
                                               f"on port {result.port}")
 
                 return result
+        finally:
+            await connection_pools.release(pool)
 
 
 # todo do not need register as this is not registered.
@@ -63,9 +63,11 @@ class AutoMergePropertiesToProfileAction(ActionRunner):
 
             if self.config.traits_type == 'private':
                 self.profile.traits.private = self._update(self.profile.traits.private, self.event.properties)
+                self.profile.mark_dirty('traits.private')
                 return Result(port="traits", value=self.profile.traits.private)
             else:
                 self.profile.traits.public = self._update(self.profile.traits.public, self.event.properties)
+                self.profile.mark_dirty('traits.public')
                 return Result(port="traits", value=self.profile.traits.public)
 
         return Result(port="error", value={})
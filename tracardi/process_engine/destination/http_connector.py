@@ -15,6 +15,8 @@ from tracardi.domain.session import Session
 from tracardi.exceptions.log_handler import log_handler
 from tracardi.process_engine.tql.utils.dictonary import flatten
 from tracardi.process_engine.action.v1.connectors.api_call.model.configuration import Method
+from tracardi.service.connection_pools import connection_pools
+from tracardi.service.tracardi_http_client import HttpClient
 from .destination_interface import DestinationInterface
 from ...domain.event import Event
 
@@ -83,7 +85,16 @@ class HttpConnector(DestinationInterface):
             timeout = aiohttp.ClientTimeout(total=config.timeout)
             url = str(credentials.url)
 
-            async with aiohttp.ClientSession(timeout=timeout) as session:
+            pool = await connection_pools.acquire(
+                "http-destination",
+                self.resource.id,
+                credentials,
+                HttpClient.create_session,
+                HttpClient.close_session,
+                HttpClient.is_session_open
+            )
+            try:
+                session = pool.client  # type: aiohttp.ClientSession
                 params = config.get_params(data)
                 async with session.request(
                         method=config.method,
@@ -93,6 +104,7 @@ class HttpConnector(DestinationInterface):
                         ssl=config.ssl_check,
                         auth=BasicAuth(credentials.username,
                                        credentials.password) if credentials.has_basic_auth() else None,
+                        timeout=timeout,
                         **params
                 ) as response:
 
@@ -114,6 +126,8 @@ class HttpConnector(DestinationInterface):
                     logger.info(f"Profile destination sync response from {url}, response: {result}")
 
                     # todo log
+            finally:
+                await connection_pools.release(pool)
 
         except ClientConnectorError as e:
             logger.error(str(e))
@@ -1,23 +1,34 @@
 import asyncio
+from functools import lru_cache
 
+from tracardi.config import memory_cache
 from tracardi.service.singleton import Singleton
 from tracardi.service.notation.dot_accessor import DotAccessor
 
 from tracardi.process_engine.tql.parser import Parser
-from tracardi.process_engine.tql.transformer.expr_transformer import ExprTransformer
+from tracardi.process_engine.tql.transformer.expr_compiler import ExprCompiler, CompiledCondition
 
 
 class Condition(metaclass=Singleton):
 
     def __init__(self):
-        self.parser = Parser(Parser.read('grammar/uql_expr.lark'), start='expr')
+        # LALR parser is much faster than Earley. Earley is used only for conditions not covered by LALR grammar.
+        self.parser = Parser(Parser.read('grammar/uql_expr_lalr.lark'),
+                             start='expr',
+                             parser='lalr',
+                             fallback=Parser(Parser.read('grammar/uql_expr.lark'), start='expr'))
+        self.compiler = ExprCompiler()
+        # Conditions are parsed and compiled once. Least recently used conditions are removed when the cache is full.
+        # Conditions that can not be parsed raise errors and are not cached.
+        self.compile = lru_cache(maxsize=memory_cache.condition_cache_size)(self._compile)
+
+    def _compile(self, condition: str) -> CompiledCondition:
+        return self.compiler.compile(condition, self.parser.parse(condition))
 
     def parse(self, condition):
-        return self.parser.parse(condition)
+        return self.compile(condition).tree
 
     async def evaluate(self, condition, dot: DotAccessor):
-        # todo cache tree
-        tree = self.parse(condition)
+        compiled_condition = self.compile(condition)
         await asyncio.sleep(0)
-        return ExprTransformer(dot=dot).transform(tree)
-
+        return compiled_condition.evaluate(dot)
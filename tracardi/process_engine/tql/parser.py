@@ -1,16 +1,18 @@
 import os
 from lark import Lark
+from lark.exceptions import UnexpectedInput
 
 _local_dir = os.path.dirname(__file__)
 
 
 class Parser:
 
-    def __init__(self, grammar, start, parser='earley', transformer=None):
+    def __init__(self, grammar, start, parser='earley', transformer=None, fallback: 'Parser' = None):
         import_paths = [
             os.path.join(_local_dir, 'grammar')
         ]
         self.transformer = transformer
+        self.fallback = fallback
         self.base_parser = Lark(grammar,
                                 start=start,
                                 parser=parser,
@@ -23,7 +25,14 @@ class Parser:
             return f.read()
 
     def parse(self, query):
-        return self.base_parser.parse(query)
+        if self.fallback is None:
+            return self.base_parser.parse(query)
+
+        try:
+            return self.base_parser.parse(query)
+        except UnexpectedInput:
+            # Query is not accepted by this parser, e.g. LALR grammar does not cover it. Try the fallback parser.
+            return self.fallback.parse(query)
 
     def next(self, query):
         interactive = self.base_parser.parse_interactive(query)
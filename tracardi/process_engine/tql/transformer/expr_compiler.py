@@ -0,0 +1,102 @@
+from typing import Callable, Any, Optional
+
+from lark import Tree, Token
+from lark.exceptions import GrammarError, VisitError
+
+from tracardi.service.notation.dot_accessor import DotAccessor
+from .expr_transformer import ExprTransformer
+
+# Token callbacks that do not depend on the evaluated data. Their values are computed once, when compiled.
+_CONSTANT_TOKENS = {'OP', 'OP_NUMBER', 'OP_STRING', 'OP_BOOL', 'OP_NULL', 'OP_FLOAT', 'OP_VALUE_TYPE'}
+
+
+class CompiledCondition:
+
+    """
+    Parsed condition compiled into a chain of closures. Evaluation gives the same result as
+    ExprTransformer(dot).transform(tree) but does not walk the tree and does not look up transformer
+    methods for every node.
+    """
+
+    __slots__ = ('condition', 'tree', '_evaluator')
+
+    def __init__(self, condition: str, tree: Tree, evaluator: Callable[[ExprTransformer], Any]):
+        self.condition = condition
+        self.tree = tree
+        self._evaluator = evaluator
+
+    def evaluate(self, dot: DotAccessor):
+        return self._evaluator(ExprTransformer(dot=dot))
+
+
+class ExprCompiler:
+
+    def __init__(self):
+        # Prototype is used only to resolve methods of namespaced transformers. These methods do not use
+        # the evaluated data (dot), so they can be shared between evaluations.
+        self._prototype = ExprTransformer(dot=DotAccessor())
+
+    def _get_callback(self, name: str) -> Optional[Callable[[ExprTransformer, Any], Any]]:
+        method = getattr(ExprTransformer, name, None)
+        if method is not None:
+            return method
+
+        try:
+            bound_method = getattr(self._prototype, name)
+        except AttributeError:
+            return None
+
+        return lambda _, args: bound_method(args)
+
+    def _compile_token(self, token: Token) -> Callable[[ExprTransformer], Any]:
+        callback = self._get_callback(token.type)
+
+        if callback is None:
+            return lambda _: token
+
+        if token.type in _CONSTANT_TOKENS:
+            try:
+                value = callback(self._prototype, token)
+                return lambda _: value
+            except Exception:
+                # Let the evaluation raise the error
+                pass
+
+        def _token(transformer):
+            try:
+                return callback(transformer, token)
+            except GrammarError:
+                raise
+            except Exception as e:
+                raise VisitError(token.type, token, e)
+
+        return _token
+
+    def _compile_tree(self, tree: Tree) -> Callable[[ExprTransformer], Any]:
+        children = tuple(self._compile_node(child) for child in tree.children)
+        callback = self._get_callback(tree.data)
+
+        if callback is None:
+            data, meta = tree.data, tree.meta
+            return lambda transformer: Tree(data, [child(transformer) for child in children], meta)
+
+        def _rule(transformer):
+            args = [child(transformer) for child in children]
+            try:
+                return callback(transformer, args)
+            except GrammarError:
+                raise
+            except Exception as e:
+                raise VisitError(tree.data, tree, e)
+
+        return _rule
+
+    def _compile_node(self, node) -> Callable[[ExprTransformer], Any]:
+        if isinstance(node, Tree):
+            return self._compile_tree(node)
+        if isinstance(node, Token):
+            return self._compile_token(node)
+        return lambda _: node
+
+    def compile(self, condition: str, tree: Tree) -> CompiledCondition:
+        return CompiledCondition(condition, tree, self._compile_tree(tree))
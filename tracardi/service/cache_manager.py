@@ -1,5 +1,6 @@
-from typing import Optional, List
+from typing import Optional, List, Dict
 
+from tracardi.config import memory_cache
 from tracardi.domain.event_reshaping_schema import EventReshapingSchema
 from tracardi.domain.event_source import EventSource
 from tracardi.domain.session import Session
@@ -7,22 +8,40 @@ from tracardi.domain.storage_record import StorageRecords, StorageRecord
 from tracardi.event_server.utils.memory_cache import MemoryCache
 from tracardi.service.singleton import Singleton
 from tracardi.service.storage.driver import storage
+from tracardi.service.storage.redis.recent_writes import recent_sessions
 
 
 class CacheManager(metaclass=Singleton):
+    # Session is not served stale, because it changes with every event. Configuration caches may be served
+    # stale for memory_cache.stale_ttl seconds while they are reloaded.
     _cache = {
         'SESSION': MemoryCache("session", max_pool=1000, allow_null_values=False),
-        'EVENT_SOURCE': MemoryCache("event-source", max_pool=100, allow_null_values=False),
-        'EVENT_VALIDATION': MemoryCache("event-validation", max_pool=500, allow_null_values=True),
-        'EVENT_TAG': MemoryCache("event-tags", max_pool=200, allow_null_values=True),
-        'EVENT_RESHAPING': MemoryCache("event-reshaping", max_pool=200, allow_null_values=True),
-        'EVENT_INDEXING': MemoryCache("event-indexing", max_pool=200, allow_null_values=True),
-        'EVENT_TO_PROFILE_COPING': MemoryCache("event-to-profile-coping", max_pool=200, allow_null_values=True),
-        'EVENT_DESTINATION': MemoryCache("event-destinations", max_pool=100, allow_null_values=True),
-        'PROFILE_DESTINATIONS': MemoryCache("profile-destinations", max_pool=10, allow_null_values=True),
-        'EVENT_CONSENT_COMPLIANCE': MemoryCache("event-consent-compliance", max_pool=500, allow_null_values=True),
+        'EVENT_SOURCE': MemoryCache("event-source", max_pool=100, allow_null_values=False,
+                                    stale_ttl=memory_cache.stale_ttl),
+        'EVENT_VALIDATION': MemoryCache("event-validation", max_pool=500, allow_null_values=True,
+                                        stale_ttl=memory_cache.stale_ttl),
+        'EVENT_TAG': MemoryCache("event-tags", max_pool=200, allow_null_values=True,
+                                 stale_ttl=memory_cache.stale_ttl),
+        'EVENT_RESHAPING': MemoryCache("event-reshaping", max_pool=200, allow_null_values=True,
+                                       stale_ttl=memory_cache.stale_ttl),
+        'EVENT_INDEXING': MemoryCache("event-indexing", max_pool=200, allow_null_values=True,
+                                      stale_ttl=memory_cache.stale_ttl),
+        'EVENT_TO_PROFILE_COPING': MemoryCache("event-to-profile-coping", max_pool=200, allow_null_values=True,
+                                               stale_ttl=memory_cache.stale_ttl),
+        'EVENT_DESTINATION': MemoryCache("event-destinations", max_pool=100, allow_null_values=True,
+                                         stale_ttl=memory_cache.stale_ttl),
+        'PROFILE_DESTINATIONS': MemoryCache("profile-destinations", max_pool=10, allow_null_values=True,
+                                            stale_ttl=memory_cache.stale_ttl),
+        'EVENT_CONSENT_COMPLIANCE': MemoryCache("event-consent-compliance", max_pool=500, allow_null_values=True,
+                                                stale_ttl=memory_cache.stale_ttl),
     }
 
+    def stats(self) -> Dict[str, dict]:
+        """
+        Returns hit, miss, eviction, and load counters of every cache.
+        """
+        return {cache.name: cache.get_stats() for cache in self._cache.values()}
+
     def session_cache(self) -> MemoryCache:
         return self._cache['SESSION']
 
@@ -87,21 +106,31 @@ class CacheManager(metaclass=Singleton):
 
         return await storage.driver.destination.load_profile_destinations()
 
+    @staticmethod
+    async def _load_session(session_id) -> Optional[Session]:
+        # Session saved recently may not be in the index yet.
+        record = await recent_sessions.load(session_id)
+        if record is not None:
+            return record.to_entity(Session)
+
+        return await storage.driver.session.load_by_id(session_id)
+
     async def session(self, session_id, ttl) -> Optional[Session]:
         """
         Session cache
         """
+
         if ttl > 0:
             return await MemoryCache.cache(
                 self.session_cache(),
                 session_id,
                 ttl,
-                storage.driver.session.load_by_id,
+                self._load_session,
                 True,
                 session_id
             )
 
-        return await storage.driver.session.load_by_id(session_id)
+        return await self._load_session(session_id)
 
     async def event_source(self, event_source_id, ttl) -> Optional[EventSource]:
         """
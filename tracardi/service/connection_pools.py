@@ -0,0 +1,209 @@
+import asyncio
+import inspect
+import json
+import logging
+from collections import OrderedDict
+from hashlib import sha1
+from time import monotonic
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from tracardi.config import tracardi
+from tracardi.exceptions.log_handler import log_handler
+
+logger = logging.getLogger(__name__)
+logger.setLevel(tracardi.logging_level)
+logger.addHandler(log_handler)
+
+
+async def _call(function: Callable, *args):
+    result = function(*args)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+def _retrieve_exception(task: asyncio.Task):
+    # Marks exception as retrieved if no one waits for the task.
+    if not task.cancelled():
+        task.exception()
+
+
+class PooledClient:
+
+    __slots__ = ('key', 'credentials_hash', 'client', 'close', 'check', 'users', 'last_used', 'last_check', 'stale')
+
+    def __init__(self, key: Tuple[str, str], credentials_hash: str, client, close: Callable,
+                 check: Optional[Callable]):
+        self.key = key
+        self.credentials_hash = credentials_hash
+        self.client = client
+        self.close = close
+        self.check = check
+        self.users = 0
+        self.last_used = monotonic()
+        self.last_check = self.last_used
+        self.stale = False
+
+
+class ConnectionPoolRegistry:
+
+    """
+    Process-wide registry of clients and connection pools to external systems used by plugins and destinations.
+
+    Clients are identified by a namespace (type of client, e.g. mysql) and a resource id. Every client remembers
+    the hash of credentials it was created with. When the resource is edited the hash changes and the client is
+    replaced on the next acquire, so workers pick up new credentials without a restart. A replaced client is closed
+    when its last user releases it.
+
+    Unused clients are closed after `idle_ttl` seconds and when there are more than `max_pools` clients, the least
+    recently used first. Clients with a `check` callable are checked every `health_check_interval` seconds and
+    recreated if the check fails.
+    """
+
+    def __init__(self, max_pools: int = 100, idle_ttl: float = 300, health_check_interval: float = 30):
+        self.max_pools = max_pools
+        self.idle_ttl = idle_ttl
+        self.health_check_interval = health_check_interval
+        self._pools: Dict[Tuple[str, str], PooledClient] = OrderedDict()
+        self._in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._last_purge = monotonic()
+
+    def __len__(self):
+        return len(self._pools)
+
+    @staticmethod
+    def get_credentials_hash(credentials) -> str:
+        if isinstance(credentials, BaseModel):
+            credentials = credentials.dict()
+        return sha1(json.dumps(credentials, sort_keys=True, default=str).encode()).hexdigest()
+
+    async def acquire(self, namespace: str, resource_id: str, credentials: Any, create: Callable,
+                      close: Callable, check: Callable = None) -> PooledClient:
+        """
+        Returns pooled client for the resource. `create()` makes a new client, `close(client)` closes it and
+        optional `check(client)` raises or returns False if the client is broken. All of them may be coroutines.
+        Every acquired client must be released.
+        """
+
+        key = (namespace, resource_id)
+        credentials_hash = self.get_credentials_hash(credentials)
+        now = monotonic()
+
+        await self._purge_idle(now)
+
+        while True:
+            pool = await self._get(key, credentials_hash, create, close, check, now)
+            # Unused pool may be closed by another request while this one waits for it.
+            if not pool.stale:
+                break
+
+        pool.users += 1
+        pool.last_used = now
+        if key in self._pools:
+            self._pools.move_to_end(key)
+
+        return pool
+
+    async def _get(self, key, credentials_hash, create, close, check, now) -> PooledClient:
+        namespace, resource_id = key
+        pool = self._pools.get(key, None)
+
+        if pool is not None and pool.credentials_hash != credentials_hash:
+            logger.info(f"Credentials of resource {resource_id} changed. Replacing {namespace} client.")
+            await self._remove(pool)
+            pool = None
+
+        if pool is not None and pool.check is not None and now - pool.last_check > self.health_check_interval:
+            pool.last_check = now
+            if not await self._is_healthy(pool):
+                logger.warning(f"Client {namespace} of resource {resource_id} failed health check. Reconnecting.")
+                await self._remove(pool)
+                pool = None
+
+        if pool is None:
+            task = self._in_flight.get(key, None)
+            if task is None:
+                # Client is created in its own task, so it is not cancelled with the request that started it.
+                task = asyncio.create_task(self._create(key, credentials_hash, create, close, check))
+                task.add_done_callback(_retrieve_exception)
+                self._in_flight[key] = task
+            # Shielded so the cancelled request does not cancel the connection for other requests.
+            pool = await asyncio.shield(task)
+
+        return pool
+
+    async def release(self, pool: Optional[PooledClient]):
+        if pool is None:
+            return
+        pool.users -= 1
+        pool.last_used = monotonic()
+        if pool.stale and pool.users <= 0:
+            await self._close(pool)
+
+    async def invalidate(self, resource_id: str):
+        """
+        Closes clients of the resource. Clients in use are closed when released.
+        """
+        for pool in [pool for key, pool in self._pools.items() if key[1] == resource_id]:
+            await self._remove(pool)
+
+    async def close_all(self):
+        for pool in list(self._pools.values()):
+            await self._remove(pool)
+
+    async def _create(self, key, credentials_hash, create, close, check) -> PooledClient:
+        try:
+            pool = PooledClient(key, credentials_hash, await _call(create), close, check)
+            self._pools[key] = pool
+            await self._purge_over_limit(skip=pool)
+            return pool
+
+        finally:
+            if self._in_flight.get(key, None) is asyncio.current_task():
+                del self._in_flight[key]
+
+    @staticmethod
+    async def _is_healthy(pool: PooledClient) -> bool:
+        try:
+            return await _call(pool.check, pool.client) is not False
+        except Exception as e:
+            logger.warning(f"Health check of {pool.key[0]} client failed. Reason: {str(e)}")
+            return False
+
+    async def _remove(self, pool: PooledClient):
+        if self._pools.get(pool.key, None) is pool:
+            del self._pools[pool.key]
+        pool.stale = True
+        if pool.users <= 0:
+            await self._close(pool)
+
+    @staticmethod
+    async def _close(pool: PooledClient):
+        try:
+            await _call(pool.close, pool.client)
+        except Exception as e:
+            logger.warning(f"Could not close {pool.key[0]} client of resource {pool.key[1]}. Reason: {str(e)}")
+
+    async def _purge_idle(self, now: float):
+        if now - self._last_purge < self.idle_ttl / 10:
+            return
+        self._last_purge = now
+        for pool in [pool for pool in self._pools.values() if pool.users <= 0 and now - pool.last_used > self.idle_ttl]:
+            await self._remove(pool)
+
+    async def _purge_over_limit(self, skip: PooledClient):
+        # Least recently used first. Clients in use are not closed, so the limit may be exceeded for a while.
+        over_limit = len(self._pools) - self.max_pools
+        if over_limit <= 0:
+            return
+        for pool in [pool for pool in self._pools.values() if pool.users <= 0 and pool is not skip][:over_limit]:
+            await self._remove(pool)
+
+
+connection_pools = ConnectionPoolRegistry(
+    max_pools=tracardi.connection_pools_max,
+    idle_ttl=tracardi.connection_pool_idle_ttl,
+    health_check_interval=tracardi.connection_pool_health_check_interval
+)
@@ -1,7 +1,6 @@
 import logging
 from typing import List
 
-from deepdiff import DeepDiff
 from tracardi.service.cache_manager import CacheManager
 
 from tracardi.config import tracardi
@@ -29,32 +28,31 @@ class DestinationOrchestrator:
         self.session = session
         self.profile = profile
 
-    async def sync_destination(self, has_profile, profile_copy):
-        if has_profile and profile_copy is not None:
-            new_profile = self.profile.dict(exclude={"operation": ...})
-
-            if profile_copy != new_profile:
-                profile_delta = DeepDiff(profile_copy, new_profile, ignore_order=True)
-                if profile_delta:
-                    logger.debug("Profile changed. Destination scheduled to run.")
-                    try:
-                        load_destination_task = cache.profile_destinations
-                        await profile_destination_dispatch(load_destination_task,
-                                                           profile=self.profile,
-                                                           session=self.session,
-                                                           debug=False)
-                    except Exception as e:
-                        # todo - this appends error to the same profile - it rather should be en event error
-                        self.console_log.append(Console(
-                            flow_id=None,
-                            node_id=None,
-                            event_id=None,
-                            profile_id=get_entity_id(self.profile),
-                            origin='destination',
-                            class_name=DestinationOrchestrator.__name__,
-                            module=__name__,
-                            type='error',
-                            message=str(e),
-                            traceback=get_traceback(e)
-                        ))
-                        logger.error(str(e))
+    async def sync_destination(self, has_profile, original_profile: Profile):
+        """
+        Dispatches profile to destinations if it was replaced or changed since `original_profile.reset_changes()`.
+        """
+        if has_profile and original_profile is not None:
+            if self.profile is not original_profile or self.profile.has_changes():
+                logger.debug("Profile changed. Destination scheduled to run.")
+                try:
+                    load_destination_task = cache.profile_destinations
+                    await profile_destination_dispatch(load_destination_task,
+                                                       profile=self.profile,
+                                                       session=self.session,
+                                                       debug=False)
+                except Exception as e:
+                    # todo - this appends error to the same profile - it rather should be en event error
+                    self.console_log.append(Console(
+                        flow_id=None,
+                        node_id=None,
+                        event_id=None,
+                        profile_id=get_entity_id(self.profile),
+                        origin='destination',
+                        class_name=DestinationOrchestrator.__name__,
+                        module=__name__,
+                        type='error',
+                        message=str(e),
+                        traceback=get_traceback(e)
+                    ))
+                    logger.error(str(e))
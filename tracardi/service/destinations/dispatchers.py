@@ -1,10 +1,12 @@
 import asyncio
 import logging
 from collections import Callable
-from typing import Any
+from functools import lru_cache, partial
+from typing import Any, List, Tuple, Awaitable, Dict
 
 from tracardi.domain.api_instance import ApiInstance
 from tracardi.process_engine.destination.destination_interface import DestinationInterface
+from tracardi.service.destinations.resource_loader import load_resource
 from tracardi.service.postpone_call import PostponedCall
 from tracardi.service.module_loader import load_callable, import_package
 from tracardi.domain.resource import Resource
@@ -15,7 +17,6 @@ from tracardi.service.notation.dict_traverser import DictTraverser
 from tracardi.service.cache_manager import CacheManager
 from tracardi.domain.destination import DestinationRecord, Destination
 from tracardi.service.notation.dot_accessor import DotAccessor
-from tracardi.service.storage.driver import storage
 
 logger = logging.getLogger(__name__)
 logger.setLevel(tracardi.logging_level)
@@ -30,12 +31,75 @@ def _get_class_and_module(package):
     return ".".join(parts[:-1]), parts[-1]
 
 
-def _get_destination_class(destination: Destination):
-    module, class_name = _get_class_and_module(destination.destination.package)
+@lru_cache(maxsize=128)
+def _get_destination_class_by_package(package: str):
+    module, class_name = _get_class_and_module(package)
     module = import_package(module)
     return load_callable(module, class_name)
 
 
+def _get_destination_class(destination: Destination):
+    return _get_destination_class_by_package(destination.destination.package)
+
+
+async def _dispatch(name: str, dispatch: Callable[[], Awaitable], semaphore: asyncio.Semaphore):
+    async with semaphore:
+        try:
+            if tracardi.destination_timeout > 0:
+                await asyncio.wait_for(dispatch(), timeout=tracardi.destination_timeout)
+            else:
+                await dispatch()
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Destination {name} did not respond in {tracardi.destination_timeout}s.")
+
+
+async def _dispatch_in_order(dispatches: List[Tuple[str, Callable[[], Awaitable]]],
+                             semaphore: asyncio.Semaphore) -> List[Exception]:
+    errors = []
+    for name, dispatch in dispatches:
+        try:
+            await _dispatch(name, dispatch, semaphore)
+        except Exception as e:
+            logger.error(f"Destination {name} failed. Reason: {repr(e)}")
+            errors.append(e)
+    return errors
+
+
+async def _dispatch_all(dispatches: List[Tuple[str, Callable[[], Awaitable]]]):
+    """
+    Runs dispatches, at most `destination_concurrency` at once, each limited to `destination_timeout` seconds.
+    Dispatches of different destinations run concurrently. Dispatches of one destination, e.g. of all events of
+    a request, run one after another, so the destination receives them in order. Failing dispatch does not stop
+    the others. All errors are logged and the first one is raised when all dispatches are finished.
+    """
+
+    if not dispatches:
+        return
+
+    destination_dispatches: Dict[str, List[Tuple[str, Callable[[], Awaitable]]]] = {}
+    for name, dispatch in dispatches:
+        destination_dispatches.setdefault(name, []).append((name, dispatch))
+
+    semaphore = asyncio.Semaphore(max(1, tracardi.destination_concurrency))
+    results = await asyncio.gather(*[_dispatch_in_order(ordered_dispatches, semaphore)
+                                     for ordered_dispatches in destination_dispatches.values()])
+
+    errors = [error for destination_errors in results for error in destination_errors]
+    if errors:
+        raise errors[0]
+
+
+async def _dispatch_prepared(dispatches: List[Tuple[str, Callable[[], Awaitable]]]):
+    """
+    Dispatches destinations prepared before an error. Their errors are only logged, so the original error
+    is raised.
+    """
+    try:
+        await _dispatch_all(dispatches)
+    except Exception:
+        pass
+
+
 async def _get_destination_dispatchers(destinations, dot, template):
     for destination in destinations:
 
@@ -43,7 +107,7 @@ async def _get_destination_dispatchers(destinations, dot, template):
             continue
 
         # Load resource
-        resource = await storage.driver.resource.load(destination.resource.id)
+        resource = await load_resource(destination.resource.id)
 
         if resource.enabled is False:
             raise ConnectionError(f"Can't connect to disabled resource: {resource.name}.")
@@ -63,26 +127,35 @@ async def _get_destination_dispatchers(destinations, dot, template):
 async def event_destination_dispatch(load_destination_task: Callable, profile, session, events, debug):
     logger.info("Dispatching events via event destination.")
     dot = DotAccessor(profile, session)
-    for ev in events:
-        destinations = [DestinationRecord(**destination_record) for destination_record in
-                        await load_destination_task(ev.type, ev.source.id,
-                                                    ttl=memory_cache.event_destination_cache_ttl)]
+    dispatches = []
+    try:
+        for ev in events:
+            destinations = [DestinationRecord(**destination_record) for destination_record in
+                            await load_destination_task(ev.type, ev.source.id,
+                                                        ttl=memory_cache.event_destination_cache_ttl)]
 
-        dot.set_storage("event", ev)
+            dot.set_storage("event", ev)
 
-        template = DictTraverser(dot, default=None)
+            template = DictTraverser(dot, default=None)
 
-        async for destination, resource, data in _get_destination_dispatchers(
-                destinations,
-                dot,
-                template):  # type: Destination, Resource, Any
+            async for destination, resource, data in _get_destination_dispatchers(
+                    destinations,
+                    dot,
+                    template):  # type: Destination, Resource, Any
 
-            destination_class = _get_destination_class(destination)
-            destination_instance = destination_class(debug, resource, destination)  # type: DestinationInterface
-            logger.info(f"Event destination class {destination_class}.")
+                destination_class = _get_destination_class(destination)
+                destination_instance = destination_class(debug, resource, destination)  # type: DestinationInterface
+                logger.info(f"Event destination class {destination_class}.")
 
-            reshaped_data = template.reshape(reshape_template=destination.mapping)
-            await destination_instance.dispatch_event(reshaped_data, profile=profile, session=session, event=ev)
+                dispatches.append((
+                    destination.name,
+                    partial(destination_instance.dispatch_event, data, profile=profile, session=session, event=ev)
+                ))
+    except Exception:
+        await _dispatch_prepared(dispatches)
+        raise
+
+    await _dispatch_all(dispatches)
 
 
 async def profile_destination_dispatch(load_destination_task: Callable,
@@ -96,25 +169,33 @@ async def profile_destination_dispatch(load_destination_task: Callable,
     destinations = [DestinationRecord(**destination_record) for destination_record in
                     await load_destination_task(ttl=memory_cache.profile_destination_cache_ttl)]
 
-    async for destination, resource, data in _get_destination_dispatchers(
-                destinations,
-                dot,
-                template):  # type: Destination, Resource, Any
-
-        destination_class = _get_destination_class(destination)
-        destination_instance = destination_class(debug, resource, destination)  # type: DestinationInterface
-
-        # Run postponed destination sync
-        if tracardi.postpone_destination_sync > 0:
-            postponed_call = PostponedCall(
-                profile.id,
-                destination_instance.dispatch_profile,
-                ApiInstance().id,
-                data,  # *args
-                profile,
-                session
-            )
-            postponed_call.wait = tracardi.postpone_destination_sync
-            postponed_call.run(asyncio.get_running_loop())
-        else:
-            await destination_instance.dispatch_profile(data, profile, session)
+    dispatches = []
+    try:
+        async for destination, resource, data in _get_destination_dispatchers(
+                    destinations,
+                    dot,
+                    template):  # type: Destination, Resource, Any
+
+            destination_class = _get_destination_class(destination)
+            destination_instance = destination_class(debug, resource, destination)  # type: DestinationInterface
+
+            # Run postponed destination sync
+            if tracardi.postpone_destination_sync > 0:
+                postponed_call = PostponedCall(
+                    profile.id,
+                    destination_instance.dispatch_profile,
+                    ApiInstance().id,
+                    data,  # *args
+                    profile,
+                    session
+                )
+                postponed_call.wait = tracardi.postpone_destination_sync
+                await postponed_call.run(asyncio.get_running_loop())
+            else:
+                dispatches.append((destination.name,
+                                   partial(destination_instance.dispatch_profile, data, profile, session)))
+    except Exception:
+        await _dispatch_prepared(dispatches)
+        raise
+
+    await _dispatch_all(dispatches)
@@ -0,0 +1,12 @@
+from tracardi.config import memory_cache as memory_cache_config
+from tracardi.event_server.utils.memory_cache import MemoryCache
+
+memory_cache = MemoryCache("destination-resources", max_pool=200, allow_null_values=False,
+                           stale_ttl=memory_cache_config.stale_ttl)
+
+
+def invalidate_resource(resource_id: str):
+    """
+    Removes cached resource. Must be called when the resource is saved or deleted.
+    """
+    del memory_cache[resource_id]
@@ -0,0 +1,16 @@
+from tracardi.config import memory_cache
+from tracardi.domain.resource import Resource
+from tracardi.event_server.utils.memory_cache import MemoryCache
+from tracardi.service.destinations.resource_cache import memory_cache as resource_cache
+from tracardi.service.storage.drivers.elastic import resource as resource_db
+
+
+async def load_resource(resource_id: str) -> Resource:
+    """
+    Loads enabled resource. Resources are cached for DESTINATION_RESOURCE_CACHE_TTL seconds.
+    """
+
+    ttl = memory_cache.destination_resource_cache_ttl
+    if ttl > 0:
+        return await MemoryCache.cache(resource_cache, resource_id, ttl, resource_db.load, True, resource_id)
+    return await resource_db.load(resource_id)
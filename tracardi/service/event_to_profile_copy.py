@@ -0,0 +1,308 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotty_dict import Dotty
+from pydantic import ValidationError
+
+from tracardi.domain.console import Console
+from tracardi.domain.event import Event
+from tracardi.domain.event_to_profile import EventToProfile
+from tracardi.domain.profile import Profile
+from tracardi.domain.session import Session
+from tracardi.domain.storage_record import StorageRecords
+from tracardi.exceptions.exception_service import get_traceback
+from tracardi.process_engine.tql.condition import Condition
+from tracardi.process_engine.tql.transformer.expr_compiler import CompiledCondition
+from tracardi.service.console_log import ConsoleLog
+from tracardi.service.notation.dot_accessor import DotAccessor
+from tracardi.service.utils.getters import get_entity_id
+
+EQUALS = 0
+EQUALS_IF_NOT_EXISTS = 1
+APPEND = 2
+
+ALLOWED_PROFILE_FIELDS = ("traits", "pii", "ids", "stats", "segments", "interests", "consents", "aux")
+
+
+class ProfilePath:
+
+    """
+    Dotted path to profile data, split once. Numeric keys index lists.
+    """
+
+    __slots__ = ('path', 'field', 'keys')
+
+    def __init__(self, path: str):
+        self.path = path
+        self.keys = path.split('.')
+        self.field = self.keys[0]
+
+    @staticmethod
+    def _get(data, key):
+        try:
+            if isinstance(data, list):
+                return data[int(key)]
+            return data[key]
+        except (IndexError, ValueError, TypeError):
+            raise KeyError(key)
+
+    def get(self, data: dict):
+        for key in self.keys:
+            data = self._get(data, key)
+        return data
+
+    def exists(self, data: dict) -> bool:
+        try:
+            self.get(data)
+            return True
+        except KeyError:
+            return False
+
+    def set(self, data: dict, value):
+        for key in self.keys[:-1]:
+            if isinstance(data, dict) and data.get(key, None) is None:
+                data[key] = {}
+            data = self._get(data, key)
+
+        key = self.keys[-1]
+        if isinstance(data, list):
+            try:
+                data[int(key)] = value
+            except (IndexError, ValueError):
+                raise KeyError(key)
+        elif isinstance(data, dict):
+            data[key] = value
+        else:
+            raise KeyError(key)
+
+
+class CopyMapping:
+
+    __slots__ = ('event_ref', 'profile_path', 'operation')
+
+    def __init__(self, event_ref: str, profile_ref: str, operation: int):
+        self.event_ref = event_ref
+        self.profile_path = ProfilePath(profile_ref)
+        self.operation = operation
+
+    def is_allowed(self) -> bool:
+        return self.profile_path.field in ALLOWED_PROFILE_FIELDS
+
+    def copy(self, profile_data: dict, flat_event: Dotty):
+        path = self.profile_path
+        if self.operation == APPEND:
+            if not path.exists(profile_data):
+                path.set(profile_data, [flat_event[self.event_ref]])
+            else:
+                value = path.get(profile_data)
+                if isinstance(value, list):
+                    value.append(flat_event[self.event_ref])
+                elif not isinstance(value, dict):
+                    path.set(profile_data, [value, flat_event[self.event_ref]])
+                else:
+                    raise KeyError(
+                        f"Can not append data {flat_event[self.event_ref]} to {value} at profile@{path.path}")
+
+        elif self.operation == EQUALS_IF_NOT_EXISTS:
+            if not path.exists(profile_data):
+                path.set(profile_data, flat_event[self.event_ref])
+        else:
+            path.set(profile_data, flat_event[self.event_ref])
+
+
+class CopyPlan:
+
+    """
+    Event to profile copy schema with compiled condition and profile paths.
+    """
+
+    __slots__ = ('condition', 'compiled_condition', 'condition_error', 'mappings')
+
+    def __init__(self, schema: EventToProfile):
+        self.condition = schema.config.get('condition', None)
+        self.compiled_condition: Optional[CompiledCondition] = None
+        self.condition_error: Optional[Exception] = None
+        if self.condition is not None:
+            try:
+                self.compiled_condition = Condition().compile(self.condition)
+            except Exception as e:
+                self.condition_error = e
+
+        self.mappings = [CopyMapping(event_ref, profile_ref, operation)
+                         for event_ref, profile_ref, operation in schema.items()] if schema.event_to_profile else []
+
+    def has_condition(self) -> bool:
+        return self.condition is not None
+
+
+_compiled_plans: Dict[str, Tuple[StorageRecords, List[CopyPlan]]] = {}
+_max_compiled_plans = 1000
+
+
+def get_copy_plans(event_type: str, schemas: StorageRecords) -> List[CopyPlan]:
+    """
+    Returns compiled copy schemas. Schemas are compiled again only when they are reloaded, so schemas returned
+    by the memory cache are compiled once per cache ttl.
+    """
+
+    cached = _compiled_plans.get(event_type, None)
+    if cached is not None and cached[0] is schemas:
+        return cached[1]
+
+    plans = [CopyPlan(schema.to_entity(EventToProfile)) for schema in schemas]
+
+    if len(_compiled_plans) >= _max_compiled_plans:
+        _compiled_plans.clear()
+    _compiled_plans[event_type] = (schemas, plans)
+
+    return plans
+
+
+class EventToProfileCopier:
+
+    """
+    Copies data of all events of a tracker payload to the profile in one pass. Profile fields used in copy schemas
+    are copied to dict once and are validated and set on profile once, when all events are copied. If the copied
+    data is not valid, events are copied again one by one, so only data of events with invalid values is dropped.
+    """
+
+    def __init__(self, profile: Profile, session: Optional[Session], console_log: ConsoleLog):
+        self.profile = profile
+        self.session = session
+        self.console_log = console_log
+        self._data: Dict[str, Any] = {}
+        self._fields = set()
+        self._dot: Optional[DotAccessor] = None
+        self._copies: List[Tuple[Event, Dotty, List[CopyPlan]]] = []
+        self._replaying = False
+
+    def _load_field(self, field: str):
+        if field not in self._data and field in Profile.__fields__:
+            self._data[field] = self.profile.dict(include={field})[field]
+
+    def _get_dot_accessor(self, event: Event) -> DotAccessor:
+        if self._dot is None:
+            # Conditions see the whole profile with data copied so far.
+            for field in Profile.__fields__:
+                self._load_field(field)
+            self._dot = DotAccessor(profile=self._data, session=self.session)
+        self._dot.set_storage('event', event)
+        return self._dot
+
+    def _log(self, event: Event, type: str, message: str, traceback: list):
+        if self._replaying:
+            # Messages were logged when events were copied for the first time.
+            return
+        self.console_log.append(Console(
+            flow_id=None,
+            node_id=None,
+            event_id=event.id,
+            profile_id=get_entity_id(self.profile),
+            origin='event',
+            class_name=EventToProfileCopier.__name__,
+            module=__name__,
+            type=type,
+            message=message,
+            traceback=traceback
+        ))
+
+    def _is_condition_met(self, plan: CopyPlan, event: Event) -> bool:
+        try:
+            if plan.condition_error is not None:
+                raise plan.condition_error
+            return plan.compiled_condition.evaluate(self._get_dot_accessor(event)) is not False
+        except Exception as e:
+            self._log(event, 'error',
+                      f"Routing error. "
+                      f"An error occurred when coping data from event to profile. "
+                      f"There is error in the conditional trigger settings for event "
+                      f"`{event.type}`."
+                      f"Could not parse or access data for if statement: `{plan.condition}`. "
+                      f"Data was not copied but the event was routed to the next step. ",
+                      get_traceback(e))
+            return False
+
+    def copy(self, event: Event, flat_event: Dotty, plans: List[CopyPlan]):
+        if not plans:
+            return
+
+        self._copies.append((event, flat_event, plans))
+        self._copy(event, flat_event, plans)
+
+    def _copy(self, event: Event, flat_event: Dotty, plans: List[CopyPlan]):
+        for plan in plans:
+
+            if plan.has_condition() and not self._is_condition_met(plan, event):
+                continue
+
+            for mapping in plan.mappings:
+                if not mapping.is_allowed():
+                    self._log(event, 'warning',
+                              f"You are trying to copy the data to unknown field in profile. "
+                              f"Your profile reference `{mapping.profile_path.path}` does not start with typical "
+                              f"fields that are {ALLOWED_PROFILE_FIELDS}. Please check if there isn't "
+                              f"an error in your copy schema. Data will not be copied if it does not "
+                              f"match Profile schema.",
+                              [])
+
+                try:
+                    self._load_field(mapping.profile_path.field)
+                    mapping.copy(self._data, flat_event)
+                    self._fields.add(mapping.profile_path.field)
+                except KeyError as e:
+                    event_ref = mapping.event_ref
+                    profile_ref = mapping.profile_path.path
+                    if event_ref.startswith(("properties", "traits")):
+                        message = f"Can not copy data from event `{event_ref}` to profile `{profile_ref}`. " \
+                                  f"Original data send to processing. Error message: {repr(e)} key."
+                    else:
+                        message = f"Can not copy data from event `{event_ref}` to profile `{profile_ref}`. " \
+                                  f"Maybe `properties.{event_ref}` or `traits.{event_ref}` could work. " \
+                                  f"Original data send to processing. Error message: {repr(e)} key."
+                    self._log(event, 'warning', message, get_traceback(e))
+
+    def _update_profile(self):
+        self.profile.update_fields({field: self._data[field] for field in self._fields if field in self._data})
+
+    def commit(self) -> bool:
+        """
+        Validates copied data and sets it on profile. If data is not valid, data of every event is validated
+        and set on profile separately. Returns False if data of any event was not valid and was not copied.
+        """
+
+        if not self._fields:
+            return True
+
+        try:
+            self._update_profile()
+            return True
+        except ValidationError:
+            pass
+
+        valid = True
+        for event, flat_event, plans in self._copies:
+            # Every event starts with the profile updated by the previous valid events.
+            self._data = {}
+            self._fields = set()
+            self._dot = None
+            self._replaying = True
+            try:
+                self._copy(event, flat_event, plans)
+            finally:
+                self._replaying = False
+
+            try:
+                self._update_profile()
+            except ValidationError as e:
+                valid = False
+                self._log(event, 'error',
+                          f"It seems that there was an error when trying to add or update some information to "
+                          f"your profile. The error occurred because you tried to add a value that is not "
+                          f"allowed by the type of data that the profile can accept.  For instance, you may "
+                          f"have tried to add a name to a field in your profile that only accepts a single "
+                          f"string, but you provided a list of strings instead. No changes were made to your "
+                          f"profile, and the original data you sent was not copied because it did not meet the "
+                          f"requirements of the profile. "
+                          f"Details: {repr(e)}. See: event to profile copy schema for event `{event.type}`.",
+                          get_traceback(e))
+
+        return valid
@@ -4,7 +4,7 @@ from typing import List, Set
 from tracardi.domain.entity import Entity
 from tracardi.service.singleton import Singleton
 from tracardi.service.storage.redis.collections import Collection
-from tracardi.service.storage.redis_client import RedisClient
+from tracardi.service.storage.redis_client import AsyncRedisClient
 
 batch = 3
 i = 0
@@ -20,12 +20,12 @@ class FieldMapper(metaclass=Singleton):
     def __init__(self):
         self.i = 0
         self.batch = 3
-        self.redis = RedisClient()
+        self.redis = AsyncRedisClient()
 
-    def get_field_mapping(self, type) -> Set[str]:
-        return {item.decode() for item in self.redis.client.smembers(redis_collections[type])}
+    async def get_field_mapping(self, type) -> Set[str]:
+        return {item.decode() for item in await self.redis.client.smembers(redis_collections[type])}
 
-    def add_field_mappings(self, type, entities: List[Entity]):
+    async def add_field_mappings(self, type, entities: List[Entity]):
         self.i += 1
 
         new_props = set()
@@ -42,13 +42,16 @@ class FieldMapper(metaclass=Singleton):
         field_mappings[type].update(new_props)
 
         if self.i > self.batch:
-            self.save_cache()
+            await self.save_cache()
 
-    def save_cache(self):
+    async def save_cache(self):
         self.i = 0
-        for type, field_maps in field_mappings.items():
-            if len(field_maps) > 0:
-                self.redis.client.sadd(redis_collections[type], *list(field_maps))
+        # All collections are saved in one round trip.
+        async with self.redis.client.pipeline(transaction=False) as pipe:
+            for type, field_maps in field_mappings.items():
+                if len(field_maps) > 0:
+                    pipe.sadd(redis_collections[type], *list(field_maps))
+            await pipe.execute()
 
         # field_mappings['profile'] = set()
         # field_mappings['event'] = set()
@@ -0,0 +1,333 @@
+import asyncio
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from time import time
+from typing import List, Optional, Set, Tuple
+
+import aioredis
+
+from tracardi.config import tracardi
+from tracardi.domain.segment import Segment
+from tracardi.domain.storage_record import StorageRecord
+from tracardi.exceptions.log_handler import log_handler
+from tracardi.service.logger_manager import log_shipper
+from tracardi.service.notation.dot_accessor import DotAccessor
+from tracardi.service.segmentation import SegmentIndex
+from tracardi.service.storage.driver import storage
+from tracardi.service.storage.redis.collections import Collection, Queue
+from tracardi.service.storage.redis_client import AsyncRedisClient
+
+logger = logging.getLogger(__name__)
+logger.setLevel(tracardi.logging_level)
+logger.addHandler(log_handler)
+
+# Segment conditions compiled once per process of the pool.
+_segment_index: Optional[SegmentIndex] = None
+
+
+def _load_segment_index(segments: List[dict]):
+    global _segment_index
+    _segment_index = SegmentIndex([Segment(**segment) for segment in segments])
+
+
+def _segment_profiles(profiles: List[dict], remove_unmatched: bool) -> Tuple[List[Tuple[int, List[str]]], int]:
+    """
+    Evaluates conditions of all segments for every profile. Returns positions of profiles whose segments
+    changed, with their new segments, and the number of conditions that could not be evaluated.
+    """
+
+    changes = []
+    errors = 0
+    for position, profile in enumerate(profiles):
+        current_segments = profile.get('segments', None) or []
+        dot = DotAccessor(profile=profile)
+
+        matched = []
+        not_matched = set()
+        for segment in _segment_index.segments:
+            try:
+                if segment.error is not None:
+                    raise segment.error
+                if segment.compiled_condition.evaluate(dot):
+                    matched.append(segment.id)
+                else:
+                    not_matched.add(segment.id)
+            except Exception:
+                # Segment that could not be evaluated keeps the current state.
+                errors += 1
+
+        segments = [segment_id for segment_id in current_segments
+                    if not remove_unmatched or segment_id not in not_matched]
+        segments += [segment_id for segment_id in matched if segment_id not in segments]
+
+        if segments != current_segments:
+            changes.append((position, segments))
+
+    return changes, errors
+
+
+class LiveSegmentationCheckpoint:
+
+    """
+    Keeps numbers of profile index slices that were re-segmented, so an interrupted run is resumed from
+    the slices that did not finish. Checkpoint is kept in redis for `ttl` seconds. Segmentation works
+    without it if redis is not available.
+    """
+
+    def __init__(self, slices: int, ttl: int = None, client=None):
+        self.key = f"{Collection.live_segmentation}{slices}:finished-slices"
+        self.ttl = tracardi.live_segmentation_checkpoint_ttl if ttl is None else ttl
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = AsyncRedisClient().client
+        return self._client
+
+    async def finished_slices(self) -> Set[int]:
+        try:
+            return {int(slice_id) for slice_id in await self.client.smembers(self.key)}
+        except aioredis.RedisError as e:
+            logger.warning(f"Could not read live segmentation checkpoint {self.key}. Reason: {str(e)}")
+            return set()
+
+    async def finish(self, slice_id: int):
+        try:
+            await self.client.sadd(self.key, slice_id)
+            await self.client.expire(self.key, self.ttl)
+        except aioredis.RedisError as e:
+            logger.warning(f"Could not save live segmentation checkpoint {self.key}. Reason: {str(e)}")
+
+    async def clear(self):
+        try:
+            await self.client.delete(self.key)
+        except aioredis.RedisError as e:
+            logger.warning(f"Could not remove live segmentation checkpoint {self.key}. Reason: {str(e)}")
+
+
+class LiveSegmentationStats:
+
+    __slots__ = ('total', 'processed', 'changed', 'conflicts', 'errors', 'started')
+
+    def __init__(self, total: int = 0):
+        self.total = total
+        self.processed = 0
+        self.changed = 0
+        self.conflicts = 0
+        self.errors = 0
+        self.started = time()
+
+    def get_throughput(self) -> float:
+        elapsed = time() - self.started
+        return self.processed / elapsed if elapsed > 0 else 0
+
+    def get_eta(self) -> Optional[float]:
+        throughput = self.get_throughput()
+        if throughput == 0:
+            return None
+        return max(self.total - self.processed, 0) / throughput
+
+    def dict(self) -> dict:
+        return {
+            "total": self.total,
+            "processed": self.processed,
+            "changed": self.changed,
+            "conflicts": self.conflicts,
+            "errors": self.errors,
+            "profiles_per_second": self.get_throughput(),
+            "eta": self.get_eta()
+        }
+
+    def __str__(self):
+        eta = self.get_eta()
+        return f"{self.processed}/{self.total} profiles, {self.changed} changed, {self.conflicts} conflicts, " \
+               f"{self.errors} errors, {self.get_throughput():.0f} profiles/s, " \
+               f"eta {'unknown' if eta is None else f'{eta:.0f}s'}"
+
+
+class LiveSegmentation:
+
+    """
+    Re-segments all profiles. Profile index is scanned in `slices` slices, `concurrency` slices at a time.
+    Conditions of all enabled segments are evaluated in a pool of `processes` processes, or in the current
+    process if it is 0. Only profiles whose segments changed are updated, with bulk partial updates.
+
+    Like segmentation of tracked profiles, segments are only added. With `remove_unmatched` segments whose
+    conditions are not met are also removed, including ids added by plugins that are the same as segment ids.
+
+    Finished slices are kept in a checkpoint and an interrupted run is resumed from the slices that did not
+    finish. Segmenting a profile again gives the same result, so a slice can be scanned again.
+    """
+
+    def __init__(self,
+                 slices: int = None,
+                 concurrency: int = None,
+                 processes: int = None,
+                 batch_size: int = None,
+                 progress_interval: float = None,
+                 checkpoint: LiveSegmentationCheckpoint = None,
+                 remove_unmatched: bool = False):
+        self.slices = tracardi.live_segmentation_slices if slices is None else slices
+        self.concurrency = tracardi.live_segmentation_concurrency if concurrency is None else concurrency
+        self.processes = tracardi.live_segmentation_processes if processes is None else processes
+        self.batch_size = tracardi.live_segmentation_batch_size if batch_size is None else batch_size
+        self.progress_interval = tracardi.live_segmentation_progress_interval \
+            if progress_interval is None else progress_interval
+        self.checkpoint = LiveSegmentationCheckpoint(self.slices) if checkpoint is None else checkpoint
+        self.remove_unmatched = remove_unmatched
+        self.stats = LiveSegmentationStats()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @staticmethod
+    async def _load_segments() -> List[dict]:
+        segments = []
+        for record in await storage.driver.segment.load_enabled_segments():
+            try:
+                segment = Segment(**record)
+            except ValueError as e:
+                logger.error(f"Invalid segment {record.get('id', None)}. Details: {str(e)}")
+                continue
+            segments.append(segment.dict())
+        return segments
+
+    async def _evaluate(self, profiles: List[dict]) -> Tuple[List[Tuple[int, List[str]]], int]:
+        if self._executor is None:
+            return _segment_profiles(profiles, self.remove_unmatched)
+
+        # Batch is split, so every process of the pool evaluates a part of it.
+        loop = asyncio.get_running_loop()
+        chunk_size = -(-len(profiles) // self.processes)
+        offsets = range(0, len(profiles), chunk_size)
+        results = await asyncio.gather(*[
+            loop.run_in_executor(self._executor, _segment_profiles, profiles[offset:offset + chunk_size],
+                                 self.remove_unmatched)
+            for offset in offsets])
+
+        changes = []
+        errors = 0
+        for offset, (chunk_changes, chunk_errors) in zip(offsets, results):
+            changes += [(offset + position, segments) for position, segments in chunk_changes]
+            errors += chunk_errors
+        return changes, errors
+
+    async def _process_batch(self, records: List[StorageRecord]):
+        changes, errors = await self._evaluate([dict(record) for record in records])
+        self.stats.errors += errors
+
+        if changes:
+            updates = [(records[position].get_meta_data(), segments) for position, segments in changes]
+            responses = await storage.driver.profile.update_segments(updates)
+            for (metadata, _), (ok, response) in zip(updates, responses):
+                if ok:
+                    self.stats.changed += 1
+                else:
+                    # Profile was saved in the meantime and segmented when it was saved.
+                    logger.debug(f"Could not update segments of profile {metadata.id}, "
+                                 f"status {response.get('update', {}).get('status', None)}.")
+                    self.stats.conflicts += 1
+
+        self.stats.processed += len(records)
+
+    async def _run_slice(self, slice_id: int):
+        batch = []
+        pending = None
+        try:
+            async for record in storage.driver.profile.scan_slice(slice_id, self.slices, self.batch_size):
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    # Next batch is scanned while this one is evaluated and saved.
+                    if pending is not None:
+                        await pending
+                    pending = asyncio.create_task(self._process_batch(batch))
+                    batch = []
+
+            if pending is not None:
+                await pending
+            if batch:
+                await self._process_batch(batch)
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+
+        await self.checkpoint.finish(slice_id)
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            logger.info(f"Live segmentation: {self.stats}")
+
+    async def run(self, resume: bool = True) -> LiveSegmentationStats:
+        if not resume:
+            await self.checkpoint.clear()
+
+        finished_slices = await self.checkpoint.finished_slices()
+        slice_ids = [slice_id for slice_id in range(self.slices) if slice_id not in finished_slices]
+
+        # Profiles of finished slices are not counted, assuming slices are of the same size.
+        total = (await storage.driver.profile.count())['count']
+        self.stats = LiveSegmentationStats(total=total * len(slice_ids) // self.slices)
+
+        if finished_slices:
+            logger.info(f"Live segmentation resumed. {len(finished_slices)} of {self.slices} slices are finished.")
+
+        segments = await self._load_segments()
+        if self.processes > 0:
+            self._executor = ProcessPoolExecutor(self.processes, initializer=_load_segment_index,
+                                                 initargs=(segments,))
+        else:
+            _load_segment_index(segments)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _run_slice(slice_id: int):
+            async with semaphore:
+                await self._run_slice(slice_id)
+
+        reporter = asyncio.create_task(self._report())
+        tasks = [asyncio.create_task(_run_slice(slice_id)) for slice_id in slice_ids]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            reporter.cancel()
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+        await self.checkpoint.clear()
+        logger.info(f"Live segmentation finished: {self.stats}")
+        return self.stats
+
+
+async def schedule_live_segmentation(resume: bool = True, remove_unmatched: bool = False):
+    await AsyncRedisClient().client.rpush(Queue.segmentation, json.dumps({
+        "resume": resume,
+        "remove_unmatched": remove_unmatched
+    }))
+
+
+async def live_segmentation_worker():
+    """
+    Runs live segmentation for every job scheduled in the segmentation queue with `schedule_live_segmentation`.
+    Worker is started with `python -m tracardi.service.live_segmentation`.
+    """
+
+    client = AsyncRedisClient().client
+    try:
+        while True:
+            _, job = await client.blpop(Queue.segmentation)
+            job = json.loads(job)
+            try:
+                live_segmentation = LiveSegmentation(remove_unmatched=job.get('remove_unmatched', False))
+                await live_segmentation.run(resume=job.get('resume', True))
+            except Exception as e:
+                logger.error(f"Live segmentation failed. It will be resumed with the next job. Reason: {str(e)}")
+    finally:
+        await log_shipper.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(live_segmentation_worker())
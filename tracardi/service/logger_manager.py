@@ -1,24 +1,125 @@
 import asyncio
-from typing import Optional
+import logging
+from collections import deque
+from typing import Optional, List
 
 from tracardi.config import tracardi
 from tracardi.exceptions.log_handler import log_handler
+from tracardi.service.console_log import ConsoleLog
 from tracardi.service.storage.driver import storage
 
+logger = logging.getLogger(__name__)
+logger.setLevel(tracardi.logging_level)
+logger.addHandler(log_handler)
+
+
+class LogShipper:
+
+    """
+    Saves logs in the background. Console logs of requests and logs caught by the log handler are kept in
+    bounded ring buffers and saved in bulk, `batch_size` logs per call, by one task that runs every `interval`
+    seconds. When a buffer is full the oldest logs are dropped and counted.
+
+    Existence of the log index template is checked only until it is found. Buffered logs are saved when the task
+    is cancelled, e.g. when the event loop is closed. Applications should await `stop` on shutdown.
+    """
+
+    def __init__(self, interval: float = None, batch_size: int = None, max_size: int = None):
+        self.interval = tracardi.log_ship_interval if interval is None else interval
+        self.batch_size = tracardi.log_ship_batch_size if batch_size is None else batch_size
+        self.console_logs = deque(maxlen=tracardi.log_buffer_size if max_size is None else max_size)
+        self.dropped_console_logs = 0
+        self.failed = 0
+        self._log_index_exists = False
+        self._task: Optional[asyncio.Task] = None
+
+    def ship_console_log(self, console_log: ConsoleLog):
+        for record in console_log.get_encoded():
+            if len(self.console_logs) == self.console_logs.maxlen:
+                self.dropped_console_logs += 1
+            self.console_logs.append(record)
+        self.start()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            # Cancelled task saves buffered logs.
+            await asyncio.gather(task, return_exceptions=True)
+        await self.flush()
+
+    async def _run(self):
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                await self.flush()
+        except asyncio.CancelledError:
+            await self.flush()
+            raise
+
+    async def _log_index_ready(self) -> bool:
+        if not self._log_index_exists:
+            self._log_index_exists = await storage.driver.log.exists()
+        return self._log_index_exists
+
+    async def _save(self, save, batch: List[dict]):
+        try:
+            await save(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Could not save {len(batch)} logs. Reason: {str(e)}")
+
+    async def flush(self):
+        while self.console_logs:
+            batch = [self.console_logs.popleft() for _ in range(min(self.batch_size, len(self.console_logs)))]
+            await self._save(storage.driver.console_log.save_all, batch)
+
+        if not log_handler.has_logs():
+            return
+
+        try:
+            if not await self._log_index_ready():
+                logger.warning("Log index still not created. Saving logs postponed.")
+                return
+        except Exception as e:
+            logger.error(f"Could not check if log index exists. Reason: {str(e)}")
+            return
+
+        # Logs of failed saves are added while draining, so save only logs that are already buffered.
+        for _ in range(-(-len(log_handler.collection) // self.batch_size)):
+            await self._save(storage.driver.log.save, log_handler.drain(self.batch_size))
+
+    def get_stats(self) -> dict:
+        return {
+            "console_logs": len(self.console_logs),
+            "logs": len(log_handler.collection),
+            "dropped_console_logs": self.dropped_console_logs,
+            "dropped_logs": log_handler.dropped,
+            "failed": self.failed
+        }
+
+
+log_shipper = LogShipper()
+
 
 async def save_logs() -> Optional[bool]:
-    if not tracardi.save_logs:
-        return None
     """
-    Saves errors caught by logger
+    Saves errors caught by logger. Logs are saved by the log shipper in the background, so this is needed
+    only to save them at once. Returns False if the log index does not exist yet.
     """
-    if not await storage.driver.log.exists():
+
+    if not tracardi.save_logs:
+        return None
+
+    if not await log_shipper._log_index_ready():
         return False
 
     if log_handler.has_logs():
-        # do not await
-        asyncio.create_task(storage.driver.log.save(log_handler.collection))
-        log_handler.reset()
+        await log_shipper.flush()
         return True
 
     return None
@@ -0,0 +1,220 @@
+import logging
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from time import perf_counter
+from typing import Dict, List, Tuple, Optional
+
+from tracardi.config import tracardi
+from tracardi.exceptions.log_handler import log_handler
+
+logger = logging.getLogger(__name__)
+logger.setLevel(tracardi.logging_level)
+logger.addHandler(log_handler)
+
+RULE_LOOKUP = "tracardi_rule_lookup_seconds"
+FLOW_COMPILE = "tracardi_flow_compile_seconds"
+NODE_RUN = "tracardi_node_run_seconds"
+SEGMENTATION = "tracardi_segmentation_seconds"
+PROFILE_MERGE = "tracardi_profile_merge_seconds"
+DESTINATION_DISPATCH = "tracardi_destination_dispatch_seconds"
+PERSISTENCE = "tracardi_persistence_seconds"
+PROFILE_LOCK_WAIT = "tracardi_profile_lock_wait_seconds"
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1., 2.5, 5., 10.)
+
+_HELP = {
+    RULE_LOOKUP: "Time of loading routing rules for the events of one request.",
+    FLOW_COMPILE: "Time of compiling a flow into an execution plan.",
+    NODE_RUN: "Time of the run method of a workflow node.",
+    SEGMENTATION: "Time of profile segmentation.",
+    PROFILE_MERGE: "Time of profile merging.",
+    DESTINATION_DISPATCH: "Time of sending data to destinations.",
+    PERSISTENCE: "Time of saving tracker results.",
+    PROFILE_LOCK_WAIT: "Time of waiting for the profile lock.",
+}
+
+LabelValues = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        # Counts are kept per bucket and accumulated only when exported. Last one is the +Inf bucket.
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> List[int]:
+        result = []
+        total = 0
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Returns upper bound of the bucket that holds the q-quantile, e.g. quantile(.99) for p99.
+        None means there are no observations, inf means the value is above the last bucket.
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        for bound, total in zip(self.buckets, self.cumulative_counts()):
+            if total >= rank:
+                return bound
+        return float('inf')
+
+    def dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": dict(zip([*self.buckets, float('inf')], self.cumulative_counts()))
+        }
+
+
+class _Timer:
+
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+        self.start = 0.
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.histogram.observe(perf_counter() - self.start)
+
+
+class _NullTimer:
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_null_timer = _NullTimer()
+
+
+class MetricsExporter(ABC):
+
+    """
+    Receives metrics when MetricsRegistry.export is called, e.g. to push them to an external monitoring system.
+    """
+
+    @abstractmethod
+    async def export(self, registry: 'MetricsRegistry'):
+        pass
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value))
+
+
+def _format_labels(labels: LabelValues, le: str = None) -> str:
+    items = [f'{name}="{_escape(value)}"' for name, value in labels]
+    if le is not None:
+        items.append(f'le="{le}"')
+    return "{" + ",".join(items) + "}" if items else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+
+    """
+    Always-on timing histograms of the tracking path. Observing a value is a dict lookup and a bisect, so it
+    can stay enabled in production. Histograms are identified by a metric name and label values, e.g. node run
+    time is labelled with flow, node and plugin, so the p99 of every plugin in every flow can be read without
+    the workflow debugger.
+    """
+
+    def __init__(self, enabled: bool = True, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._histograms: Dict[str, Dict[LabelValues, Histogram]] = {}
+        self._exporters: List[MetricsExporter] = []
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        metric = self._histograms.get(name, None)
+        if metric is None:
+            metric = {}
+            self._histograms[name] = metric
+        label_values = tuple(labels.items())
+        histogram = metric.get(label_values, None)
+        if histogram is None:
+            histogram = Histogram(self.buckets)
+            metric[label_values] = histogram
+        return histogram
+
+    def observe(self, name: str, value: float, **labels):
+        if self.enabled:
+            self.histogram(name, **labels).observe(value)
+
+    def time(self, name: str, **labels):
+        """
+        Returns context manager that observes the time of its block.
+        """
+        if not self.enabled:
+            return _null_timer
+        return _Timer(self.histogram(name, **labels))
+
+    def collect(self) -> List[Tuple[str, LabelValues, Histogram]]:
+        return [(name, label_values, histogram)
+                for name, metric in self._histograms.items()
+                for label_values, histogram in metric.items()]
+
+    def to_prometheus(self) -> str:
+        """
+        Renders metrics in Prometheus text exposition format.
+        """
+        lines = []
+        for name, metric in self._histograms.items():
+            if name in _HELP:
+                lines.append(f"# HELP {name} {_HELP[name]}")
+            lines.append(f"# TYPE {name} histogram")
+            for label_values, histogram in metric.items():
+                for bound, total in zip([*histogram.buckets, float('inf')], histogram.cumulative_counts()):
+                    lines.append(f"{name}_bucket{_format_labels(label_values, _format_value(bound))} {total}")
+                lines.append(f"{name}_sum{_format_labels(label_values)} {_format_value(histogram.sum)}")
+                lines.append(f"{name}_count{_format_labels(label_values)} {histogram.count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def add_exporter(self, exporter: MetricsExporter):
+        self._exporters.append(exporter)
+
+    def remove_exporter(self, exporter: MetricsExporter):
+        if exporter in self._exporters:
+            self._exporters.remove(exporter)
+
+    async def export(self):
+        for exporter in self._exporters:
+            try:
+                await exporter.export(self)
+            except Exception as e:
+                logger.error(f"Metrics exporter {type(exporter).__name__} failed. Reason: {str(e)}")
+
+    def reset(self):
+        self._histograms = {}
+
+
+metrics = MetricsRegistry(enabled=tracardi.metrics)
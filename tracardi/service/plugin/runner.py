@@ -43,6 +43,14 @@ class ActionRunner:
     ux: list = None
     join = None
 
+    # Reusable plugins are set up once per flow revision and node, and reused by the next events with only
+    # the context (event, profile, session, console, etc.) replaced. Set it to True only if `set_up` depends
+    # on the node configuration and not on the event context, and `run` does not keep state between events.
+    # Resource used by the plugin must be selected in `source` of the configuration, so the instance is closed
+    # when the resource changes.
+    reusable = False
+    set_up_done = False
+
     @final
     def __init__(self):
         pass
@@ -64,7 +72,8 @@ class ActionRunner:
 
     def update_profile(self):
         if isinstance(self.profile, Profile):
-            self.profile.operation.update = True
+            # Plugin may have changed the profile in place without marking the changed paths.
+            self.profile.mark_all_dirty()
         else:
             if self.event.metadata.profile_less is True:
                 self.console.warning("Can not update profile when processing profile less events.")
@@ -3,7 +3,7 @@ from typing import Optional
 
 from tracardi.config import tracardi
 from tracardi.exceptions.log_handler import log_handler
-from tracardi.service.storage.redis_client import RedisClient
+from tracardi.service.storage.redis_client import AsyncRedisClient
 
 logger = logging.getLogger(__name__)
 logger.setLevel(tracardi.logging_level)
@@ -14,53 +14,55 @@ class PostponeCache:
 
     def __init__(self, cache_type):
         logger.info(f"Cache for {cache_type} created")
-        self.redis = RedisClient()
+        self.redis = AsyncRedisClient()
         self.hash = cache_type
 
-    def exists(self, profile_id):
-        return self.redis.client.hexists(self.hash, profile_id)
+    async def exists(self, profile_id):
+        return await self.redis.client.hexists(self.hash, profile_id)
 
-    def get(self, profile_id) -> bool:
+    async def get(self, profile_id) -> bool:
+        # Sets the flag if it does not exist and tells if it existed in one atomic call.
+        created = await self.redis.client.hsetnx(self.hash, profile_id, '1')
+        return not created
 
-        if not self.exists(profile_id):
-            self.redis.client.hset(self.hash, profile_id, '1')
-            return False
+    async def set(self, profile_id):
+        await self.redis.client.hset(self.hash, profile_id, '1')
 
-        return True
-
-    def set(self, profile_id):
-        self.redis.client.hset(self.hash, profile_id, '1')
-
-    def reset(self, profile_id):
-        self.redis.client.hdel(self.hash, profile_id)
+    async def reset(self, profile_id):
+        await self.redis.client.hdel(self.hash, profile_id)
 
 
 class InstanceCache:
 
     def __init__(self, cache_type):
         logger.info(f"Cache for {cache_type} created")
-        self.redis = RedisClient()
+        self.redis = AsyncRedisClient()
         self.hash = cache_type
 
-    def exists(self, profile_id):
-        return self.redis.client.hexists(self.hash, profile_id)
+    async def exists(self, profile_id):
+        return await self.redis.client.hexists(self.hash, profile_id)
+
+    async def get_instance(self, profile_id, instance_id) -> Optional[str]:
 
-    def get_instance(self, profile_id, instance_id) -> Optional[str]:
+        if instance_id is None:
+            # Only reads the instance. Redis can not store None.
+            value_bson = await self.redis.client.hget(self.hash, profile_id)
+            return value_bson.decode('utf-8') if value_bson is not None else None
 
-        if not self.exists(profile_id):
+        async with self.redis.client.pipeline(transaction=True) as pipe:
+            created, value_bson = await pipe.hsetnx(self.hash, profile_id, instance_id).hget(
+                self.hash, profile_id).execute()
+
+        if created:
             logger.info(f"Create instance {instance_id} for profile {profile_id}")
-            self.redis.client.hset(self.hash, profile_id, instance_id)
             return None
 
-        value_bson = self.redis.client.hget(self.hash, profile_id)
-        value = value_bson.decode('utf-8')
-
-        return value
+        return value_bson.decode('utf-8')
 
-    def set_instance(self, profile_id, instance_id):
+    async def set_instance(self, profile_id, instance_id):
         logger.info(f"Destination sync for profile {profile_id} is going to be sent from worker instance {instance_id}")
-        self.redis.client.hset(self.hash, profile_id, instance_id)
+        await self.redis.client.hset(self.hash, profile_id, instance_id)
 
-    def reset(self, profile_id):
+    async def reset(self, profile_id):
         logger.debug(f"Clean profile worker instance {profile_id}")
-        self.redis.client.hdel(self.hash, profile_id)
+        await self.redis.client.hdel(self.hash, profile_id)
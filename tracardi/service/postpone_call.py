@@ -52,15 +52,18 @@ class PostponedCall:
         # dies (loop.call_later is cancelled) and there is a global flag that loop.call_later is running, but locally it
         # is not. So we must recreate it.
 
-        loop.call_later(self.wait, self._execute, loop)
+        loop.call_later(self.wait, self._start_execution, loop)
         self.lock_pool.schedule(self.profile_id)
 
+    def _start_execution(self, loop):
+        loop.create_task(self._execute(loop))
+
     def _run_scheduled(self):
         asyncio.ensure_future(self.callable_coroutine(*self.args))
         self.lock_pool.unschedule(self.profile_id)
 
-    def _execute(self, loop):
-        global_instance = self.instance_cache.get_instance(self.profile_id, None)
+    async def _execute(self, loop):
+        global_instance = await self.instance_cache.get_instance(self.profile_id, None)
         if global_instance != self.instance_id:
             logger.info(
                 f"Execution DISCARDED. Execution passed from worker instance {self.instance_id} to instance {global_instance}")
@@ -68,15 +71,15 @@ class PostponedCall:
 
         try:
             # should the execution be postponed. If there was no second call then postpone is None.
-            if self.global_postpone_flag.get(self.profile_id) is False:
+            if await self.global_postpone_flag.get(self.profile_id) is False:
                 logger.info(f"Profile {self.profile_id} destination sync RUNS from instance {self.instance_id}.")
                 # it is not postponed - run it now
                 self._run_scheduled()
 
                 # clean cache
-                self.global_postpone_flag.reset(self.profile_id)
-                self.global_schedule_flag.reset(self.profile_id)
-                self.instance_cache.reset(self.profile_id)
+                await self.global_postpone_flag.reset(self.profile_id)
+                await self.global_schedule_flag.reset(self.profile_id)
+                await self.instance_cache.reset(self.profile_id)
 
             else:
                 # postpone call. Postpone flag is true
@@ -84,22 +87,22 @@ class PostponedCall:
                 logger.info(
                     f"Execution on worker instance {self.instance_id} POSTPONED for {self.wait}s for profile {self.profile_id}")
                 # delete postpone flag. It can be set again if there is another call.
-                self.global_postpone_flag.reset(self.profile_id)
+                await self.global_postpone_flag.reset(self.profile_id)
 
         except Exception as e:
             logger.error(str(e))
 
-    def run(self, loop, force_recreate=False):
+    async def run(self, loop, force_recreate=False):
         # set current instance
-        self.instance_cache.set_instance(self.profile_id, self.instance_id)
+        await self.instance_cache.set_instance(self.profile_id, self.instance_id)
 
         if not self.lock_pool.is_scheduled(self.profile_id) or force_recreate:
             # if there is no schedule local. Schedule for the first time.
             self._schedule_for_later(loop)
 
-        if self.global_schedule_flag.get(self.profile_id) is False:
+        if await self.global_schedule_flag.get(self.profile_id) is False:
             # mark as scheduled globally
-            self.global_schedule_flag.set(self.profile_id)
+            await self.global_schedule_flag.set(self.profile_id)
         else:
             # if this is a second call then postpone
-            self.global_postpone_flag.set(self.profile_id)
+            await self.global_postpone_flag.set(self.profile_id)
@@ -4,6 +4,8 @@ import logging
 from ..context import get_context
 from ..domain.storage_record import RecordMetadata
 from ..service.storage.driver import storage
+from ..service.storage.index_refresher import IndexRefresher
+from ..service.storage.redis.recent_writes import recent_profiles
 from collections import defaultdict
 from datetime import datetime
 from typing import Optional, List, Dict, Tuple, Any
@@ -65,7 +67,9 @@ class ProfileMerger:
     @staticmethod
     async def _save_profile(profile):
         await storage.driver.profile.save(profile, refresh_after_save=False)
-        await storage.driver.profile.refresh()
+        # Merged profile is loaded from recent writes by any of its ids until the index is refreshed.
+        await recent_profiles.save([profile])
+        await IndexRefresher().refresh('profile')
 
     @staticmethod
     async def _delete_profile(profile_ids: List[Tuple[str, RecordMetadata]]):
@@ -1,14 +1,188 @@
 import logging
-from typing import Callable
+import re
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set, AsyncIterator, Tuple
 
-from tracardi.config import tracardi
+from lark import Token, Tree
+
+from tracardi.config import tracardi, memory_cache as memory_cache_config
 from tracardi.domain.profile import Profile
+from tracardi.domain.segment import Segment
+from tracardi.event_server.utils.memory_cache import MemoryCache
 from tracardi.exceptions.log_handler import log_handler
+from tracardi.process_engine.tql.condition import Condition
+from tracardi.service.notation.dot_accessor import DotAccessor
 
 logger = logging.getLogger(__name__)
 logger.setLevel(tracardi.logging_level)
 logger.addHandler(log_handler)
 
+memory_cache = MemoryCache("segments", max_pool=1, allow_null_values=False, stale_ttl=memory_cache_config.stale_ttl)
+
+_field_regex = re.compile(r"^(payload|session|event|profile|flow|memory)@(.*)$", re.IGNORECASE)
+
+
+def invalidate_segments():
+    """
+    Removes cached segments. Must be called when a segment is saved or deleted.
+    """
+    del memory_cache['segments']
+
+
+def _get_profile_paths(tree: Tree) -> Optional[Set[str]]:
+    """
+    Returns profile paths read by the condition, or None if the condition reads other data or the whole profile.
+    """
+    paths = set()
+    for token in tree.scan_values(lambda value: isinstance(value, Token)):
+        match = _field_regex.match(token.value)
+        if match is None:
+            continue
+        source, path = match.groups()
+        path = path.split('[')[0].rstrip('.')
+        if source.lower() != 'profile' or not path or path == '...':
+            return None
+        paths.add(path)
+    return paths
+
+
+def _overlaps(path: str, other_path: str) -> bool:
+    return path == other_path or path.startswith(f"{other_path}.") or other_path.startswith(f"{path}.")
+
+
+class IndexedSegment:
+
+    __slots__ = ('id', 'condition', 'compiled_condition', 'error', 'profile_paths')
+
+    def __init__(self, segment: Segment):
+        self.id = segment.get_id()
+        self.condition = segment.condition
+        self.compiled_condition = None
+        self.error = None
+        self.profile_paths = None
+        try:
+            self.compiled_condition = Condition().compile(segment.condition)
+            self.profile_paths = _get_profile_paths(self.compiled_condition.tree)
+        except Exception as e:
+            self.error = e
+
+    def reads_any(self, changes: Set[str]) -> bool:
+        if self.profile_paths is None:
+            return True
+        return any(_overlaps(path, change) for path in self.profile_paths for change in changes)
+
+
+class SegmentIndex:
+
+    """
+    Enabled segments indexed by event type and by the top level profile fields their conditions read.
+    """
+
+    def __init__(self, segments: List[Segment]):
+        self.segments: List[IndexedSegment] = []
+        self._event_types: Dict[str, Set[str]] = {}
+        self._fields: Dict[str, List[IndexedSegment]] = defaultdict(list)
+        self._reading_unknown_data: List[IndexedSegment] = []
+
+        for segment in segments:
+            if not segment.enabled:
+                continue
+            indexed_segment = IndexedSegment(segment)
+            self.segments.append(indexed_segment)
+            self._event_types[indexed_segment.id] = set(segment.eventType or [])
+            if indexed_segment.profile_paths is None:
+                self._reading_unknown_data.append(indexed_segment)
+            else:
+                for field in {path.split('.')[0] for path in indexed_segment.profile_paths}:
+                    self._fields[field].append(indexed_segment)
+
+    def __len__(self):
+        return len(self.segments)
+
+    def get_event_type(self, segment: IndexedSegment, event_types: List[str]) -> Optional[str]:
+        segment_event_types = self._event_types[segment.id]
+        for event_type in event_types:
+            if not segment_event_types or event_type in segment_event_types:
+                return event_type
+        return None
+
+    def get_segments_reading(self, changes: Optional[Set[str]]) -> List[IndexedSegment]:
+        """
+        Returns segments which conditions may give a different result after the changes. All segments if
+        changes are not known.
+        """
+        if changes is None:
+            return self.segments
+
+        candidates = {id(segment): segment for segment in self._reading_unknown_data}
+        for field in {change.split('.')[0] for change in changes}:
+            for segment in self._fields.get(field, []):
+                candidates[id(segment)] = segment
+
+        return [segment for segment in candidates.values() if segment.reads_any(changes)]
+
+
+async def _load_segment_index(load_segments: Callable) -> SegmentIndex:
+    segments = []
+    for record in await load_segments():
+        try:
+            segments.append(Segment(**record))
+        except ValueError as e:
+            logger.error(f"Invalid segment {record.get('id', None)}. Details: {str(e)}")
+    return SegmentIndex(segments)
+
+
+async def get_segment_index(load_segments: Callable) -> SegmentIndex:
+    if memory_cache_config.segment_cache_ttl > 0:
+        return await MemoryCache.cache(
+            memory_cache,
+            'segments',
+            memory_cache_config.segment_cache_ttl,
+            _load_segment_index,
+            True,
+            load_segments
+        )
+    return await _load_segment_index(load_segments)
+
+
+async def segment_profile(profile: Profile, event_types: List[str], index: SegmentIndex, force: bool = False) \
+        -> AsyncIterator[Tuple[str, str, Optional[str]]]:
+    """
+    Adds segments which conditions are met to profile. Unless forced, only segments that read changed profile
+    data are evaluated. New profiles were never segmented, so all segments are evaluated for them.
+    Yields event type, segment id and error message.
+    """
+
+    changes = profile.get_changes() if profile.has_changes() and not profile.is_all_dirty() and not force \
+        and not profile.operation.new else None
+    dot = None
+
+    for segment in index.get_segments_reading(changes):
+        event_type = index.get_event_type(segment, event_types)
+        if event_type is None:
+            continue
+
+        try:
+            if segment.error is not None:
+                raise segment.error
+
+            if dot is None:
+                # it has access only to profile. Other data is irrelevant because we check only profile.
+                dot = DotAccessor(profile=profile)
+
+            if segment.compiled_condition.evaluate(dot):
+                if segment.id not in profile.segments:
+                    profile.segments = [*profile.segments, segment.id]
+
+                # Yield only if segmentation triggered
+                yield event_type, segment.id, None
+
+        except Exception as e:
+            msg = 'Condition id `{}` could not evaluate `{}`. The following error was raised: `{}`'.format(
+                segment.id, segment.condition, str(e).replace("\n", " "))
+
+            yield event_type, segment.id, msg
+
 
 async def segment(profile: Profile, event_types: list, load_segments: Callable) -> dict:
     segmentation_result = {"errors": [], "ids": []}
@@ -16,9 +190,12 @@ async def segment(profile: Profile, event_types: list, load_segments: Callable)
         # Segmentation
         if profile.operation.needs_update() or profile.operation.needs_segmentation():
             # Segmentation runs only if profile was updated or flow forced it
-            async for event_type, segment_id, error in profile.segment(
+            index = await get_segment_index(load_segments)
+            async for event_type, segment_id, error in segment_profile(
+                    profile,
                     event_types,
-                    load_segments):
+                    index,
+                    force=profile.operation.needs_segmentation()):
                 # Segmentation triggered
                 if error:
                     segmentation_result['errors'].append(error)
@@ -6,6 +6,8 @@ from tracardi.domain.value_object.bulk_insert_result import BulkInsertResult
 from tracardi.exceptions.exception import TracardiException
 from tracardi.domain.flow import FlowRecord
 from tracardi.service.storage.factory import storage_manager
+from tracardi.service.wf.service.execution_plan_cache import invalidate_execution_plan
+from tracardi.service.wf.service.plugin_instance_pool import plugin_instances
 
 
 async def load_record(id: str) -> Optional[FlowRecord]:
@@ -13,10 +15,14 @@ async def load_record(id: str) -> Optional[FlowRecord]:
 
 
 async def save_record(flow_record: FlowRecord) -> BulkInsertResult:
+    invalidate_execution_plan(flow_record.id)
+    await plugin_instances.invalidate(flow_record.id)
     return await storage_manager("flow").upsert(flow_record)
 
 
 async def save(flow: NamedEntity) -> BulkInsertResult:
+    invalidate_execution_plan(flow.id)
+    await plugin_instances.invalidate(flow.id)
     return await storage_manager("flow").upsert(flow)
 
 
@@ -61,6 +67,8 @@ async def flush():
 
 
 async def delete_by_id(id: str):
+    invalidate_execution_plan(id)
+    await plugin_instances.invalidate(id)
     sm = storage_manager("flow")
     return await sm.delete(id, index=sm.get_single_storage_index())
 
@@ -1,12 +1,7 @@
-import asyncio
-
 from tracardi.service.console_log import ConsoleLog
-from tracardi.service.storage.driver import storage
+from tracardi.service.logger_manager import log_shipper
 
 
 def save_console_log(console_log: ConsoleLog):
-    # Save console log
-    encoded_console_log = list(console_log.get_encoded())
-    if encoded_console_log:
-        # Save in background
-        asyncio.create_task(storage.driver.console_log.save_all(encoded_console_log))
+    # Save in background
+    log_shipper.ship_console_log(console_log)
@@ -1,13 +1,23 @@
+import logging
 from typing import Tuple, Union
 
 from tracardi.domain.payload.tracker_payload import TrackerPayload
 from tracardi.domain.profile import *
-from tracardi.config import elastic
-from tracardi.domain.storage_record import StorageRecord, StorageRecords
+from tracardi.config import elastic, tracardi
+from tracardi.domain.storage_record import StorageRecord, StorageRecords, RecordMetadata
+from tracardi.domain.value_object.bulk_insert_result import BulkInsertResult
 from tracardi.exceptions.exception import DuplicatedRecordException
+from tracardi.exceptions.log_handler import log_handler
 from tracardi.service.storage.drivers.elastic.raw import load_by_key_value_pairs
 from tracardi.service.storage.elastic_storage import ElasticFiledSort
 from tracardi.service.storage.factory import storage_manager
+from tracardi.service.storage.redis.profile_cache import profile_cache
+from tracardi.service.storage.redis.profile_directory import profile_directory
+from tracardi.service.storage.redis.recent_writes import recent_profiles
+
+logger = logging.getLogger(__name__)
+logger.setLevel(tracardi.logging_level)
+logger.addHandler(log_handler)
 
 
 async def load_by_id(profile_id: str) -> Optional[StorageRecord]:
@@ -15,8 +25,24 @@ async def load_by_id(profile_id: str) -> Optional[StorageRecord]:
     @throws DuplicatedRecordException
     """
 
+    if profile_cache.is_enabled():
+        # Profile cache is written on every save, so it also holds profiles that are not in the index yet.
+        profile_record = await profile_cache.load(profile_id)
+    else:
+        # Profile saved recently may not be in the index yet.
+        profile_record = await recent_profiles.load(profile_id)
+
+    if profile_record is not None:
+        return profile_record
+
+    if profile_directory.is_enabled():
+        profile_record = await _load_from_directory(profile_id)
+        if profile_record is not None:
+            return profile_record
+
     query = {
         "size": 2,
+        "seq_no_primary_term": True,
         "query": {
             "bool": {
                 "should": [
@@ -44,7 +70,28 @@ async def load_by_id(profile_id: str) -> Optional[StorageRecord]:
     if profile_records == 0:
         return None
 
-    return profile_records.first()
+    profile_record = profile_records.first()
+    if profile_record is not None:
+        await profile_cache.save_record(profile_record)
+        await profile_directory.save_record(profile_record)
+
+    return profile_record
+
+
+async def _load_from_directory(profile_id: str) -> Optional[StorageRecord]:
+    location = await profile_directory.load(profile_id)
+    if location is None:
+        return None
+
+    profile_index, document_id = location
+    profile_record = await storage_manager('profile').load_from_index(document_id, profile_index)
+    if profile_record is None:
+        # Profile was deleted. It is searched and the directory is updated if the profile is found.
+        await profile_directory.forget(profile_id)
+        return None
+
+    await profile_cache.save_record(profile_record)
+    return profile_record
 
 
 async def load_all(start: int = 0, limit: int = 100, sort: List[Dict[str, Dict]] = None):
@@ -66,6 +113,8 @@ async def deduplicate_profile(profile_id):
             sm = storage_manager('profile')
             await sm.delete(profile_id, index=_profile_record.get_meta_data().index)
 
+    await profile_cache.delete([profile_id])
+
     return profile
 
 
@@ -112,14 +161,86 @@ async def save(profile: Union[Profile, List[Profile]], refresh_after_save=False)
                 _profile.metadata.aux['update'] = datetime.utcnow()
     elif isinstance(profile, Profile):
         profile.metadata.aux['update'] = datetime.utcnow()
-    result = await storage_manager('profile').upsert(profile, exclude={"operation": ...})
+    if elastic.partial_profile_updates:
+        result = await _save_partially(profile if isinstance(profile, list) else [profile])
+    else:
+        result = await storage_manager('profile').upsert(profile, exclude={"operation": ...})
     if refresh_after_save or elastic.refresh_profiles_after_save:
         await storage_manager('profile').flush()
+    await _write_through(profile if isinstance(profile, list) else [profile], result)
     return result
 
 
 async def save_all(profiles: List[Profile]):
-    return await storage_manager("profile").upsert(profiles, exclude={"operation": ...})
+    if elastic.partial_profile_updates:
+        result = await _save_partially(profiles)
+    else:
+        result = await storage_manager("profile").upsert(profiles, exclude={"operation": ...})
+    await _write_through(profiles, result)
+    return result
+
+
+async def _save_partially(profiles: List[Profile]) -> BulkInsertResult:
+    """
+    Sends only changed data of profiles loaded from the index. Profiles without tracked changes, profiles changed
+    with `update_profile`, new profiles and profiles that could not be updated, e.g. changed in the index since
+    they were loaded, are saved as a whole.
+    """
+
+    updates = []
+    upserts = []
+    for profile in profiles:
+        update = profile.get_partial_update('metadata.aux.update') \
+            if isinstance(profile, Profile) and profile.has_meta_data() and profile.has_changes() \
+            and not profile.is_all_dirty() else None
+        if update is None:
+            upserts.append(profile)
+        else:
+            updates.append((profile, update))
+
+    result = BulkInsertResult()
+
+    if updates:
+        responses = await storage_manager('profile').update_partial(
+            [(profile.get_meta_data(), values, removed) for profile, (values, removed) in updates])
+        for (profile, _), (ok, response) in zip(updates, responses):
+            response = response.get('update', {})
+            metadata = profile.get_meta_data()
+            if ok:
+                profile.set_meta_data(RecordMetadata(
+                    id=metadata.id,
+                    index=metadata.index,
+                    seq_no=response.get('_seq_no', None),
+                    primary_term=response.get('_primary_term', None)
+                ))
+                result.saved += 1
+                result.ids.append(profile.id)
+            else:
+                logger.debug(f"Could not update profile {profile.id} partially, status {response.get('status', None)}. "
+                             f"Saving the whole profile.")
+                upserts.append(profile)
+
+    if upserts:
+        for profile in upserts:
+            metadata = profile.get_meta_data() if isinstance(profile, Profile) else None
+            if metadata is not None and metadata.seq_no is not None:
+                # Whole profile replaces the document, so the loaded version is not valid anymore.
+                profile.set_meta_data(RecordMetadata(id=metadata.id, index=metadata.index))
+        result += await storage_manager('profile').upsert(upserts, exclude={"operation": ...})
+
+    return result
+
+
+async def _write_through(profiles: List[Profile], result):
+    profiles = [profile for profile in profiles if isinstance(profile, Profile)]
+    if isinstance(result, BulkInsertResult) and result.has_errors():
+        # It is not known which profiles were saved.
+        await profile_cache.delete([profile.id for profile in profiles])
+    else:
+        await profile_cache.save(profiles)
+    # Profiles are saved to the index from their metadata or to the write index, so the directory is updated
+    # even if it is not known which profiles were saved.
+    await profile_directory.save(profiles)
 
 
 async def refresh():
@@ -132,18 +253,55 @@ async def flush():
 
 async def delete_by_id(id: str, index: str):
     sm = storage_manager('profile')
-    return await sm.delete(id, index)
+    result = await sm.delete(id, index)
+    await recent_profiles.delete([id])
+    await profile_cache.delete([id])
+    await profile_directory.delete([id])
+    return result
 
 
 async def bulk_delete_by_id(ids: List[str]):
     sm = storage_manager('profile')
-    return await sm.bulk_delete(ids)
+    result = await sm.bulk_delete(ids)
+    await recent_profiles.delete(ids)
+    await profile_cache.delete(ids)
+    await profile_directory.delete(ids)
+    return result
 
 
 def scan(query: dict = None):
     return storage_manager('profile').scan(query)
 
 
+def scan_slice(slice_id: int, slices: int, batch: int = 1000):
+    """
+    Scans one of `slices` parts of the profile index. Records keep seq_no and primary_term, so they can be
+    updated only if they did not change since they were scanned.
+    """
+
+    query = {
+        "seq_no_primary_term": True,
+        "query": {
+            "match_all": {}
+        }
+    }
+    if slices > 1:
+        query["slice"] = {"id": slice_id, "max": slices}
+    return storage_manager('profile').scan(query, batch)
+
+
+async def update_segments(updates: List[Tuple[RecordMetadata, List[str]]]) -> List[Tuple[bool, dict]]:
+    """
+    Replaces segments of profiles without sending whole profiles. Profiles that changed in the index since they
+    were loaded are not updated.
+    """
+
+    responses = await storage_manager('profile').update_partial(
+        [(metadata, {"segments": segments}, set()) for metadata, segments in updates])
+    await profile_cache.delete([metadata.id for (metadata, _), (ok, _) in zip(updates, responses) if ok])
+    return responses
+
+
 def query(query: dict = None):
     return storage_manager('profile').query(query)
 
@@ -247,8 +247,7 @@ async def get_mapping_fields(index) -> list:
         fields = mapping.get_field_names()
         memory_cache[memory_key] = CacheItem(data=fields, ttl=5)  # result is cached for 5 seconds
     db_mappings = memory_cache[memory_key].data
-    print(FieldMapper().get_field_mapping(index))
     set_of_db_mappings = set(db_mappings)
-    set_of_db_mappings.update(FieldMapper().get_field_mapping(index))
+    set_of_db_mappings.update(await FieldMapper().get_field_mapping(index))
     print(set_of_db_mappings)
     return sorted(list(set_of_db_mappings))
@@ -2,7 +2,10 @@ from tracardi.domain.storage_record import StorageRecords, StorageRecord
 from tracardi.domain.value_object.bulk_insert_result import BulkInsertResult
 from typing import List, Tuple, Optional
 from tracardi.domain.resource import Resource, ResourceRecord
+from tracardi.service.connection_pools import connection_pools
+from tracardi.service.destinations.resource_cache import invalidate_resource
 from tracardi.service.storage.factory import storage_manager
+from tracardi.service.wf.service.plugin_instance_pool import plugin_instances
 
 
 async def refresh():
@@ -29,10 +32,19 @@ async def load_record(id: str) -> Optional[ResourceRecord]:
 
 
 async def save(data):
+    resource_id = data['id'] if isinstance(data, dict) else data.id
+    invalidate_resource(resource_id)
+    await connection_pools.invalidate(resource_id)
+    # Reused plugins keep clients and credentials of the resource.
+    await plugin_instances.invalidate_resource(resource_id)
     return await storage_manager("resource").upsert(data)
 
 
 async def save_record(resource: Resource) -> BulkInsertResult:
+    invalidate_resource(resource.id)
+    await connection_pools.invalidate(resource.id)
+    # Reused plugins keep clients and credentials of the resource.
+    await plugin_instances.invalidate_resource(resource.id)
     resource_record = ResourceRecord.encode(resource)
     return await storage_manager('resource').upsert(resource_record)
 
@@ -58,5 +70,9 @@ async def load(id: str) -> Resource:
 
 
 async def delete(id: str):
+    invalidate_resource(id)
+    await connection_pools.invalidate(id)
+    # Reused plugins keep clients and credentials of the resource.
+    await plugin_instances.invalidate_resource(id)
     sm = storage_manager("resource")
     return await sm.delete(id, index=sm.get_single_storage_index())
@@ -11,7 +11,7 @@ from tracardi.domain.rule import Rule
 
 from tracardi.domain.event import Event
 from tracardi.domain.value_object.bulk_insert_result import BulkInsertResult
-from tracardi.event_server.utils.memory_cache import MemoryCache, CacheItem
+from tracardi.event_server.utils.memory_cache import MemoryCache
 from tracardi.exceptions.log_handler import log_handler
 from tracardi.service.storage.factory import storage_manager
 
@@ -27,6 +27,7 @@ def _get_cache_key(source_id, event_type):
 
 
 async def _load_rule(event_type, source_id):
+    logger.debug("Loading routing rules for source {} and event type {}".format(source_id, event_type))
     query = {
         "query": {
             "bool": {
@@ -64,14 +65,12 @@ async def _get_rules_for_source_and_event_type(source: Entity, events: List[Even
     for event_type in event_types:
 
         cache_key = _get_cache_key(source.id, event_type)
-        if cache_key not in memory_cache:
-            logger.debug("Loading routing rules for cache key {}".format(cache_key))
-            rules = await _load_rule(event_type, source.id)
 
-            # todo set MemoryCache ttl from env
-            memory_cache[cache_key] = CacheItem(data=rules, ttl=5)
+        # Concurrent requests for the same rules share one load.
+        # todo set MemoryCache ttl from env
+        rules = await MemoryCache.cache(memory_cache, cache_key, 5, _load_rule, True, event_type, source.id)
 
-        routes = list(memory_cache[cache_key].data)
+        routes = list(rules) if rules is not None else []
         if not has_routes and routes:
             has_routes = True
 
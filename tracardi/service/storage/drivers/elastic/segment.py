@@ -1,4 +1,5 @@
 from tracardi.domain.storage_record import StorageRecords
+from tracardi.service.segmentation import invalidate_segments
 from tracardi.service.storage.factory import storage_manager
 
 
@@ -8,12 +9,20 @@ async def load_by_id(id: str):
 
 async def delete_by_id(id: str):
     sm = storage_manager('segment')
-    return await sm.delete(id, index=sm.get_single_storage_index())
+    result = await sm.delete(id, index=sm.get_single_storage_index())
+    invalidate_segments()
+    return result
 
 
-async def load_segments(event_type, limit=500) -> StorageRecords:
-    return await storage_manager(index="segment"). \
-        load_by_query_string("(NOT _exists_:eventType) OR eventType: \"{}\"".format(event_type, limit))
+async def load_enabled_segments(limit: int = 1000) -> StorageRecords:
+    return await storage_manager('segment').query({
+        "size": limit,
+        "query": {
+            "term": {
+                "enabled": True
+            }
+        }
+    })
 
 
 async def load_all(start: int = 0, limit: int = 100) -> StorageRecords:
@@ -29,4 +38,6 @@ async def flush():
 
 
 async def save(data: dict):
-    return await storage_manager('segment').upsert(data)
+    result = await storage_manager('segment').upsert(data)
+    invalidate_segments()
+    return result
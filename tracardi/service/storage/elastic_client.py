@@ -1,6 +1,6 @@
 import asyncio
 import logging
-from typing import Optional
+from typing import Optional, List, Tuple
 from uuid import uuid4
 from elasticsearch import helpers, AsyncElasticsearch
 from elasticsearch.exceptions import NotFoundError
@@ -217,6 +217,14 @@ class ElasticClient:
             ids=ids
         )
 
+    async def update_bulk(self, actions: List[dict]) -> List[Tuple[bool, dict]]:
+        """
+        Runs bulk update actions and returns the status and response of every action in the order of actions.
+        Failed actions do not raise.
+        """
+        return [(ok, response) async for ok, response in helpers.async_streaming_bulk(
+            self._client, actions, raise_on_error=False)]
+
     async def update(self, index, id, record, retry_on_conflict=3):
         return await self._client.update(index, body=record, id=id, retry_on_conflict=retry_on_conflict)
 
@@ -1,6 +1,6 @@
 from asyncio import create_task, gather
 from collections import defaultdict
-from typing import List, Optional, Union, AsyncGenerator, Any, Dict
+from typing import List, Optional, Union, AsyncGenerator, Any, Dict, Tuple, Set
 
 import elasticsearch
 from pydantic import BaseModel
@@ -38,6 +38,25 @@ class ElasticFiledSort:
             raise ValueError("Invalid ElasticFiledSort.")
 
 
+_partial_update_script = """
+for (def change : params.changes) {
+    def data = ctx._source;
+    int last = change.path.size() - 1;
+    for (int i = 0; i < last; i++) {
+        if (!(data[change.path[i]] instanceof Map)) {
+            data[change.path[i]] = new HashMap();
+        }
+        data = data[change.path[i]];
+    }
+    if (change.containsKey('remove')) {
+        data.remove(change.path[last]);
+    } else {
+        data[change.path[last]] = change.value;
+    }
+}
+"""
+
+
 class ElasticStorage:
 
     def __init__(self, index_key):
@@ -96,6 +115,16 @@ class ElasticStorage:
         except elasticsearch.exceptions.NotFoundError:
             return None
 
+    async def load_from_index(self, id: str, index: str) -> Optional[StorageRecord]:
+        """
+        Loads document from concrete index with get. It does not search the alias.
+        """
+        try:
+            result = await self.storage.get(index, id)
+        except elasticsearch.exceptions.NotFoundError:
+            return None
+        return StorageRecord.build_from_elastic(result)
+
     @staticmethod
     def _get_storage_record(record, replace_id, exclude=None) -> StorageRecord:
         if isinstance(record, StorageRecord):
@@ -144,8 +173,11 @@ class ElasticStorage:
                 records_by_index[index].append(record)
 
             if len(records_by_index) > 1:
-                raise ValueError(f"Can not save set of records with mixed target indices. Got the following "
-                                 f"indices [{list(records_by_index.keys())}]")
+                # Records with mixed target indices are saved with one bulk per index.
+                result = BulkInsertResult()
+                for index, records in records_by_index.items():
+                    result += await self.storage.insert(index, records)
+                return result
 
             index, records = list(records_by_index.items())[0]
 
@@ -300,6 +332,34 @@ class ElasticStorage:
                                          id=id,
                                          retry_on_conflict=retry_on_conflict)
 
+    async def update_partial(self, updates: List[Tuple[RecordMetadata, Dict[str, Any], Set[str]]]) \
+            -> List[Tuple[bool, dict]]:
+        """
+        Sets values at dotted paths and removes removed paths of documents, without sending whole documents.
+        Documents with seq_no and primary_term in metadata are updated only if they did not change in the index
+        since they were loaded.
+        """
+        actions = []
+        for metadata, values, removed in updates:
+            changes = [{"path": path.split('.'), "value": value} for path, value in values.items()]
+            changes += [{"path": path.split('.'), "remove": True} for path in removed]
+            action = {
+                "_op_type": "update",
+                "_index": metadata.index,
+                "_id": metadata.id,
+                "script": {
+                    "source": _partial_update_script,
+                    "lang": "painless",
+                    "params": {"changes": changes}
+                }
+            }
+            if metadata.seq_no is not None and metadata.primary_term is not None:
+                action["if_seq_no"] = metadata.seq_no
+                action["if_primary_term"] = metadata.primary_term
+            actions.append(action)
+
+        return await self.storage.update_bulk(actions)
+
     async def delete_by_query(self, query):
         return await self.storage.delete_by_query(index=self.index.get_index_alias(), body=query)
 
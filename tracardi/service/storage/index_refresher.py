@@ -0,0 +1,47 @@
+import asyncio
+import logging
+from typing import Set, Optional
+
+from tracardi.config import tracardi, elastic
+from tracardi.exceptions.log_handler import log_handler
+from tracardi.service.singleton import Singleton
+from tracardi.service.storage.factory import storage_manager
+
+logger = logging.getLogger(__name__)
+logger.setLevel(tracardi.logging_level)
+logger.addHandler(log_handler)
+
+
+class IndexRefresher(metaclass=Singleton):
+
+    """
+    Refreshes indices in the background. An index is refreshed at most once per `interval` seconds and only if
+    the refresh was requested. If the interval is 0 the index is refreshed at once.
+    """
+
+    def __init__(self, interval: float = None):
+        self.interval = elastic.refresh_interval if interval is None else interval
+        self._pending: Set[str] = set()
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    async def refresh(self, index: str):
+        if self.interval <= 0:
+            await storage_manager(index).refresh()
+            return
+
+        self._pending.add(index)
+        if self._handle is None:
+            self._handle = asyncio.get_running_loop().call_later(self.interval, self._start_refresh)
+
+    def _start_refresh(self):
+        self._handle = None
+        indices, self._pending = self._pending, set()
+        asyncio.create_task(self._refresh(indices))
+
+    @staticmethod
+    async def _refresh(indices: Set[str]):
+        for index in indices:
+            try:
+                await storage_manager(index).refresh()
+            except Exception as e:
+                logger.error(f"Could not refresh index {index}. Reason: {str(e)}")
@@ -3,7 +3,7 @@ import elasticsearch
 from pydantic import BaseModel
 
 import tracardi.service.storage.elastic_storage as storage
-from typing import List, Union, Dict
+from typing import List, Union, Dict, Any, Set
 
 from tracardi.config import tracardi
 from tracardi.domain.entity import Entity
@@ -12,7 +12,7 @@ from tracardi.domain.storage_aggregate_result import StorageAggregateResult
 from tracardi.domain.value_object.bulk_insert_result import BulkInsertResult
 from datetime import datetime
 from typing import Tuple, Optional
-from tracardi.domain.storage_record import StorageRecords, StorageRecord
+from tracardi.domain.storage_record import StorageRecords, StorageRecord, RecordMetadata
 from tracardi.exceptions.log_handler import log_handler
 from tracardi.service.list_default_value import list_value_at_index
 from tracardi.service.singleton import Singleton
@@ -389,6 +389,16 @@ class PersistenceService:
                 raise StorageException(str(e), message=message, details=details)
             raise StorageException(str(e))
 
+    async def load_from_index(self, id: str, index: str) -> Optional[StorageRecord]:
+        try:
+            return await self.storage.load_from_index(id, index)
+        except elasticsearch.exceptions.ElasticsearchException as e:
+            _logger.error(str(e))
+            if len(e.args) == 2:
+                message, details = e.args
+                raise StorageException(str(e), message=message, details=details)
+            raise StorageException(str(e))
+
     def scan(self, query: dict = None, batch: int = 1000):
         try:
             return self.storage.scan(query, batch)
@@ -610,6 +620,17 @@ class PersistenceService:
                 raise StorageException(str(e), message=message, details=details)
             raise StorageException(str(e), details=str(e))
 
+    async def update_partial(self, updates: List[Tuple[RecordMetadata, Dict[str, Any], Set[str]]]) \
+            -> List[Tuple[bool, dict]]:
+        try:
+            return await self.storage.update_partial(updates)
+        except elasticsearch.exceptions.ElasticsearchException as e:
+            _logger.error(str(e))
+            if len(e.args) == 2:
+                message, details = e.args
+                raise StorageException(str(e), message=message, details=details)
+            raise StorageException(str(e))
+
     async def delete_by_query(self, query: dict):
         try:
             return await self.storage.delete_by_query(query=query)
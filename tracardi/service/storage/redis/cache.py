@@ -1,29 +1,29 @@
-from tracardi.service.storage.redis_client import RedisClient
+from tracardi.service.storage.redis_client import AsyncRedisClient
 import msgpack
 
 
 class RedisCache:
 
     def __init__(self, ttl, prefix):
-        self._redis = RedisClient()
+        self._redis = AsyncRedisClient()
         self.ttl = ttl
         self.prefix = prefix
 
-    def __setitem__(self, key, value):
-        self._redis.client.set(f"{self.prefix}{key}", msgpack.packb(value), ex=self.ttl)
+    async def set(self, key, value):
+        await self._redis.client.set(f"{self.prefix}{key}", msgpack.packb(value), ex=self.ttl)
 
-    def __getitem__(self, key):
-        value = self._redis.client.get(f"{self.prefix}{key}")
+    async def get(self, key):
+        value = await self._redis.client.get(f"{self.prefix}{key}")
         if value is None:
             return None
 
         return msgpack.unpackb(value)
 
-    def __delitem__(self, key):
-        self._redis.client.delete(f"{self.prefix}{key}")
+    async def delete(self, key):
+        await self._redis.client.delete(f"{self.prefix}{key}")
 
-    def __contains__(self, key):
-        return self._redis.client.exists(f"{self.prefix}{key}")
+    async def has(self, key) -> bool:
+        return await self._redis.client.exists(f"{self.prefix}{key}") > 0
 
-    def refresh(self, key):
-        self._redis.client.expire(f"{self.prefix}{key}", self.ttl)
+    async def refresh(self, key):
+        await self._redis.client.expire(f"{self.prefix}{key}", self.ttl)
@@ -15,3 +15,7 @@ class Collection:
     profile: str = "profile:"
     profile_fields: str = "profile:fields"
     event_fields: str = "event:fields"
+    recent_writes: str = "recent-writes:"
+    profile_cache: str = "profile-cache:"
+    profile_directory: str = "profile-directory:"
+    live_segmentation: str = "live-segmentation:"
@@ -0,0 +1,145 @@
+import json
+from typing import List, Optional, Tuple
+from uuid import uuid4
+
+import msgpack
+
+from tracardi.config import tracardi
+from tracardi.domain.entity import Entity
+from tracardi.domain.storage_record import StorageRecord, RecordMetadata
+from tracardi.event_server.utils.memory_cache import MemoryCache, CacheItem
+from tracardi.service.storage.redis.collections import Collection
+from tracardi.service.storage.redis.recent_writes import RecentWrites
+
+
+class ProfileCache(RecentWrites):
+
+    """
+    Two-tier profile cache enabled with CACHE_PROFILE.
+
+    Every saved profile is written to redis under a new version key, and every id from `profile.ids` points to
+    that version, so profiles are found by merged ids too. Versions never change, so workers keep them in a local
+    LRU cache and only read the pointer from redis to know that the local copy is current.
+
+    Profiles are written through when saved, read through when loaded from elastic and invalidated when deleted.
+    """
+
+    def __init__(self, ttl: int, local_pool: int, enabled: bool):
+        super().__init__('profile', ttl)
+        self.enabled = enabled
+        self.prefix = Collection.profile_cache
+        self._local = MemoryCache("profile-cache", max_pool=local_pool)
+
+    def is_enabled(self) -> bool:
+        return self.enabled and self.ttl > 0
+
+    def _get_pointer_key(self, id: str) -> str:
+        return f"{self.prefix}id:{id}"
+
+    def _get_version_key(self, version: str) -> str:
+        return f"{self.prefix}version:{version}"
+
+    def _cache_locally(self, version: str, value: tuple):
+        self._local[version] = CacheItem(data=value, ttl=self.ttl)
+
+    async def _save(self, values: List[Tuple[tuple, set]], only_new: bool):
+        async with self._redis.client.pipeline(transaction=False) as pipe:
+            for value, ids in values:
+                version = uuid4().hex
+                pipe.set(self._get_version_key(version), msgpack.packb(value), ex=self.ttl)
+                for id in ids:
+                    # Profile loaded from elastic must not replace a newer profile saved in the meantime.
+                    pipe.set(self._get_pointer_key(id), version, ex=self.ttl, nx=only_new)
+                self._cache_locally(version, value)
+            await pipe.execute()
+
+    @staticmethod
+    def _get_document_version(metadata: Optional[RecordMetadata]) -> Tuple[Optional[int], Optional[int]]:
+        if metadata is None:
+            return None, None
+        return metadata.seq_no, metadata.primary_term
+
+    async def save(self, entities: List[Entity]):
+        if not self.is_enabled() or not entities:
+            return
+
+        await self._save([(
+            (self._get_index(entity), entity.json(exclude={"operation": ...}),
+             *self._get_document_version(entity.get_meta_data())),
+            self._get_ids(entity)
+        ) for entity in entities], only_new=False)
+
+    async def save_record(self, record: StorageRecord):
+        if not self.is_enabled() or not record.has_meta_data():
+            return
+
+        ids = {record['id'], *(record.get('ids', None) or [])}
+        metadata = record.get_meta_data()
+        await self._save([(
+            (metadata.index, json.dumps(record, default=str), *self._get_document_version(metadata)),
+            ids
+        )], only_new=True)
+
+    async def _load_version(self, version: str) -> Optional[tuple]:
+        if version in self._local:
+            return self._local[version].data
+
+        value = await self._redis.client.get(self._get_version_key(version))
+        if value is None:
+            return None
+
+        value = tuple(msgpack.unpackb(value))
+        self._cache_locally(version, value)
+        return value
+
+    async def load(self, id: str) -> Optional[StorageRecord]:
+        if not self.is_enabled():
+            return None
+
+        version = await self._redis.client.get(self._get_pointer_key(id))
+        if version is None:
+            return None
+
+        value = await self._load_version(version.decode())
+        if value is None:
+            return None
+
+        entity_index, data, seq_no, primary_term = value
+        record = StorageRecord(**json.loads(data))
+        return record.set_meta_data(RecordMetadata(id=record['id'], index=entity_index, seq_no=seq_no,
+                                                   primary_term=primary_term))
+
+    async def delete(self, ids: List[str]):
+        """
+        Removes deleted profiles. Id that points to another profile, e.g. the profile it was merged into,
+        is kept.
+        """
+
+        if not self.is_enabled() or not ids:
+            return
+
+        keys = []
+        versions = await self._redis.client.mget([self._get_pointer_key(id) for id in ids])
+        for id, version in zip(ids, versions):
+            if version is None:
+                continue
+            version = version.decode()
+            value = await self._load_version(version)
+            if value is None:
+                continue
+            record = json.loads(value[1])
+            if record['id'] != id:
+                continue
+            keys.append(self._get_version_key(version))
+            keys += [self._get_pointer_key(profile_id) for profile_id in {id, *(record.get('ids', None) or [])}]
+            self._local.delete(version)
+
+        if keys:
+            await self._redis.client.delete(*keys)
+
+
+profile_cache = ProfileCache(
+    ttl=tracardi.profile_cache_ttl,
+    local_pool=tracardi.profile_cache_size,
+    enabled=tracardi.cache_profiles
+)
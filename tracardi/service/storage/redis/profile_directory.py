@@ -0,0 +1,116 @@
+import zlib
+from typing import List, Optional, Tuple
+
+from tracardi.config import tracardi
+from tracardi.domain.entity import Entity
+from tracardi.domain.storage_record import StorageRecord
+from tracardi.service.storage import index
+from tracardi.service.storage.redis.collections import Collection
+from tracardi.service.storage.redis_client import AsyncRedisClient
+
+
+class ProfileDirectory:
+
+    """
+    Profile directory enabled with PROFILE_DIRECTORY.
+
+    Maps every profile id and every id from `profile.ids` to the concrete index and document id of the
+    profile, so a profile is loaded with `get` from one index instead of a search over all monthly indices.
+    Ids are kept in `buckets` redis hashes, which redis stores compactly when buckets are small.
+
+    Directory is updated when profiles are saved, so the merged profile takes over ids of merged profiles.
+    Entry of a deleted profile is removed unless it points to another profile. Entries that point to
+    documents that do not exist are removed when they are read and the profile is searched instead.
+    """
+
+    def __init__(self, buckets: int, enabled: bool):
+        self.enabled = enabled
+        self.buckets = buckets
+        self.prefix = f"{Collection.profile_directory}{buckets}:"
+        self._redis = AsyncRedisClient()
+
+    def is_enabled(self) -> bool:
+        return self.enabled and self.buckets > 0
+
+    def _get_bucket_key(self, id: str) -> str:
+        return f"{self.prefix}{zlib.crc32(id.encode()) % self.buckets}"
+
+    @staticmethod
+    def _encode(index: str, document_id: str, id: str) -> str:
+        # Index names can not contain "/". Document id is stored only if it is not the looked up id.
+        return index if document_id == id else f"{index}/{document_id}"
+
+    @staticmethod
+    def _decode(value: bytes, id: str) -> Tuple[str, str]:
+        index, _, document_id = value.decode().partition('/')
+        return index, document_id or id
+
+    async def _save(self, locations: List[Tuple[str, str, set]]):
+        async with self._redis.client.pipeline(transaction=False) as pipe:
+            for entity_index, document_id, ids in locations:
+                for id in ids:
+                    pipe.hset(self._get_bucket_key(id), id, self._encode(entity_index, document_id, id))
+            await pipe.execute()
+
+    async def save(self, entities: List[Entity]):
+        if not self.is_enabled() or not entities:
+            return
+
+        locations = []
+        for entity in entities:
+            metadata = entity.get_meta_data()
+            entity_index = metadata.index if metadata is not None and metadata.index is not None \
+                else index.resources['profile'].get_write_index()
+            locations.append((entity_index, entity.id, {entity.id, *(getattr(entity, 'ids', None) or [])}))
+        await self._save(locations)
+
+    async def save_record(self, record: StorageRecord):
+        if not self.is_enabled() or not record.has_meta_data():
+            return
+
+        metadata = record.get_meta_data()
+        await self._save([(metadata.index, metadata.id, {record['id'], *(record.get('ids', None) or [])})])
+
+    async def load(self, id: str) -> Optional[Tuple[str, str]]:
+        """
+        Returns index and document id of profile.
+        """
+
+        if not self.is_enabled():
+            return None
+
+        value = await self._redis.client.hget(self._get_bucket_key(id), id)
+        if value is None:
+            return None
+        return self._decode(value, id)
+
+    async def forget(self, id: str):
+        if self.is_enabled():
+            await self._redis.client.hdel(self._get_bucket_key(id), id)
+
+    async def delete(self, ids: List[str]):
+        """
+        Removes ids of deleted profiles. Id that points to another profile, e.g. the profile it was merged into,
+        is kept.
+        """
+
+        if not self.is_enabled() or not ids:
+            return
+
+        async with self._redis.client.pipeline(transaction=False) as pipe:
+            for id in ids:
+                pipe.hget(self._get_bucket_key(id), id)
+            values = await pipe.execute()
+
+        deleted_ids = [id for id, value in zip(ids, values) if value is not None and self._decode(value, id)[1] == id]
+        if deleted_ids:
+            async with self._redis.client.pipeline(transaction=False) as pipe:
+                for id in deleted_ids:
+                    pipe.hdel(self._get_bucket_key(id), id)
+                await pipe.execute()
+
+
+profile_directory = ProfileDirectory(
+    buckets=tracardi.profile_directory_buckets,
+    enabled=tracardi.profile_directory
+)
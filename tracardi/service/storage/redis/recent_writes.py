@@ -0,0 +1,95 @@
+import json
+from typing import List, Optional
+
+import msgpack
+
+from tracardi.config import tracardi
+from tracardi.domain.entity import Entity
+from tracardi.domain.storage_record import StorageRecord, RecordMetadata
+from tracardi.service.storage import index
+from tracardi.service.storage.redis.collections import Collection
+from tracardi.service.storage.redis_client import AsyncRedisClient
+
+
+class RecentWrites:
+
+    """
+    Copies of just saved entities shared by all workers through redis for `ttl` seconds.
+
+    Saved documents can not be found in elastic until the index is refreshed. Loaders read the entity here first,
+    so the index does not need to be refreshed after every save (read-your-writes). Entity is stored under its id
+    and all ids from its `ids` property, together with the index it was saved to.
+    """
+
+    def __init__(self, index_key: str, ttl: int):
+        self.index_key = index_key
+        self.ttl = ttl
+        self.prefix = f"{Collection.recent_writes}{index_key}:"
+        self._redis = AsyncRedisClient()
+
+    def is_enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _get_index(self, entity: Entity) -> str:
+        metadata = entity.get_meta_data()
+        if metadata is not None and metadata.index is not None:
+            return metadata.index
+        return index.resources[self.index_key].get_write_index()
+
+    @staticmethod
+    def _get_ids(entity: Entity) -> set:
+        ids = {entity.id}
+        entity_ids = getattr(entity, 'ids', None)
+        if isinstance(entity_ids, list):
+            ids.update(entity_ids)
+        return ids
+
+    async def save(self, entities: List[Entity]):
+        if not self.is_enabled() or not entities:
+            return
+
+        async with self._redis.client.pipeline(transaction=False) as pipe:
+            for entity in entities:
+                value = msgpack.packb((self._get_index(entity), entity.json(exclude={"operation": ...})))
+                for id in self._get_ids(entity):
+                    pipe.set(f"{self.prefix}{id}", value, ex=self.ttl)
+            await pipe.execute()
+
+    async def load(self, id: str) -> Optional[StorageRecord]:
+        if not self.is_enabled():
+            return None
+
+        value = await self._redis.client.get(f"{self.prefix}{id}")
+        if value is None:
+            return None
+
+        entity_index, entity = msgpack.unpackb(value)
+        record = StorageRecord(**json.loads(entity))
+        return record.set_meta_data(RecordMetadata(id=record['id'], index=entity_index))
+
+    async def delete(self, ids: List[str]):
+        """
+        Removes copies of deleted entities under all their ids. Id that points to another entity, e.g. the profile
+        it was merged into, is kept.
+        """
+
+        if not self.is_enabled() or not ids:
+            return
+
+        keys = []
+        values = await self._redis.client.mget([f"{self.prefix}{id}" for id in ids])
+        for id, value in zip(ids, values):
+            if value is None:
+                continue
+            _, entity = msgpack.unpackb(value)
+            record = json.loads(entity)
+            if record['id'] != id:
+                continue
+            keys += [f"{self.prefix}{entity_id}" for entity_id in {id, *(record.get('ids', None) or [])}]
+
+        if keys:
+            await self._redis.client.delete(*keys)
+
+
+recent_sessions = RecentWrites('session', ttl=tracardi.recent_writes_ttl)
+recent_profiles = RecentWrites('profile', ttl=tracardi.recent_writes_ttl)
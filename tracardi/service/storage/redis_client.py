@@ -13,16 +13,23 @@ logger.addHandler(log_handler)
 
 
 class AsyncRedisClient(metaclass=Singleton):
-    def __init__(self):
-        host = redis_config.redis_host
-        password = redis_config.redis_password
 
-        if password is None:
-            self.client = aioredis.from_url(host)
-        else:
-            self.client = aioredis.from_url(host, password=password)
+    """
+    Asyncio redis client. Connections are taken from a shared pool of at most redis_max_connections connections.
+    When all connections are in use the call waits for a free connection up to redis_pool_timeout seconds.
+    Use it in async code instead of RedisClient, which blocks the event loop on every call.
+    """
 
-        logger.info(f"Redis at {host} connected.")
+    def __init__(self):
+        uri = redis_config.get_redis_with_password()
+        logger.debug(f"Connecting async redis at {uri}")
+        pool = aioredis.BlockingConnectionPool.from_url(
+            uri,
+            max_connections=redis_config.redis_max_connections,
+            timeout=redis_config.redis_pool_timeout
+        )
+        self.client = aioredis.Redis(connection_pool=pool)
+        logger.info(f"Async redis at {redis_config.redis_host} connected.")
 
 
 class RedisClient(metaclass=Singleton):
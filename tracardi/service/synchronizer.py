@@ -1,55 +1,226 @@
 import asyncio
 import logging
-from typing import Union
+from time import monotonic
+from typing import Union, List, Dict, Optional
+from uuid import uuid4
+
 from tracardi.config import tracardi
 from tracardi.exceptions.log_handler import log_handler
-from tracardi.service.storage.redis_client import RedisClient
+from tracardi.service.metrics import metrics, PROFILE_LOCK_WAIT
+from tracardi.service.storage.redis_client import AsyncRedisClient
 
 logger = logging.getLogger(__name__)
 logger.setLevel(tracardi.logging_level)
 logger.addHandler(log_handler)
 
+# Deletes the lock only if it is still owned by the caller and notifies waiting workers.
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    redis.call('del', KEYS[1])
+    redis.call('publish', KEYS[2], '1')
+    return 1
+end
+return 0
+"""
+
+
+class ProfileLock:
+
+    __slots__ = ('key', 'token', 'wait_time')
+
+    def __init__(self, key: str, token: str, wait_time: float):
+        self.key = key
+        self.token = token
+        self.wait_time = wait_time
+
+
+class LockStats:
+
+    """
+    Lock counters. Wait times are observed in the PROFILE_LOCK_WAIT metric.
+    """
+
+    __slots__ = ('acquired', 'contended', 'expired')
+
+    def __init__(self):
+        self.acquired = 0
+        self.contended = 0
+        self.expired = 0
+
+    def record(self, contended: bool):
+        self.acquired += 1
+        if contended:
+            self.contended += 1
+
+    def dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class _LocalLock:
+
+    __slots__ = ('lock', 'users')
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
 
 class ProfileTracksSynchronizer:
+
+    """
+    Serializes processing of one profile across all workers.
+
+    Requests for the same profile on one worker wait on an in-process lock and do not touch redis. The worker
+    that holds the in-process lock takes the redis lock with SET NX and a random owner token. The lock is released
+    with a script that deletes it only if the token matches and publishes a release message, so workers waiting for
+    the lock wake up at once instead of polling. Polling every `wait` seconds is kept as a fallback if the message
+    is lost. Lock expires after `ttl` seconds if the owner dies.
+    """
+
     def __init__(self, wait=0.1, ttl=10):
         self.wait = wait
         self.ttl = ttl
-        self.redis = RedisClient()
+        self.redis = AsyncRedisClient()
         self.hash = "synchronizer"
+        self.channel = "synchronizer-released"
+        self.stats = LockStats()
+        self._local_locks: Dict[str, _LocalLock] = {}
+        self._waiters: Dict[str, asyncio.Event] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._release_script = None
 
     def _get_key(self, key: str) -> str:
         return f"{self.hash}:{key}"
 
-    async def wait_for_unlock(self, key: str, seq: Union[str, int] = None):
+    def _get_channel(self, key: str) -> str:
+        return f"{self.channel}:{key}"
+
+    async def _listen(self):
+        pubsub = self.redis.client.pubsub()
+        try:
+            await pubsub.psubscribe(f"{self.channel}:*")
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is None:
+                    continue
+                key = message['channel'].decode()[len(self.channel) + 1:]
+                event = self._waiters.get(key, None)
+                if event is not None:
+                    event.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Profile lock release listener stopped. Falling back to polling. Reason: {str(e)}")
+        finally:
+            self._listener = None
+            await pubsub.reset()
+
+    def _start_listener(self):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _acquire_local(self, key: str):
+        local_lock = self._local_locks.get(key, None)
+        if local_lock is None:
+            local_lock = _LocalLock()
+            self._local_locks[key] = local_lock
+
+        local_lock.users += 1
+        try:
+            await local_lock.lock.acquire()
+        except BaseException:
+            self._release_local(key, acquired=False)
+            raise
+
+    def _release_local(self, key: str, acquired: bool = True):
+        local_lock = self._local_locks.get(key, None)
+        if local_lock is None:
+            return
+        if acquired:
+            local_lock.lock.release()
+        local_lock.users -= 1
+        if local_lock.users <= 0:
+            del self._local_locks[key]
+
+    async def _acquire_redis(self, key: str, token: str, seq: Union[str, int] = None) -> bool:
+        """
+        Returns True if the lock had to be waited for.
+        """
+
+        redis_key = self._get_key(key)
+        contended = False
         while True:
-            if self.is_locked(key):
-                logger.info(
-                    f"Tracker payload - {seq}: Waiting {self.wait}s for profile {key} to finish. Expires in {self.expires_in(key)}s")
-                await asyncio.sleep(self.wait)
-                continue
-            self.unlock_entity(key)
-            break
-
-    def expires_in(self, key: str):
-        return self.redis.client.ttl(self._get_key(key))
-
-    def is_locked(self, key: str):
-        return self.redis.client.exists(self._get_key(key))
-
-    def unlock_entities(self, keys: str):
-        for key in keys:
-            self.unlock_entity(key)
-
-    def lock_entity(self, key: str):
-        key = self._get_key(key)
-        result = self.redis.client.set(key, '1', ex=self.ttl)
-        if result is True:
-            logger.debug(f"Locking key {key} {result}")
-
-    def unlock_entity(self, key: str):
-        key = self._get_key(key)
-        result = self.redis.client.delete(key)
-        logger.debug(f"UnLocking key {key} {result}")
+            # Register for the release message before the attempt so the release between the attempt and
+            # the wait is not missed.
+            event = asyncio.Event()
+            self._waiters[key] = event
+            try:
+                if await self.redis.client.set(redis_key, token, nx=True, px=int(self.ttl * 1000)):
+                    return contended
+
+                if not contended:
+                    contended = True
+                    self._start_listener()
+                    logger.info(f"Tracker payload - {seq}: Waiting for profile {key} to finish.")
+
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=self.wait)
+                except asyncio.TimeoutError:
+                    pass
+            finally:
+                if self._waiters.get(key, None) is event:
+                    del self._waiters[key]
+
+    async def lock(self, key: str, seq: Union[str, int] = None) -> ProfileLock:
+        start = monotonic()
+        contended = key in self._local_locks and self._local_locks[key].lock.locked()
+        await self._acquire_local(key)
+        token = uuid4().hex
+        try:
+            contended = await self._acquire_redis(key, token, seq) or contended
+        except BaseException:
+            self._release_local(key)
+            raise
+
+        wait_time = monotonic() - start
+        self.stats.record(contended)
+        metrics.observe(PROFILE_LOCK_WAIT, wait_time, contended=str(contended).lower())
+        if contended:
+            logger.debug(f"Tracker payload - {seq}: Profile {key} locked after {wait_time:.3f}s.")
+
+        return ProfileLock(key, token, wait_time)
+
+    async def unlock(self, lock: ProfileLock):
+        try:
+            if self._release_script is None:
+                self._release_script = self.redis.client.register_script(_RELEASE_SCRIPT)
+            released = await self._release_script(
+                keys=[self._get_key(lock.key), self._get_channel(lock.key)],
+                args=[lock.token]
+            )
+            if not released:
+                # Lock expired before it was released and could be taken by another worker.
+                self.stats.expired += 1
+                logger.warning(f"Profile lock {lock.key} expired before it was released.")
+        finally:
+            self._release_local(lock.key)
+
+    async def unlock_all(self, locks: List[ProfileLock]):
+        for lock in locks:
+            try:
+                await self.unlock(lock)
+            except Exception as e:
+                # Redis lock will expire after ttl. In-process lock is already released.
+                logger.error(f"Could not release profile lock {lock.key}. Reason: {str(e)}")
+
+    async def expires_in(self, key: str):
+        return await self.redis.client.ttl(self._get_key(key))
+
+    async def is_locked(self, key: str):
+        return await self.redis.client.exists(self._get_key(key))
+
+    def get_stats(self) -> dict:
+        return self.stats.dict()
 
 
 profile_synchronizer = ProfileTracksSynchronizer(
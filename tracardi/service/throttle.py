@@ -1,7 +1,7 @@
 from typing import Tuple
 
 from tracardi.service.storage.redis.collections import Collection
-from tracardi.service.storage.redis_client import RedisClient
+from tracardi.service.storage.redis_client import AsyncRedisClient
 
 
 class Limiter:
@@ -9,17 +9,18 @@ class Limiter:
     def __init__(self, limit: int, ttl: int):
         self._ttl = ttl
         self._limit = limit
-        self._redis = RedisClient()
+        self._redis = AsyncRedisClient()
 
-    def limit(self, key: str) -> Tuple[bool, int]:
+    async def limit(self, key: str) -> Tuple[bool, int]:
 
         key = f"{Collection.throttle}:{key}"
 
-        req = self._redis.client.incr(key)
-        if req == 1:
-            self._redis.client.expire(key, self._ttl)
+        async with self._redis.client.pipeline(transaction=False) as pipe:
+            req, ttl = await pipe.incr(key).ttl(key).execute()
+
+        # -1 means the key has no expiration, it was just created.
+        if ttl < 0:
+            await self._redis.client.expire(key, self._ttl)
             ttl = self._ttl
-        else:
-            ttl = self._redis.client.ttl(key)
 
         return req <= self._limit, ttl
@@ -1,12 +1,15 @@
 import aiohttp
-from typing import Union, Tuple, Callable, List
+from typing import Union, Tuple, Callable, List, Optional
 from contextlib import asynccontextmanager
 
 
 class HttpClient:
 
-    def __init__(self, retries: int = 1, accept_status: Union[int, Tuple[int], List[int]] = 200, *args, **kwargs):
-        self.client = aiohttp.ClientSession(*args, **kwargs)
+    def __init__(self, retries: int = 1, accept_status: Union[int, Tuple[int], List[int]] = 200, *args,
+                 session: Optional[aiohttp.ClientSession] = None, **kwargs):
+        # Shared session is not closed on exit. Its settings such as timeout must be passed with each request.
+        self.shared_session = session is not None
+        self.client = session if session is not None else aiohttp.ClientSession(*args, **kwargs)
         self.retries = retries if retries >= 1 else 1
         self.accept_status = tuple([accept_status]) if isinstance(accept_status, int) else accept_status
 
@@ -44,4 +47,18 @@ class HttpClient:
         return self
 
     async def __aexit__(self, exc_t, exc_v, exc_tb) -> None:
-        await self.client.close()
+        if not self.shared_session:
+            await self.client.close()
+
+    @staticmethod
+    async def create_session(**kwargs) -> aiohttp.ClientSession:
+        # Shared session must not keep cookies from responses, they belong to one request.
+        return aiohttp.ClientSession(cookie_jar=aiohttp.DummyCookieJar(), **kwargs)
+
+    @staticmethod
+    async def close_session(session: aiohttp.ClientSession):
+        await session.close()
+
+    @staticmethod
+    def is_session_open(session: aiohttp.ClientSession) -> bool:
+        return not session.closed
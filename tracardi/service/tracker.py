@@ -9,7 +9,6 @@ from tracardi.domain.tracker_payloads import TrackerPayloads
 from tracardi.domain.value_object.collect_result import CollectResult
 from tracardi.exceptions.exception import UnauthorizedException
 from tracardi.domain.payload.tracker_payload import TrackerPayload
-from tracardi.service.logger_manager import save_logs
 from tracardi.service.setup.data.defaults import open_rest_source_bridge
 from tracardi.service.storage.drivers.elastic.operations.console_log import save_console_log
 from tracardi.service.tracker_config import TrackerConfig
@@ -67,13 +66,9 @@ async def track_event(tracker_payload: TrackerPayload,
         raise e
 
     finally:
-        # Save console log
+        # Save console log and logs in background
         save_console_log(console_log)
 
-        # Save log
-        if await save_logs() is False:
-            logger.warning("Log index still not created. Saving logs postponed.")
-
 
 class Tracker:
 
@@ -1,6 +1,7 @@
 import logging
+from collections import defaultdict
 from datetime import datetime
-from typing import List, Union, Generator, AsyncGenerator, Any, Dict
+from typing import List, Union, Generator, AsyncGenerator, Any, Dict, Optional, Tuple
 
 from tracardi.config import tracardi, memory_cache
 from tracardi.domain.console import Console
@@ -21,7 +22,10 @@ from tracardi.domain.session import Session
 from tracardi.exceptions.exception import StorageException, FieldTypeConflictException
 from tracardi.domain.value_object.collect_result import CollectResult
 from tracardi.service.field_mappings_cache import FieldMapper
+from tracardi.service.metrics import metrics, PERSISTENCE
 from tracardi.service.storage.driver import storage
+from tracardi.service.storage.index_refresher import IndexRefresher
+from tracardi.service.storage.redis.recent_writes import recent_profiles, recent_sessions
 from tracardi.service.tracking_manager import TrackerResult
 
 logger = logging.getLogger(__name__)
@@ -63,75 +67,115 @@ class TrackerResultPersister:
                             tracker_result.session.profile = Entity(id=tracker_result.profile.id)
                     yield tracker_result.session
 
-    async def _save_profile(self, tracker_results: List[TrackerResult]):
-        profiles_to_save = list(self.get_profiles_to_save(tracker_results))
-        FieldMapper().add_field_mappings('profile', profiles_to_save)
+    @staticmethod
+    def _get_error_id(error) -> Optional[str]:
+        """
+        Returns id of the record that failed. Bulk errors are reported per record as {operation: {"_id": ...}}.
+        Errors of the whole bulk, e.g. a connection error, have no id.
+        """
+        if isinstance(error, dict) and len(error) == 1:
+            item = next(iter(error.values()))
+            if isinstance(item, dict):
+                return item.get('_id', None)
+        return None
 
-        results = []
-        try:
-            if profiles_to_save:
-                result = await storage.driver.profile.save(profiles_to_save)
-                if result.has_errors():
-                    for id in result.ids:
-                        self.profile_errors[id] = f"Error while storing profile id: {id}. Details: {result.errors}"
-                results.append(result)
+    @staticmethod
+    def _get_failed_ids(result: BulkInsertResult) -> List[str]:
+        error_ids = {TrackerResultPersister._get_error_id(error) for error in result.errors}
+        if None in error_ids:
+            return list(result.ids)
+        return [id for id in result.ids if id in error_ids]
 
-        except StorageException as e:
-            message = "Could not save profile. Error: {}".format(str(e))
-            raise FieldTypeConflictException(message, rows=e.details)
+    @staticmethod
+    def _split_result(result: BulkInsertResult, ids_per_request: List[List[str]]) -> List[BulkInsertResult]:
+        """
+        Splits the result of one bulk save into the results of the requests that were saved together.
+        Errors of records are reported to the request of the record. Errors of the whole bulk are reported
+        to every request.
+        """
+
+        errors_per_id = defaultdict(list)
+        bulk_errors = []
+        for error in result.errors:
+            error_id = TrackerResultPersister._get_error_id(error)
+            if error_id is None:
+                bulk_errors.append(error)
+            else:
+                errors_per_id[error_id].append(error)
 
+        results = []
+        for ids in ids_per_request:
+            errors = bulk_errors + [error for id in ids for error in errors_per_id.get(id, [])]
+            results.append(BulkInsertResult(
+                saved=0 if errors else len(ids),
+                errors=errors,
+                ids=ids
+            ))
         return results
 
-    async def _save_session(self, tracker_results: List[TrackerResult]):
-        try:
-            for tracker_result in tracker_results:
-                persist_session = tracker_result.tracker_payload.is_on('saveSession', default=True)
-                if persist_session:
-                    sessions_to_add = list(self.get_sessions_to_save(tracker_results))
-                    if sessions_to_add:
-                        """
-                        We remove saved sessions from cache. The cache may keep the information that there was
-                        no session. It depends on the cache configuration
-                        """
-                        session_cache = cache.session_cache()
-                        if session_cache.allow_null_values:
-                            for session in sessions_to_add:
-                                session_cache.delete(session.id)
-
-                        """
-                        Remove session new. Add empty operation.
-                        """
-                        for session in sessions_to_add:
-                            session.operation = Operation()
-
-                        result = await storage.driver.session.save(sessions_to_add)
-
-                        if result.has_errors():
-                            for id in result.ids:
-                                self.session_errors[id] = f"Error while storing session id: {id}. Details: {result.errors}"
-
-                        # Todo this may cause errors when async, we save multiple sessions at once
-
-                        """
-                        Until the session is saved and it is usually within 1s the system can create many profiles 
-                        for 1 session.  System checks if the session exists by loading it from ES. If it is a new 
-                        session then is does not exist and must be saved before it can be read. So there is a 
-                        1s when system thinks that the session does not exist.
-            
-                        If session is new we will refresh the session in ES.
-                        """
-
-                        await storage.driver.session.refresh()
-                        yield result
-
-                    # Do not update session duration. It should be calculated on the front end
-
-                    # sessions_to_update = [session for session, save in sessions if save is False]
-                    # # Update session duration
-                    # for session in sessions_to_update:
-                    #     await storage.driver.session.update_session_duration(session)
-        except StorageException as e:
-            raise FieldTypeConflictException("Could not save session. Error: {}".format(str(e)), rows=e.details)
+    @staticmethod
+    def _get_saved(records_per_request: List[list], results: List[Optional[BulkInsertResult]]) -> list:
+        return [record for records, result in zip(records_per_request, results)
+                if result is not None and not result.has_errors() for record in records]
+
+    @staticmethod
+    async def _bulk_save(save, records_per_request: List[list], **kwargs) -> List[Optional[BulkInsertResult]]:
+        records = [record for records in records_per_request for record in records]
+        if not records:
+            return [None] * len(records_per_request)
+
+        result = await save(records, **kwargs)
+        split = TrackerResultPersister._split_result(
+            result,
+            [[record.id for record in records] for records in records_per_request]
+        )
+        return [result if len(records) > 0 else None for result, records in zip(split, records_per_request)]
+
+    async def _get_profiles(self, tracker_results: List[TrackerResult]) -> List[Profile]:
+        profiles_to_save = list(self.get_profiles_to_save(tracker_results))
+        await FieldMapper().add_field_mappings('profile', profiles_to_save)
+        return profiles_to_save
+
+    def _set_profile_result(self, result: Optional[BulkInsertResult]) -> List[BulkInsertResult]:
+        if result is None:
+            return []
+        if result.has_errors():
+            for id in self._get_failed_ids(result):
+                self.profile_errors[id] = f"Error while storing profile id: {id}. Details: {result.errors}"
+        return [result]
+
+    def _get_sessions(self, tracker_results: List[TrackerResult]) -> List[Session]:
+        persist_session = any(tracker_result.tracker_payload.is_on('saveSession', default=True)
+                              for tracker_result in tracker_results)
+        if not persist_session:
+            return []
+
+        sessions_to_add = list(self.get_sessions_to_save(tracker_results))
+        if sessions_to_add:
+            """
+            We remove saved sessions from cache. The cache may keep the information that there was
+            no session. It depends on the cache configuration
+            """
+            session_cache = cache.session_cache()
+            if session_cache.allow_null_values:
+                for session in sessions_to_add:
+                    session_cache.delete(session.id)
+
+            """
+            Remove session new. Add empty operation.
+            """
+            for session in sessions_to_add:
+                session.operation = Operation()
+
+        return sessions_to_add
+
+    def _set_session_result(self, result: Optional[BulkInsertResult]) -> List[BulkInsertResult]:
+        if result is None:
+            return []
+        if result.has_errors():
+            for id in self._get_failed_ids(result):
+                self.session_errors[id] = f"Error while storing session id: {id}. Details: {result.errors}"
+        return [result]
 
     @staticmethod
     def __get_persistent_events_without_source(events: List[Event]):
@@ -159,18 +203,27 @@ class TrackerResultPersister:
 
             yield event
 
-    async def __save_events(self, events: Union[List[Event], Generator[Event, Any, None]]) -> Union[SaveResult,
-                                                                                                    BulkInsertResult]:
+    async def _get_events(self, tracker_results: List[TrackerResult]) -> Tuple[List[Event], List[str]]:
+        """
+        Returns tagged persistent events and types of all events.
+        """
+        # Set statuses
+        log_event_journal = self.console_log.get_indexed_event_journal()
 
-        tagged_events = [event async for event in self.__tag_events(self.__get_persistent_events_without_source(events))]
-        event_result = await storage.driver.event.save(tagged_events, exclude={"operation": ...})
-        event_result = SaveResult(**event_result.dict())
+        bulk_events = []
+        for tracker_result in tracker_results:
+            persist_events = tracker_result.tracker_payload.is_on('saveEvents', default=True)
+            if not persist_events:
+                continue
+            events = await self._modify_events(tracker_result, log_event_journal)
+            bulk_events += events
 
-        # Add event types
-        for event in events:
-            event_result.types.append(event.type)
+        await FieldMapper().add_field_mappings('event', bulk_events)
+
+        tagged_events = [event async for event in
+                         self.__tag_events(self.__get_persistent_events_without_source(bulk_events))]
 
-        return event_result
+        return tagged_events, [event.type for event in bulk_events]
 
     async def _modify_events(self, tracker_result: TrackerResult, log_event_journal: Dict[str, StatusLog]) -> List[Event]:
         for event in tracker_result.events:
@@ -236,28 +289,82 @@ class TrackerResultPersister:
 
         return tracker_result.events
 
-    async def _save_events(self, tracker_results: List[TrackerResult]):
+    @staticmethod
+    async def persist_batch(batch: List[Tuple['TrackerResultPersister', List[TrackerResult]]]) -> List[CollectResult]:
+        """
+        Saves tracker results of many requests with one bulk call per index. Returns the result of every request in
+        the order of the batch.
+        """
+
+        persisters = [persister for persister, _ in batch]
+
+        # Profiles
+
+        profiles = [await persister._get_profiles(tracker_results) for persister, tracker_results in batch]
         try:
-            # Set statuses
-            log_event_journal = self.console_log.get_indexed_event_journal()
+            with metrics.time(PERSISTENCE, entity="profile"):
+                profile_results = await TrackerResultPersister._bulk_save(storage.driver.profile.save, profiles)
+        except StorageException as e:
+            message = "Could not save profile. Error: {}".format(str(e))
+            raise FieldTypeConflictException(message, rows=e.details)
 
-            bulk_events = []
-            for tracker_result in tracker_results:
-                persist_events = tracker_result.tracker_payload.is_on('saveEvents', default=True)
-                if not persist_events:
-                    continue
-                events = await self._modify_events(tracker_result, log_event_journal)
-                bulk_events += events
+        # Saved profiles can be loaded before the index is refreshed
+        await recent_profiles.save(TrackerResultPersister._get_saved(profiles, profile_results))
+
+        profile_results = [persister._set_profile_result(result)
+                           for persister, result in zip(persisters, profile_results)]
+
+        # Sessions
+
+        sessions = [persister._get_sessions(tracker_results) for persister, tracker_results in batch]
+        try:
+            with metrics.time(PERSISTENCE, entity="session"):
+                session_results = await TrackerResultPersister._bulk_save(storage.driver.session.save, sessions)
+        except StorageException as e:
+            raise FieldTypeConflictException("Could not save session. Error: {}".format(str(e)), rows=e.details)
+
+        await recent_sessions.save(TrackerResultPersister._get_saved(sessions, session_results))
+
+        session_results = [persister._set_session_result(result)
+                           for persister, result in zip(persisters, session_results)]
+
+        if any(session_results):
+            """
+            Until the session is saved and it is usually within 1s the system can create many profiles 
+            for 1 session. System checks if the session exists by loading it. If it is a new session then 
+            is does not exist in ES until the index is refreshed.
 
-            FieldMapper().add_field_mappings('event', bulk_events)
-            yield await self.__save_events(bulk_events)
+            Saved sessions are kept in recent writes and loaded from there, so the index is refreshed 
+            in the background.
+            """
+            await IndexRefresher().refresh('session')
 
+        # Events. Event statuses depend on profile and session errors, so they are saved last.
+
+        events = [await persister._get_events(tracker_results) for persister, tracker_results in batch]
+        try:
+            with metrics.time(PERSISTENCE, entity="event"):
+                event_results = await TrackerResultPersister._bulk_save(
+                    storage.driver.event.save,
+                    [tagged_events for tagged_events, _ in events],
+                    exclude={"operation": ...}
+                )
         except StorageException as e:
             raise FieldTypeConflictException("Could not save event. Error: {}".format(str(e)), rows=e.details)
 
+        collect_results = []
+        for profile_result, session_result, event_result, (_, types) in zip(
+                profile_results, session_results, event_results, events):
+            event_result = SaveResult(**event_result.dict()) if event_result is not None else SaveResult()
+            # Add event types
+            event_result.types = types
+            collect_results.append(CollectResult(
+                profile=profile_result,
+                session=session_result,
+                events=[event_result]
+            ))
+
+        return collect_results
+
     async def persist(self, tracker_results: List[TrackerResult]) -> CollectResult:
-        return CollectResult(
-            profile=await self._save_profile(tracker_results),
-            session=[result async for result in self._save_session(tracker_results)],
-            events=[result async for result in self._save_events(tracker_results)]
-        )
+        return (await self.persist_batch([(self, tracker_results)]))[0]
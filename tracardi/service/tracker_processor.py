@@ -1,4 +1,5 @@
 import logging
+import aioredis
 import redis
 from abc import ABC, abstractmethod
 from tracardi.domain.payload.event_payload import EventPayload
@@ -8,7 +9,7 @@ from tracardi.domain.tracker_payloads import TrackerPayloads
 from tracardi.exceptions.exception import TracardiException
 from tracardi.domain.payload.tracker_payload import TrackerPayload
 from tracardi.service.notation.dot_accessor import DotAccessor
-from tracardi.service.storage.driver import storage
+from tracardi.service.storage.index_refresher import IndexRefresher
 from tracardi.service.synchronizer import profile_synchronizer
 from tracardi.service.tracker_config import TrackerConfig
 from tracardi.config import tracardi
@@ -18,6 +19,7 @@ from typing import List, Callable, Coroutine, Any, Type
 from tracardi.domain.value_object.collect_result import CollectResult
 from tracardi.service.console_log import ConsoleLog
 from tracardi.service.tracker_persister import TrackerResultPersister
+from tracardi.service.tracker_result_batcher import TrackerResultBatcher
 from tracardi.service.tracking_manager import TrackerResult, TrackingManagerBase
 from tracardi.service.tracking_orchestrator import TrackingOrchestrator
 
@@ -55,6 +57,9 @@ class TrackerProcessor(TrackProcessorBase):
 
     @staticmethod
     async def _handle_on_result_ready(tracker_results, console_log) -> CollectResult:
+        if tracardi.track_batch_size > 1:
+            # Results of concurrent requests are saved together
+            return await TrackerResultBatcher().persist(tracker_results, console_log)
         tp = TrackerResultPersister(console_log)
         return await tp.persist(tracker_results)
 
@@ -132,43 +137,52 @@ class TrackerProcessor(TrackProcessorBase):
             tracker_results: List[TrackerResult] = []
             debugging: List[TrackerPayload] = []
 
-            for tracker_payload in tracker_payloads:
+            try:
+                for tracker_payload in tracker_payloads:
 
-                # Validation and reshaping
+                    # Validation and reshaping
 
-                if License.has_license():
-                    # Index traits, validate and reshape
-                    evh = EventsValidationHandler(dot, self.console_log)
-                    tracker_payload = await evh.validate_reshape_index_events(tracker_payload)
+                    if License.has_license():
+                        # Index traits, validate and reshape
+                        evh = EventsValidationHandler(dot, self.console_log)
+                        tracker_payload = await evh.validate_reshape_index_events(tracker_payload)
 
-                # Locks for processing each profile
-                result = await orchestrator.invoke(tracker_payload, self.console_log)
-                tracker_results.append(result)
-                responses.append(result.get_response_body(tracker_payload.get_id()))
-                debugging.append(tracker_payload)
+                    # Locks for processing each profile
+                    result = await orchestrator.invoke(tracker_payload, self.console_log)
+                    tracker_results.append(result)
+                    responses.append(result.get_response_body(tracker_payload.get_id()))
+                    debugging.append(tracker_payload)
 
-                # Save bulk
+                    # Save bulk
 
-                if self.on_result_ready is None:
-                    save_results = await self._handle_on_result_ready(tracker_results, self.console_log)
-                else:
-                    save_results = await self.on_result_ready(tracker_results, self.console_log)
+                    if self.on_result_ready is None:
+                        save_results = await self._handle_on_result_ready(tracker_results, self.console_log)
+                    else:
+                        save_results = await self.on_result_ready(tracker_results, self.console_log)
 
-                # UnLock profile
+                    # UnLock profile
 
-                if orchestrator.locked and source.synchronize_profiles:
-                    profile_synchronizer.unlock_entities(orchestrator.locked)
-                    await storage.driver.profile.refresh()
-                    await storage.driver.session.refresh()
+                    if orchestrator.locked and source.synchronize_profiles:
+                        await profile_synchronizer.unlock_all(orchestrator.locked)
+                        orchestrator.locked.clear()
+                        # Saved profiles and sessions are read from recent writes until the indices are refreshed
+                        await IndexRefresher().refresh('profile')
+                        await IndexRefresher().refresh('session')
 
-                logger.debug(f"Invoke save results {save_results} tracker payloads.")
+                    logger.debug(f"Invoke save results {save_results} tracker payloads.")
 
-                # Debugging rest
+                    # Debugging rest
 
-                if tracardi.track_debug:
-                    responses = save_results.get_debugging_info(responses, debugging)
+                    if tracardi.track_debug:
+                        responses = save_results.get_debugging_info(responses, debugging)
+            finally:
+                # Locks must be released even if the processing failed. Otherwise next requests for the profile
+                # wait for the lock to expire.
+                if orchestrator.locked:
+                    await profile_synchronizer.unlock_all(orchestrator.locked)
+                    orchestrator.locked.clear()
 
-        except redis.exceptions.ConnectionError as e:
+        except (redis.exceptions.ConnectionError, aioredis.exceptions.ConnectionError) as e:
             raise TracardiException(f"Could not connect to Redis server. Connection returned error {str(e)}")
 
         logger.info(f"Track responses {responses}.")
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from typing import List, Optional, Set
+
+from tracardi.config import tracardi
+from tracardi.domain.value_object.collect_result import CollectResult
+from tracardi.exceptions.log_handler import log_handler
+from tracardi.service.console_log import ConsoleLog
+from tracardi.service.singleton import Singleton
+from tracardi.service.tracker_persister import TrackerResultPersister
+from tracardi.service.tracking_manager import TrackerResult
+
+logger = logging.getLogger(__name__)
+logger.setLevel(tracardi.logging_level)
+logger.addHandler(log_handler)
+
+
+class _PendingResults:
+
+    __slots__ = ('persister', 'tracker_results', 'future')
+
+    def __init__(self, persister: TrackerResultPersister, tracker_results: List[TrackerResult],
+                 future: asyncio.Future):
+        self.persister = persister
+        self.tracker_results = tracker_results
+        self.future = future
+
+
+class TrackerResultBatcher(metaclass=Singleton):
+
+    """
+    Collects tracker results of concurrent requests on one worker and saves them together, one bulk call per index.
+    Batch is saved when it has `max_size` tracker results or `max_wait` seconds after the first request joined it.
+    Every request gets its own CollectResult. If the save fails all requests in the batch get the error.
+    """
+
+    def __init__(self, max_size: int = None, max_wait: float = None):
+        self.max_size = tracardi.track_batch_size if max_size is None else max_size
+        self.max_wait = tracardi.track_batch_wait if max_wait is None else max_wait
+        self._pending: List[_PendingResults] = []
+        self._pending_size = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._saving: Set[asyncio.Task] = set()
+
+    async def persist(self, tracker_results: List[TrackerResult], console_log: ConsoleLog) -> CollectResult:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        self._pending.append(_PendingResults(TrackerResultPersister(console_log), tracker_results, future))
+        self._pending_size += len(tracker_results)
+
+        if self._pending_size >= self.max_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending, self._pending_size = self._pending, [], 0
+        if batch:
+            # Event loop keeps only weak references to tasks.
+            task = asyncio.create_task(self._save(batch))
+            self._saving.add(task)
+            task.add_done_callback(self._saving.discard)
+
+    @staticmethod
+    async def _save(batch: List[_PendingResults]):
+        try:
+            logger.debug(f"Saving batch of {len(batch)} tracker results.")
+            results = await TrackerResultPersister.persist_batch(
+                [(pending.persister, pending.tracker_results) for pending in batch]
+            )
+            for pending, result in zip(batch, results):
+                if not pending.future.done():
+                    pending.future.set_result(result)
+        except Exception as e:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+        finally:
+            # Save was cancelled, requests must not wait forever.
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.cancel()
@@ -5,19 +5,17 @@ from typing import List, Optional, Callable
 from uuid import uuid4
 
 from dotty_dict import dotty
-from pydantic.error_wrappers import ValidationError
 from tracardi.domain.consent_field_compliance import ConsentFieldCompliance
 
-from tracardi.service.notation.dot_accessor import DotAccessor
 
-from tracardi.domain.event_to_profile import EventToProfile
 from tracardi.domain.named_entity import NamedEntity
 from tracardi.domain.rule import Rule
 from tracardi.domain.type import Type
-from tracardi.process_engine.tql.condition import Condition
 from tracardi.service.license import License, INDEXER
+from tracardi.service.metrics import metrics, RULE_LOOKUP, SEGMENTATION, PROFILE_MERGE, DESTINATION_DISPATCH
 
 from tracardi.service.destinations.dispatchers import event_destination_dispatch
+from tracardi.service.event_to_profile_copy import EventToProfileCopier, get_copy_plans
 from tracardi.config import tracardi, memory_cache
 from tracardi.domain.enum.event_status import COLLECTED
 from tracardi.domain.payload.event_payload import EventPayload
@@ -49,11 +47,6 @@ logger.setLevel(tracardi.logging_level)
 logger.addHandler(log_handler)
 cache = CacheManager()
 
-EQUALS = 0
-EQUALS_IF_NOT_EXISTS = 1
-APPEND = 2
-
-
 @dataclass
 class TrackerResult:
     tracker_payload: TrackerPayload
@@ -121,7 +114,7 @@ class TrackingManager(TrackingManagerBase):
                 logger.info("Profile visits metadata changed.")
                 profile.metadata.time.visit.set_visits_times()
                 profile.metadata.time.visit.count += 1
-                profile.operation.update = True
+                profile.mark_dirty('metadata.time.visit')
                 # Set time zone form session
                 if session.context:
                     try:
@@ -221,144 +214,21 @@ class TrackingManager(TrackingManagerBase):
                 f"This is scheduled event. Will load flow {self.tracker_payload.scheduled_event_config.flow_id}")
         else:
             # Routing rules are subject to caching
-            event_rules = await storage.driver.rule.load_rules(self.tracker_payload.source, events)
+            with metrics.time(RULE_LOOKUP):
+                event_rules = await storage.driver.rule.load_rules(self.tracker_payload.source, events)
 
         # Copy data from event to profile. This must be run just before processing.
 
-        for event in events:
-            coping_schemas = await cache.event_to_profile_coping(
-                event_type=event.type,
-                ttl=memory_cache.event_to_profile_coping_ttl)
-
-            if coping_schemas.total > 0:
-                flat_profile = dotty(self.profile.dict())
-                flat_event = flat_events[event.id]
-                for coping_schema in coping_schemas:
-                    coping_schema = coping_schema.to_entity(EventToProfile)
-
-                    # Check condition
-                    if 'condition' in coping_schema.config:
-                        if_statement = coping_schema.config['condition']
-                        try:
-                            dot = DotAccessor(event=event, profile=self.profile, session=self.session)
-                            condition = Condition()
-                            result = await condition.evaluate(if_statement, dot)
-                            if result is False:
-                                continue
-                        except Exception as e:
-                            self.console_log.append(Console(
-                                flow_id=None,
-                                node_id=None,
-                                event_id=event.id,
-                                profile_id=get_entity_id(self.profile),
-                                origin='event',
-                                class_name=TrackingManager.__name__,
-                                module=__name__,
-                                type='error',
-                                message=f"Routing error. "
-                                        f"An error occurred when coping data from event to profile. "
-                                        f"There is error in the conditional trigger settings for event "
-                                        f"`{event.type}`."
-                                        f"Could not parse or access data for if statement: `{if_statement}`. "
-                                        f"Data was not copied but the event was routed to the next step. ",
-                                traceback=get_traceback(e)
-                            ))
-                            continue
-
-                    # Copy
-                    if coping_schema.event_to_profile:
-                        allowed_profile_fields = (
-                            "traits", "pii", "ids", "stats", "segments", "interests", "consents", "aux")
-                        for event_ref, profile_ref, operation in coping_schema.items():
-                            if not profile_ref.startswith(allowed_profile_fields):
-                                self.console_log.append(
-                                    Console(
-                                        flow_id=None,
-                                        node_id=None,
-                                        event_id=event.id,
-                                        profile_id=get_entity_id(self.profile),
-                                        origin='event',
-                                        class_name=TrackingManager.__name__,
-                                        module=__name__,
-                                        type='warning',
-                                        message=f"You are trying to copy the data to unknown field in profile. "
-                                                f"Your profile reference `{profile_ref}` does not start with typical "
-                                                f"fields that are {allowed_profile_fields}. Please check if there isn't "
-                                                f"an error in your copy schema. Data will not be copied if it does not "
-                                                f"match Profile schema.",
-                                        traceback=[]
-                                    )
-                                )
-
-                            try:
-                                if operation == APPEND:
-                                    if profile_ref not in flat_profile:
-                                        flat_profile[profile_ref] = [flat_event[event_ref]]
-                                    elif isinstance(flat_profile[profile_ref], list):
-                                        flat_profile[profile_ref].append(flat_event[event_ref])
-                                    elif not isinstance(flat_profile[profile_ref], dict):
-                                        flat_profile[profile_ref] = [flat_profile[profile_ref]]
-                                        flat_profile[profile_ref].append(flat_event[event_ref])
-                                    else:
-                                        raise KeyError(
-                                            f"Can not append data {flat_event[event_ref]} to {flat_profile[profile_ref]} at profile@{profile_ref}")
-
-                                elif operation == EQUALS_IF_NOT_EXISTS:
-                                    if profile_ref not in flat_profile:
-                                        flat_profile[profile_ref] = flat_event[event_ref]
-                                else:
-                                    flat_profile[profile_ref] = flat_event[event_ref]
+        if isinstance(self.profile, Profile):
+            copier = EventToProfileCopier(self.profile, self.session, self.console_log)
+            for event in events:
+                coping_schemas = await cache.event_to_profile_coping(
+                    event_type=event.type,
+                    ttl=memory_cache.event_to_profile_coping_ttl)
 
-                            except KeyError as e:
-                                if event_ref.startswith(("properties", "traits")):
-                                    message = f"Can not copy data from event `{event_ref}` to profile `{profile_ref}`. " \
-                                              f"Original data send to processing. Error message: {repr(e)} key."
-                                else:
-                                    message = f"Can not copy data from event `{event_ref}` to profile `{profile_ref}`. " \
-                                              f"Maybe `properties.{event_ref}` or `traits.{event_ref}` could work. " \
-                                              f"Original data send to processing. Error message: {repr(e)} key."
-                                self.console_log.append(
-                                    Console(
-                                        flow_id=None,
-                                        node_id=None,
-                                        event_id=event.id,
-                                        profile_id=get_entity_id(self.profile),
-                                        origin='event',
-                                        class_name=TrackingManager.__name__,
-                                        module=__name__,
-                                        type='warning',
-                                        message=message,
-                                        traceback=get_traceback(e)
-                                    )
-                                )
-                                logger.error(message)
-                try:
-                    self.profile = Profile(**flat_profile)
-                    self.profile.operation.update = True
-                except ValidationError as e:
-                    message = f"It seems that there was an error when trying to add or update some information to " \
-                              f"your profile. The error occurred because you tried to add a value that is not " \
-                              f"allowed by the type of data that the profile can accept.  For instance, you may " \
-                              f"have tried to add a name to a field in your profile that only accepts a single string, " \
-                              f"but you provided a list of strings instead. No changes were made to your profile, and " \
-                              f"the original data you sent was not copied because it did not meet the " \
-                              f"requirements of the profile. " \
-                              f"Details: {repr(e)}. See: event to profile copy schema for event `{event.type}`."
-                    self.console_log.append(
-                        Console(
-                            flow_id=None,
-                            node_id=None,
-                            event_id=event.id,
-                            profile_id=get_entity_id(self.profile),
-                            origin='event',
-                            class_name=TrackingManager.__name__,
-                            module=__name__,
-                            type='error',
-                            message=message,
-                            traceback=get_traceback(e)
-                        )
-                    )
-                    logger.error(message)
+                if coping_schemas.total > 0:
+                    copier.copy(event, flat_events[event.id], get_copy_plans(event.type, coping_schemas))
+            copier.commit()
 
         ux = []
         post_invoke_events = None
@@ -409,9 +279,10 @@ class TrackingManager(TrackingManagerBase):
 
                     if isinstance(self.profile, Profile):
                         # Segment
-                        segmentation_result = await segment(self.profile,
-                                                            rule_invoke_result.ran_event_types,
-                                                            storage.driver.segment.load_segments)
+                        with metrics.time(SEGMENTATION):
+                            segmentation_result = await segment(self.profile,
+                                                                rule_invoke_result.ran_event_types,
+                                                                storage.driver.segment.load_enabled_segments)
 
                 except Exception as e:
                     message = 'Rules engine or segmentation returned an error `{}`'.format(str(e))
@@ -435,10 +306,11 @@ class TrackingManager(TrackingManagerBase):
                 try:
                     if self.profile is not None:  # Profile can be None if profile_less event is processed
                         if self.profile.operation.needs_merging():
-                            if self.on_profile_merge:
-                                self.profile = await self.on_profile_merge(self.profile)
-                            else:
-                                self.profile = await self.merge_profile(self.profile)
+                            with metrics.time(PROFILE_MERGE):
+                                if self.on_profile_merge:
+                                    self.profile = await self.on_profile_merge(self.profile)
+                                else:
+                                    self.profile = await self.merge_profile(self.profile)
                     else:
                         self.console_log.append(
                             Console(
@@ -489,11 +361,12 @@ class TrackingManager(TrackingManagerBase):
 
             # Run event destination
             load_destination_task = cache.event_destination
-            await event_destination_dispatch(load_destination_task,
-                                             self.profile,
-                                             self.session,
-                                             events,
-                                             self.tracker_payload.debug)
+            with metrics.time(DESTINATION_DISPATCH, type="event"):
+                await event_destination_dispatch(load_destination_task,
+                                                 self.profile,
+                                                 self.session,
+                                                 events,
+                                                 self.tracker_payload.debug)
 
             return TrackerResult(
                 session=self.session,
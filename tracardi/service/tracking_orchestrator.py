@@ -2,7 +2,7 @@ import asyncio
 import logging
 from collections import Callable
 from datetime import datetime
-from typing import Type
+from typing import Type, List
 from uuid import uuid4
 from tracardi.config import tracardi, memory_cache
 from tracardi.domain.entity import Entity
@@ -20,9 +20,10 @@ from tracardi.exceptions.exception import DuplicatedRecordException
 from tracardi.domain.payload.tracker_payload import TrackerPayload
 from tracardi.service.consistency.session_corrector import correct_session
 from tracardi.service.destination_orchestrator import DestinationOrchestrator
+from tracardi.service.metrics import metrics, DESTINATION_DISPATCH
 from tracardi.service.storage.driver import storage
 from tracardi.service.storage.loaders import get_profile_loader
-from tracardi.service.synchronizer import profile_synchronizer
+from tracardi.service.synchronizer import profile_synchronizer, ProfileLock
 from tracardi.service.tracker_config import TrackerConfig
 from tracardi.service.tracking_manager import TrackingManager, TrackerResult, TrackingManagerBase
 from tracardi.service.utils.getters import get_entity_id
@@ -47,7 +48,7 @@ class TrackingOrchestrator:
         self.tracker_config = tracker_config
         self.source = source
         self.console_log = None
-        self.locked = []
+        self.locked: List[ProfileLock] = []
 
     async def invoke(self, tracker_payload: TrackerPayload, console_log: ConsoleLog) -> TrackerResult:
 
@@ -139,16 +140,16 @@ class TrackingOrchestrator:
         if isinstance(tracker_payload.source, EventSource) and isinstance(session, Session):
             session.metadata.channel = tracker_payload.source.channel
 
-        # Make profile copy
+        # Track profile changes from now on
         has_profile = not tracker_payload.profile_less and isinstance(profile, Profile)
-        profile_copy = profile.dict(exclude={"operation": ...}) if has_profile else None
+        original_profile = profile if has_profile else None
+        if has_profile:
+            profile.reset_changes()
 
         # Lock
         if has_profile and self.source.synchronize_profiles:
             key = f"profile:{profile.id}"
-            await profile_synchronizer.wait_for_unlock(key, seq=tracker_payload.get_id())
-            profile_synchronizer.lock_entity(key)
-            self.locked.append(key)
+            self.locked.append(await profile_synchronizer.lock(key, seq=tracker_payload.get_id()))
 
         if self.on_profile_ready is None:
             tracking_manager = TrackingManager(
@@ -189,10 +190,11 @@ class TrackingOrchestrator:
             tracker_result.events,
             self.console_log
         )
-        await do.sync_destination(
-            has_profile,
-            profile_copy,
-        )
+        with metrics.time(DESTINATION_DISPATCH, type="profile"):
+            await do.sync_destination(
+                has_profile,
+                original_profile,
+            )
 
         return tracker_result
 
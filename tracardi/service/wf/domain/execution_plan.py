@@ -0,0 +1,66 @@
+from typing import List, Dict, Optional
+
+from .edge import Edge
+from .graph_invoker import GraphInvoker
+from .node import Node, Graph
+from .port_to_port_edges import PortToPortEdges
+
+
+class ExecutionPlan:
+
+    """
+    Compiled form of a workflow. Keeps topologically sorted nodes with their in and out edges, node index and
+    resolved plugin classes so the flow graph does not need to be converted and sorted on every event.
+
+    Plan is read only. Every invocation gets its own copy of nodes and edges (see `make_invoker`), because
+    nodes keep plugin instances and plugins may enable or disable edges at runtime.
+    """
+
+    def __init__(self, graph: List[Node], start_nodes: List[str], plugin_classes: Dict[str, type]):
+        self.graph = graph
+        self.start_nodes = start_nodes
+        self.plugin_classes = plugin_classes
+        self.node_index = {node.id: position for position, node in enumerate(graph)}  # type: Dict[str, int]
+        self.edge_index = {}  # type: Dict[str, Edge]
+        for node in graph:
+            for _, edge, _ in node.graph.out_edges:
+                self.edge_index[edge.id] = edge
+            for _, edge, _ in node.graph.in_edges:
+                self.edge_index[edge.id] = edge
+
+    def __len__(self):
+        return len(self.graph)
+
+    def get_node_by_id(self, node_id) -> Optional[Node]:
+        if node_id in self.node_index:
+            return self.graph[self.node_index[node_id]]
+        return None
+
+    @staticmethod
+    def _copy_edges(port_edges: PortToPortEdges, edge_copies: Dict[str, Edge]) -> PortToPortEdges:
+        copied = PortToPortEdges()
+        for port, edges in port_edges.edges.items():
+            copied.edges[port] = set()
+            for edge in edges:  # type: Edge
+                if edge.id not in edge_copies:
+                    edge_copies[edge.id] = edge.copy()
+                copied.edges[port].add(edge_copies[edge.id])
+        return copied
+
+    def _copy_graph(self) -> List[Node]:
+        # Edges are shared between the source node out_edges and the target node in_edges. The copy must keep
+        # this relation so the edge disabled by one node is seen as disabled by the other.
+        edge_copies = {}  # type: Dict[str, Edge]
+        return [
+            node.copy(update={
+                "object": None,
+                "graph": Graph.construct(
+                    in_edges=self._copy_edges(node.graph.in_edges, edge_copies),
+                    out_edges=self._copy_edges(node.graph.out_edges, edge_copies)
+                )
+            }) for node in self.graph
+        ]
+
+    def make_invoker(self, debug: bool = False) -> GraphInvoker:
+        invoker = GraphInvoker(graph=self._copy_graph(), start_nodes=list(self.start_nodes), debug=debug)
+        return invoker.set_plugin_classes(self.plugin_classes)
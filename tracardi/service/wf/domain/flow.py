@@ -1,4 +1,7 @@
 from typing import Optional
+
+from pydantic import PrivateAttr
+
 from .flow_graph_data import FlowGraphData
 from .flow_response import FlowResponse
 from .named_entity import NamedEntity
@@ -8,3 +11,15 @@ class Flow(NamedEntity):
     description: Optional[str] = None
     flowGraph: Optional[FlowGraphData] = None
     response: Optional[FlowResponse] = FlowResponse()
+    _revision: Optional[str] = PrivateAttr(None)
+
+    def set_revision(self, revision: Optional[str]) -> 'Flow':
+        self._revision = revision
+        return self
+
+    def get_revision(self) -> Optional[str]:
+        """
+        Returns the fingerprint of the stored flow version or None if the flow was not loaded from
+        a stored production record (e.g. it is a draft that is being debugged).
+        """
+        return self._revision
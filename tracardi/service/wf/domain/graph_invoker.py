@@ -6,7 +6,7 @@ from collections import defaultdict
 
 from time import time
 from typing import List, Union, Tuple, Optional, Dict, AsyncIterable
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, ValidationError, PrivateAttr
 from tracardi.exceptions.log_handler import log_handler
 
 from tracardi.config import tracardi
@@ -15,6 +15,8 @@ from tracardi.domain.payload.tracker_payload import TrackerPayload
 from tracardi.domain.profile import Profile
 from tracardi.domain.session import Session
 from tracardi.process_engine.tql.condition import Condition
+from tracardi.service.connection_pools import connection_pools
+from tracardi.service.destinations.resource_loader import load_resource
 from tracardi.service.plugin.runner import ActionRunner
 from tracardi.service.plugin.domain.console import Log, ConsoleStatus
 from tracardi.service.plugin.domain.result import Result, VoidResult, MissingResult
@@ -27,8 +29,11 @@ from .error_debug_info import ErrorDebugInfo
 from .input_params import InputParams
 from ..service.excetions import get_traceback
 import tracardi.service.wf.service.life_cycle as life_cycle
+from ..service.plugin_instance_pool import plugin_instances, PluginInstanceKey
+from ..utils.copy_on_write import share
 from ..utils.dag_error import DagError, DagExecError
 from .edge import Edge
+from .flow import Flow
 from .node import Node
 from .tasks_results import ActionsResults
 from ...notation.dict_traverser import DictTraverser
@@ -79,6 +84,40 @@ class GraphInvoker(BaseModel):
     graph: List[Node]
     start_nodes: list
     debug: bool = False
+    _plugin_classes: Dict[str, type] = PrivateAttr(default_factory=dict)
+    _instance_keys: Dict[str, Tuple[PluginInstanceKey, int]] = PrivateAttr(default_factory=dict)
+
+    def set_plugin_classes(self, plugin_classes: Dict[str, type]) -> 'GraphInvoker':
+        """
+        Sets already resolved plugin classes indexed by node id. Nodes without resolved class will
+        import their plugin module on init.
+        """
+        self._plugin_classes = plugin_classes
+        return self
+
+    async def _get_instance_key(self, flow, node: Node,
+                                plugin_class: Optional[type]) -> Optional[PluginInstanceKey]:
+        # Only plugins of stored flow revisions are reused. Drafts may change between runs.
+        if plugin_class is None or not plugin_class.reusable or not isinstance(flow, Flow):
+            return None
+        revision = flow.get_revision()
+        if revision is None:
+            return None
+
+        # Reusable plugins keep clients and credentials of the resource selected in `source`. Resource may be
+        # changed by another worker, so the hash of its credentials is a part of the key.
+        source = node.init.get('source', None) if isinstance(node.init, dict) else None
+        resource_id = source.get('id', None) if isinstance(source, dict) else None
+        resource_revision = None
+        if resource_id is not None:
+            try:
+                resource = await load_resource(resource_id)
+            except Exception:
+                # Missing or disabled resource. Plugin set up reports the error.
+                return None
+            resource_revision = connection_pools.get_credentials_hash(resource.credentials)
+
+        return flow.id, revision, node.id, self.debug, resource_id, resource_revision
 
     @staticmethod
     def _add_to_event_loop(tasks, coroutine, port, params, edge: Edge, active) -> list:
@@ -268,12 +307,14 @@ class GraphInvoker(BaseModel):
 
                     else:
 
-                        upstream_result_copy = upstream_result.copy(deep=True)
-
                         # Do not trigger for None values
 
-                        params = {end_port: upstream_result_copy.value}
-                        if upstream_result_copy.value is not None:
+                        if upstream_result.value is not None:
+
+                            # Upstream result is shared by all downstream nodes. Every node gets its own
+                            # copy-on-write view of the value, so the value is copied only if the node changes it.
+
+                            params = {end_port: share(upstream_result.value)}
 
                             # Run spec with every downstream message (param)
                             # Runs as many times as downstream edges
@@ -285,7 +326,7 @@ class GraphInvoker(BaseModel):
                                 node,
                                 params,
                                 end_port,
-                                upstream_result.value,
+                                share(upstream_result.value),
                                 in_edge=edge)
 
                         else:
@@ -347,6 +388,8 @@ class GraphInvoker(BaseModel):
 
                 if isinstance(node.object, ActionRunner):
                     await node.object.on_error(e)
+                    # Plugin may have closed its clients in on_error, so it is closed and not reused.
+                    node.object.set_up_done = False
 
                 msg = f"{repr(e)}. Check run method of `{node.className}`\n\n" \
                       f"Details: {format_exc()}"
@@ -433,9 +476,9 @@ class GraphInvoker(BaseModel):
 
     @staticmethod
     def _add_results(task_results: ActionsResults, node: Node, result: Result) -> ActionsResults:
+        # Result is not copied. Downstream nodes get copy-on-write views of its value.
         for _, edge, _ in node.graph.out_edges:
-            result_copy = result.copy(deep=True)
-            task_results.add(edge.id, result_copy)
+            task_results.add(edge.id, result)
         return task_results
 
     async def init(self, debug_info: DebugInfo, log_list: List[Log], flow, flow_history, event, session, profile,
@@ -454,7 +497,13 @@ class GraphInvoker(BaseModel):
                                        "microservice is not configured. See 'Remote microservice configuration' "
                                        "in node settings.")
 
-                node.object = await life_cycle.plugin.create_instance(node)
+                plugin_class = self._plugin_classes.get(node.id, None)
+                instance_key = await self._get_instance_key(flow, node, plugin_class)
+                node.object = plugin_instances.acquire(instance_key) if instance_key is not None else None
+                if node.object is None:
+                    node.object = await life_cycle.plugin.create_instance(node, plugin_class)
+                if instance_key is not None:
+                    self._instance_keys[node.id] = instance_key, plugin_instances.generation
 
                 node.object = life_cycle.plugin.set_context(
                     node,
@@ -508,6 +557,12 @@ class GraphInvoker(BaseModel):
         tasks = []
         for node in self.graph:
             if isinstance(node.object, ActionRunner):
+                instance_key, generation = self._instance_keys.get(node.id, (None, None))
+                if instance_key is not None and node.object.set_up_done:
+                    # Plugin is set up, keep it for the next events.
+                    life_cycle.plugin.clear_context(node.object)
+                    plugin_instances.release(instance_key, node.object, generation)
+                    continue
                 task = asyncio.create_task(node.object.close())
                 tasks.append(task)
         await asyncio.gather(*tasks)
@@ -524,6 +579,54 @@ class GraphInvoker(BaseModel):
         """
         return event.metadata.debug is True or self.debug is True
 
+    def _get_waves(self, concurrency: int) -> List[List[Node]]:
+        """
+        Groups nodes into waves. Nodes of one wave do not depend on each other, so they may run concurrently.
+        Every node is in the wave after the last wave of its upstream nodes. Nodes keep the topological order
+        within a wave.
+        """
+
+        if concurrency <= 1:
+            return [[node] for node in self.graph]
+
+        source_nodes = {}  # type: Dict[str, str]
+        for node in self.graph:
+            for _, edge, _ in node.graph.out_edges:
+                source_nodes[edge.id] = node.id
+
+        node_waves = {}  # type: Dict[str, int]
+        waves = []  # type: List[List[Node]]
+        for node in self.graph:
+            wave = 0
+            for _, edge, _ in node.graph.in_edges:
+                source_node_id = source_nodes.get(edge.id, None)
+                if source_node_id in node_waves:
+                    wave = max(wave, node_waves[source_node_id] + 1)
+            node_waves[node.id] = wave
+            if wave == len(waves):
+                waves.append([])
+            waves[wave].append(node)
+
+        return waves
+
+    def _is_skipped(self, node: Node) -> bool:
+        # Skip debug nodes when not debugging and tasks that are marked to be skipped
+        return (not self.debug and node.debug) or node.block_flow is True
+
+    async def _collect_node_results(self, node: Node, payload, actions_results: ActionsResults,
+                                    semaphore: asyncio.Semaphore) -> Tuple[list, Optional[Exception], float]:
+        """
+        Runs node and returns results yielded by run_node, the exception that stopped it and the end time.
+        """
+        results = []
+        try:
+            async with semaphore:
+                async for result in self.run_node(node, payload, ready_upstream_results=actions_results):
+                    results.append(result)
+        except Exception as e:
+            return results, e, time()
+        return results, None, time()
+
     async def run(self,
                   payload: dict,
                   event: Event,
@@ -533,200 +636,229 @@ class GraphInvoker(BaseModel):
                   log_list: List[Log],
                   ) -> Tuple[DebugInfo, List[Log], Profile, Session]:
 
+        """
+        Runs nodes wave by wave. Nodes of a wave run concurrently, at most `flow_node_concurrency` at a time.
+        Results of a wave are processed in the topological order when all its nodes are done, so the next wave
+        sees all upstream results, and the profile and session references change in the same order as when
+        nodes run one by one.
+        """
+
         actions_results = ActionsResults()
         flow_start_time = debug_info.timestamp
 
-        sequence_number = 0
+        sequence_numbers = {node.id: number for number, node in enumerate(self.graph, start=1)}
+        semaphore = asyncio.Semaphore(max(1, tracardi.flow_node_concurrency))
         execution_number = 0
-        for node in self.graph:  # type: Node
-
-            task_start_time = time()
-            sequence_number += 1
-            executed_node = False
-
-            node_debug_info = DebugNodeInfo(
-                id=node.id,
-                name=node.name,
-                sequenceNumber=sequence_number,
-                executionNumber=None,
-                errors=0,
-                warnings=0,
-                profiler=Profiler(
-                    startTime=task_start_time,
-                    endTime=task_start_time,
-                    runTime=task_start_time
-                ),
-            )
+        stopped = False
 
-            try:
+        for wave in self._get_waves(tracardi.flow_node_concurrency):
 
-                # Skip debug nodes when not debugging
-                if not self.debug and node.debug:
-                    continue
+            wave_start_time = time()
+            wave_tasks = {node.id: asyncio.create_task(
+                self._collect_node_results(node, payload, actions_results, semaphore)
+            ) for node in wave if not self._is_skipped(node)}
+
+            if wave_tasks:
+                await asyncio.wait(list(wave_tasks.values()))
 
-                # Skip tasks that are marked to be skipped
-                if node.block_flow is True:
+            for node in wave:  # type: Node
+
+                if stopped:
+                    # Nodes of this wave run concurrently with the node that stopped the workflow.
+                    if node.id in wave_tasks and isinstance(node.object, ActionRunner):
+                        for log in node.object.console.get_logs():  # type: Log
+                            log_list.append(log)
                     continue
 
-                async for result, \
-                          task_start_time, \
-                          _profile_reference_to_update, _session_reference_to_update, \
-                          node_console_status, input_edges in \
-                        self.run_node(node, payload, ready_upstream_results=actions_results):
-
-                    # If the profile or session changed during node execution change its reference in graph invoker
-
-                    if _profile_reference_to_update:
-                        profile = _profile_reference_to_update
-
-                    if _session_reference_to_update:
-                        session = _session_reference_to_update
-
-                    executed_node = input_edges.has_active_edges() | executed_node
-
-                    # Add information if ony of the input edge is active
-
-                    debug_info.add_debug_edge_info(input_edges)
-
-                    # Process result
-
-                    if result is None:
-                        # Result is None
-                        pass
-                    elif isinstance(result, Result):
-                        if result.value is not None:
-                            actions_results = self._add_results(actions_results, node, result)
-                    elif isinstance(result, tuple):
-                        for sub_result in result:  # type: Result
-                            if sub_result is None:
-                                # This is None result
-                                pass
-                            elif isinstance(sub_result, Result):
-                                if sub_result.value is not None:
-                                    # Result is proper object
-                                    actions_results = self._add_results(actions_results, node, sub_result)
-                            else:
-                                _edge = input_edges.get_first_edge()
-                                raise DagError(
-                                    "Action did not return Result or tuple of Results. Expected Result got {}".format(
-                                        type(result)),
-                                    port=_edge.port,
-                                    input=_edge.params,
-                                    edge=_edge.id
+                task_start_time = wave_start_time
+                task_end_time = time()
+                executed_node = False
+
+                node_debug_info = DebugNodeInfo(
+                    id=node.id,
+                    name=node.name,
+                    sequenceNumber=sequence_numbers[node.id],
+                    executionNumber=None,
+                    errors=0,
+                    warnings=0,
+                    profiler=Profiler(
+                        startTime=task_start_time,
+                        endTime=task_start_time,
+                        runTime=task_start_time
+                    ),
+                )
+
+                try:
+
+                    if self._is_skipped(node):
+                        continue
+
+                    node_results, node_error, task_end_time = wave_tasks[node.id].result()
+
+                    for result, \
+                            task_start_time, \
+                            _profile_reference_to_update, _session_reference_to_update, \
+                            node_console_status, input_edges in node_results:
+
+                        # If the profile or session changed during node execution change its reference in graph invoker
+
+                        if _profile_reference_to_update:
+                            profile = _profile_reference_to_update
+
+                        if _session_reference_to_update:
+                            session = _session_reference_to_update
+
+                        executed_node = input_edges.has_active_edges() | executed_node
+
+                        # Add information if ony of the input edge is active
+
+                        debug_info.add_debug_edge_info(input_edges)
+
+                        # Process result
+
+                        if result is None:
+                            # Result is None
+                            pass
+                        elif isinstance(result, Result):
+                            if result.value is not None:
+                                actions_results = self._add_results(actions_results, node, result)
+                        elif isinstance(result, tuple):
+                            for sub_result in result:  # type: Result
+                                if sub_result is None:
+                                    # This is None result
+                                    pass
+                                elif isinstance(sub_result, Result):
+                                    if sub_result.value is not None:
+                                        # Result is proper object
+                                        actions_results = self._add_results(actions_results, node, sub_result)
+                                else:
+                                    _edge = input_edges.get_first_edge()
+                                    raise DagError(
+                                        "Action did not return Result or tuple of Results. Expected Result got {}".format(
+                                            type(result)),
+                                        port=_edge.port,
+                                        input=_edge.params,
+                                        edge=_edge.id
+                                    )
+                        else:
+                            # result can be DagExecError this means that this node raised exception
+                            if isinstance(result, DagExecError):
+                                raise result
+
+                            _edge = input_edges.get_first_edge()
+
+                            raise DagError(
+                                "Action did not return Result or tuple of Results. Expected Result got {}".format(
+                                    type(result)),
+                                port=_edge.port,
+                                input=_edge.params,
+                                edge=_edge.id
+                            )
+
+                        if self.is_in_debug_mode(event):
+                            for input_edge_id, input_edge in input_edges.edges.items():  # type: str, InputEdge
+                                node_debug_info.append_call_info(
+                                    flow_start_time,
+                                    task_start_time,
+                                    node,
+                                    input_edge=Entity(id=input_edge_id) if input_edge_id is not None else None,
+                                    input_params=self._get_input_params(input_edge.port, input_edge.params),
+                                    output_edge=None,
+                                    output_params=[result] if isinstance(result, Result) else result,
+                                    active=input_edge.active,
+                                    errors=node_console_status.errors,
+                                    warnings=node_console_status.warnings
                                 )
-                    else:
-                        # result can be DagExecError this means that this node raised exception
-                        if isinstance(result, DagExecError):
-                            raise result
 
-                        _edge = input_edges.get_first_edge()
+                        if executed_node:
+                            for input_edge_id, _ in input_edges.edges.items():  # type: str, InputEdge
+                                log_list.append(
+                                    Log(
+                                        node_id=None,
+                                        module=node.object.console.module,
+                                        class_name=node.object.console.class_name,
+                                        type='info',
+                                        message=f"Node `{node_debug_info.name}` edge {input_edge_id} executed without errors."
+                                    )
+                                )
+
+                    if node_error is not None:
+                        raise node_error
+
+                except (DagError, DagExecError) as e:
+
+                    error_log = Log(
+                        profile_id=get_entity_id(profile),
+                        node_id=node.id,
+                        module=__name__,
+                        class_name='GraphInvoker',
+                        type='error',
+                        message=str(e)
+                    )
+
+                    if isinstance(e, DagExecError):
+                        error_log.traceback = e.traceback
+                    elif isinstance(e, DagError):
+                        error_log.traceback = get_traceback(e)
 
-                        raise DagError(
-                            "Action did not return Result or tuple of Results. Expected Result got {}".format(
-                                type(result)),
-                            port=_edge.port,
-                            input=_edge.params,
-                            edge=_edge.id
-                        )
+                    log_list.append(error_log)
 
                     if self.is_in_debug_mode(event):
-                        for input_edge_id, input_edge in input_edges.edges.items():  # type: str, InputEdge
+                        if e.input is not None and e.port is not None:
+
                             node_debug_info.append_call_info(
                                 flow_start_time,
                                 task_start_time,
                                 node,
-                                input_edge=Entity(id=input_edge_id) if input_edge_id is not None else None,
-                                input_params=self._get_input_params(input_edge.port, input_edge.params),
+                                input_edge=Entity(id=e.edge) if e.edge is not None else None,
+                                input_params=InputParams(port=e.port, value=e.input),
                                 output_edge=None,
-                                output_params=[result] if isinstance(result, Result) else result,
-                                active=input_edge.active,
-                                errors=node_console_status.errors,
-                                warnings=node_console_status.warnings
+                                output_params=None,
+                                active=True,
+                                error=str(e),
+                                errors=1,
+                                warnings=0
                             )
 
-                    if executed_node:
-                        for input_edge_id, _ in input_edges.edges.items():  # type: str, InputEdge
-                            log_list.append(
-                                Log(
-                                    node_id=None,
-                                    module=node.object.console.module,
-                                    class_name=node.object.console.class_name,
-                                    type='info',
-                                    message=f"Node `{node_debug_info.name}` edge {input_edge_id} executed without errors."
-                                )
-                            )
-
-            except (DagError, DagExecError) as e:
-
-                error_log = Log(
-                    profile_id=get_entity_id(profile),
-                    node_id=node.id,
-                    module=__name__,
-                    class_name='GraphInvoker',
-                    type='error',
-                    message=str(e)
-                )
+                        else:
 
-                if isinstance(e, DagExecError):
-                    error_log.traceback = e.traceback
-                elif isinstance(e, DagError):
-                    error_log.traceback = get_traceback(e)
-
-                log_list.append(error_log)
-
-                if self.is_in_debug_mode(event):
-                    if e.input is not None and e.port is not None:
-
-                        node_debug_info.append_call_info(
-                            flow_start_time,
-                            task_start_time,
-                            node,
-                            input_edge=Entity(id=e.edge) if e.edge is not None else None,
-                            input_params=InputParams(port=e.port, value=e.input),
-                            output_edge=None,
-                            output_params=None,
-                            active=True,
-                            error=str(e),
-                            errors=1,
-                            warnings=0
-                        )
+                            node_debug_info.append_call_info(
+                                flow_start_time,
+                                task_start_time,
+                                node,
+                                input_edge=Entity(id=e.edge) if e.edge is not None else None,
+                                input_params=None,
+                                output_edge=None,
+                                output_params=None,
+                                active=True,
+                                error=str(e),
+                                errors=1,
+                                warnings=0
+                            )
 
-                    else:
+                    # Stop workflow when there is an error
+                    stopped = True
+                    continue
 
-                        node_debug_info.append_call_info(
-                            flow_start_time,
-                            task_start_time,
-                            node,
-                            input_edge=Entity(id=e.edge) if e.edge is not None else None,
-                            input_params=None,
-                            output_edge=None,
-                            output_params=None,
-                            active=True,
-                            error=str(e),
-                            errors=1,
-                            warnings=0
-                        )
-
-                # Stop workflow when there is an error
-                break
+                finally:
+                    if self.is_in_debug_mode(event):
+                        node_debug_info.profiler.endTime = task_end_time - flow_start_time
+                        node_debug_info.profiler.runTime = task_end_time - flow_start_time - task_start_time
 
-            finally:
-                if self.is_in_debug_mode(event):
-                    node_debug_info.profiler.endTime = time() - flow_start_time
-                    node_debug_info.profiler.runTime = time() - flow_start_time - task_start_time
+                        # If node had call that means it was running
 
-                    # If node had call that means it was running
+                        if executed_node:
+                            execution_number += 1
+                            node_debug_info.executionNumber = execution_number
+                            debug_info.add_node_info(node_debug_info)
 
-                    if executed_node:
-                        execution_number += 1
-                        node_debug_info.executionNumber = execution_number
-                        # debug_info.nodes[node_debug_info.id] = node_debug_info
-                        debug_info.add_node_info(node_debug_info)
+                    # Collect console logs set inside plugins
+                    if isinstance(node.object, ActionRunner):
+                        for log in node.object.console.get_logs():  # type: Log
+                            log_list.append(log)
 
-                # Collect console logs set inside plugins
-                if isinstance(node.object, ActionRunner):
-                    for log in node.object.console.get_logs():  # type: Log
-                        log_list.append(log)
+            if stopped:
+                break
 
         return debug_info, log_list, profile, session
 
@@ -0,0 +1,92 @@
+from typing import Optional, Dict
+
+from tracardi.config import memory_cache as memory_cache_config
+from tracardi.event_server.utils.memory_cache import MemoryCache, CacheItem
+from tracardi.service.metrics import metrics, FLOW_COMPILE
+from tracardi.service.wf.domain.dag_graph import DagGraph
+from tracardi.service.wf.domain.execution_plan import ExecutionPlan
+from tracardi.service.wf.domain.flow import Flow
+import tracardi.service.wf.service.life_cycle as life_cycle
+from tracardi.service.wf.utils.dag_processor import DagProcessor
+from tracardi.service.wf.utils.flow_graph_converter import FlowGraphConverter
+
+memory_cache = MemoryCache("flow-execution-plans", max_pool=500)
+
+
+class FlowExecutionPlans:
+
+    """
+    Execution plans of one flow revision indexed by the start node. Regular flows start at start nodes,
+    scheduled events start at the scheduled node.
+    """
+
+    def __init__(self, revision: str):
+        self.revision = revision
+        self.plans = {}  # type: Dict[Optional[str], ExecutionPlan]
+
+
+def _resolve_plugin_classes(dag_graph: DagGraph) -> Dict[str, type]:
+    plugin_classes = {}
+    for node in dag_graph.nodes:
+        try:
+            plugin_classes[node.id] = life_cycle.plugin.get_plugin_class(node)
+        except Exception:
+            # Plugin will be resolved again on init and the error will be reported in the flow debug info.
+            pass
+    return plugin_classes
+
+
+def compile_execution_plan(flow: Flow, scheduled_node_id: Optional[str] = None) -> ExecutionPlan:
+    """
+    Converts editor graph to sorted execution graph. Raises DagGraphError if the graph can not be executed.
+    """
+
+    with metrics.time(FLOW_COMPILE, flow=flow.id):
+        converter = FlowGraphConverter(flow.flowGraph.dict())
+        dag_graph = converter.convert_to_dag_graph()
+        dag = DagProcessor(dag_graph)
+
+        if scheduled_node_id is not None:
+            # If scheduled event find node with defined id. It must be equal to scheduled node id
+            start_nodes = dag.find_scheduled_nodes(node_ids=[scheduled_node_id])
+        else:
+            start_nodes = dag.find_start_nodes()
+
+        exec_dag = dag.make_execution_dag(start_nodes=start_nodes)
+
+        return ExecutionPlan(
+            graph=exec_dag.graph,
+            start_nodes=exec_dag.start_nodes,
+            plugin_classes=_resolve_plugin_classes(dag_graph)
+        )
+
+
+def get_execution_plan(flow: Flow, scheduled_node_id: Optional[str] = None) -> ExecutionPlan:
+    """
+    Returns compiled execution plan for a flow. Plans are cached only for flows that have a revision,
+    that is production flows loaded from storage. Drafts are compiled every time.
+    """
+
+    revision = flow.get_revision()
+    ttl = memory_cache_config.flow_execution_plan_cache_ttl
+
+    if revision is None or ttl <= 0:
+        return compile_execution_plan(flow, scheduled_node_id)
+
+    flow_plans = memory_cache[flow.id].data if flow.id in memory_cache else None  # type: Optional[FlowExecutionPlans]
+
+    if flow_plans is None or flow_plans.revision != revision:
+        flow_plans = FlowExecutionPlans(revision)
+        memory_cache[flow.id] = CacheItem(data=flow_plans, ttl=ttl)
+
+    if scheduled_node_id not in flow_plans.plans:
+        flow_plans.plans[scheduled_node_id] = compile_execution_plan(flow, scheduled_node_id)
+
+    return flow_plans.plans[scheduled_node_id]
+
+
+def invalidate_execution_plan(flow_id: str):
+    """
+    Removes compiled plans of the flow. Must be called when the flow is saved or deleted.
+    """
+    del memory_cache[flow_id]
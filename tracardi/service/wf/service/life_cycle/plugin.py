@@ -1,5 +1,5 @@
 import importlib
-from typing import Optional
+from typing import Optional, Type
 
 from tracardi.domain.event import Event
 from tracardi.domain.flow import Flow
@@ -9,22 +9,32 @@ from tracardi.domain.session import Session
 from tracardi.service.plugin.domain.console import Console
 from tracardi.service.plugin.domain.result import Result
 from tracardi.service.plugin.runner import ActionRunner
+from tracardi.service.metrics import metrics, NODE_RUN
 from tracardi.service.utils.getters import get_entity_id
 from tracardi.service.wf.domain.node import Node
 
 
-async def create_instance(node: Node) -> ActionRunner:
+def get_plugin_class(node: Node) -> Type[ActionRunner]:
     """
-    Creates plugin instance
+    Imports plugin module and returns plugin class
     """
 
     module = importlib.import_module(node.module)
-    plugin_class = getattr(module, node.className)
+    return getattr(module, node.className)
+
+
+async def create_instance(node: Node, plugin_class: Type[ActionRunner] = None) -> ActionRunner:
+    """
+    Creates plugin instance. If plugin class is not given it is resolved from node module and class name.
+    """
+
+    if plugin_class is None:
+        plugin_class = get_plugin_class(node)
 
     action = plugin_class()
 
     if not isinstance(action, ActionRunner):
-        raise TypeError("Class {}.{} is not of type {}".format(module, node.className, type(ActionRunner)))
+        raise TypeError("Class {}.{} is not of type {}".format(node.module, node.className, type(ActionRunner)))
 
     return action
 
@@ -59,6 +69,23 @@ def set_context(node: Node,
     return node.object
 
 
+def clear_context(action: ActionRunner):
+    """
+    Removes references to the event context from the plugin that is kept for reuse.
+    """
+    action.event = None
+    action.session = None
+    action.profile = None
+    action.flow = None
+    action.flow_history = None
+    action.console = None
+    action.metrics = None
+    action.memory = None
+    action.ux = None
+    action.tracker_payload = None
+    action.execution_graph = None
+
+
 async def execute(node: Node, params: dict) -> Optional[Result]:
     # todo __debug__ may be removed because it is in node.
 
@@ -68,7 +95,10 @@ async def execute(node: Node, params: dict) -> Optional[Result]:
     else:
         init = {"__debug__": node.debug}
 
-    await node.object.set_up(init)
+    if not node.object.reusable or not node.object.set_up_done:
+        await node.object.set_up(init)
+        node.object.set_up_done = True
 
     # params has payload and in_edge
-    return await node.object.run(**params)
+    with metrics.time(NODE_RUN, flow=get_entity_id(node.object.flow), node=node.id, plugin=node.className):
+        return await node.object.run(**params)
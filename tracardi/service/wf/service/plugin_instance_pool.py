@@ -0,0 +1,153 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from time import monotonic
+from typing import Dict, List, Optional, Tuple
+
+from tracardi.config import tracardi
+from tracardi.exceptions.log_handler import log_handler
+from tracardi.service.plugin.runner import ActionRunner
+
+logger = logging.getLogger(__name__)
+logger.setLevel(tracardi.logging_level)
+logger.addHandler(log_handler)
+
+# Flow id, flow revision, node id, debug, id and credentials hash of resource used by the plugin
+PluginInstanceKey = Tuple[str, str, str, bool, Optional[str], Optional[str]]
+
+
+class PluginInstancePool:
+
+    """
+    Set up instances of reusable plugins, kept per flow revision and node. An instance is taken from the pool for
+    one flow invocation and returned when the invocation ends, so concurrent events never share an instance.
+
+    Instances unused for `idle_ttl` seconds, instances above `max_instances` (the least recently used first) and
+    instances of a flow or a resource that was saved or deleted are closed. Every invalidation starts a new
+    generation. Instances that were in use when their flow was invalidated are closed when released, instead of
+    being pooled. Resources changed by other workers change the credentials hash in the key, so instances with
+    old credentials are not acquired and are closed when idle.
+    """
+
+    def __init__(self, max_instances: int = 1000, idle_ttl: float = 300):
+        self.max_instances = max_instances
+        self.idle_ttl = idle_ttl
+        self._idle: Dict[PluginInstanceKey, List[Tuple[ActionRunner, float]]] = OrderedDict()
+        self._size = 0
+        self._last_purge = monotonic()
+        self._generation = 0
+        self._closed_generation = 0
+        self._flow_generations: Dict[str, int] = {}
+        self._resource_generations: Dict[str, int] = {}
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def generation(self) -> int:
+        """
+        Current generation. It must be read when the instance is acquired and passed to `release`.
+        """
+        return self._generation
+
+    def _is_stale(self, key: PluginInstanceKey, generation: int) -> bool:
+        flow_id, _, _, _, resource_id, _ = key
+        return generation < self._closed_generation \
+            or generation < self._flow_generations.get(flow_id, 0) \
+            or generation < self._resource_generations.get(resource_id, 0)
+
+    def acquire(self, key: PluginInstanceKey) -> Optional[ActionRunner]:
+        instances = self._idle.get(key, None)
+        if not instances:
+            return None
+
+        instance, _ = instances.pop()
+        self._size -= 1
+        if not instances:
+            del self._idle[key]
+        return instance
+
+    def release(self, key: PluginInstanceKey, instance: ActionRunner, generation: int = None):
+        if generation is not None and self._is_stale(key, generation):
+            # Flow or resources were changed while the instance was in use.
+            asyncio.create_task(self._close([instance]))
+            return
+
+        self._idle.setdefault(key, []).append((instance, monotonic()))
+        self._idle.move_to_end(key)
+        self._size += 1
+        self._purge()
+
+    @staticmethod
+    async def _close(instances: List[ActionRunner]):
+        for instance in instances:
+            try:
+                await instance.close()
+            except Exception as e:
+                logger.error(f"Could not close plugin {type(instance).__name__}. Reason: {str(e)}")
+
+    def _remove(self, keys: List[PluginInstanceKey]) -> List[ActionRunner]:
+        removed = []
+        for key in keys:
+            instances = self._idle.pop(key, [])
+            self._size -= len(instances)
+            removed += [instance for instance, _ in instances]
+        return removed
+
+    def _purge(self):
+        now = monotonic()
+        removed = []
+
+        if now - self._last_purge > 1:
+            self._last_purge = now
+            for key in list(self._idle):
+                instances = self._idle[key]
+                fresh = [item for item in instances if now - item[1] <= self.idle_ttl]
+                if len(fresh) < len(instances):
+                    removed += [instance for instance, last_used in instances if now - last_used > self.idle_ttl]
+                    self._size -= len(instances) - len(fresh)
+                    if fresh:
+                        self._idle[key] = fresh
+                    else:
+                        del self._idle[key]
+
+        while self._size > self.max_instances:
+            key = next(iter(self._idle))
+            instance, _ = self._idle[key].pop(0)
+            self._size -= 1
+            if not self._idle[key]:
+                del self._idle[key]
+            removed.append(instance)
+
+        if removed:
+            asyncio.create_task(self._close(removed))
+
+    async def invalidate(self, flow_id: str):
+        """
+        Closes instances of the flow. Must be called when the flow is saved or deleted.
+        """
+        self._generation += 1
+        self._flow_generations[flow_id] = self._generation
+        await self._close(self._remove([key for key in self._idle if key[0] == flow_id]))
+
+    async def invalidate_resource(self, resource_id: str):
+        """
+        Closes instances of plugins that use the resource. Must be called when the resource is saved or deleted.
+        """
+        self._generation += 1
+        self._resource_generations[resource_id] = self._generation
+        await self._close(self._remove([key for key in self._idle if key[4] == resource_id]))
+
+    async def close_all(self):
+        """
+        Closes all instances, e.g. on shutdown.
+        """
+        self._generation += 1
+        self._closed_generation = self._generation
+        await self._close(self._remove(list(self._idle)))
+
+
+plugin_instances = PluginInstancePool(
+    max_instances=tracardi.plugin_instances_max,
+    idle_ttl=tracardi.plugin_instance_idle_ttl
+)
@@ -0,0 +1,284 @@
+import operator
+from copy import deepcopy
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from uuid import UUID
+
+_IMMUTABLE_TYPES = (str, bytes, int, float, complex, bool, type(None), Decimal, date, datetime, time, timedelta, UUID)
+
+
+def share(value):
+    """
+    Returns value that can be passed to a node without copying it. Dicts and lists are wrapped in copy-on-write
+    containers, immutable values are returned as they are and other values are deep copied.
+    """
+
+    value_type = type(value)
+    if value_type is dict or value_type is CopyOnWriteDict:
+        return CopyOnWriteDict(value)
+    if value_type is list or value_type is CopyOnWriteList:
+        return CopyOnWriteList(value)
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return value
+    return deepcopy(value)
+
+
+class CopyOnWriteDict(dict):
+
+    """
+    Dict that shares nested data with the dict it was made of. Only the top level keys are copied when the
+    dict is created. Nested dicts and lists are wrapped in copy-on-write containers when they are read, so
+    changes never reach the shared data and nodes that only read the payload do not copy it.
+    """
+
+    __slots__ = ('_owned',)
+
+    def __init__(self, data: dict = None):
+        if data is None:
+            dict.__init__(self)
+        elif type(data) is dict:
+            dict.__init__(self, data)
+        else:
+            dict.__init__(self, dict.items(data))
+        self._owned = set()
+
+    def _own(self, key):
+        value = dict.__getitem__(self, key)
+        if key not in self._owned:
+            value = share(value)
+            dict.__setitem__(self, key, value)
+            self._owned.add(key)
+        return value
+
+    def _own_all(self):
+        if len(self._owned) < dict.__len__(self):
+            for key in dict.keys(self):
+                if key not in self._owned:
+                    self._own(key)
+
+    def __getitem__(self, key):
+        return self._own(key)
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self._owned.add(key)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._owned.discard(key)
+
+    def __iter__(self):
+        # Overridden iteration makes dict(), update() and ** unpacking read values with __getitem__.
+        return dict.__iter__(self)
+
+    def __or__(self, other):
+        if not isinstance(other, dict):
+            return NotImplemented
+        result = self.copy()
+        result.update(other)
+        return result
+
+    def __ror__(self, other):
+        if not isinstance(other, dict):
+            return NotImplemented
+        result = CopyOnWriteDict(other)
+        result.update(self)
+        return result
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def get(self, key, default=None):
+        if key in self:
+            return self._own(key)
+        return default
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self._own(key)
+        self[key] = default
+        return default
+
+    def pop(self, key, *default):
+        if key in self:
+            value = self._own(key)
+            del self[key]
+            return value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def popitem(self):
+        if not self:
+            raise KeyError('popitem(): dictionary is empty')
+        key = next(reversed(dict.keys(self)))
+        return key, self.pop(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        dict.clear(self)
+        self._owned.clear()
+
+    def values(self):
+        self._own_all()
+        return dict.values(self)
+
+    def items(self):
+        self._own_all()
+        return dict.items(self)
+
+    def copy(self):
+        return CopyOnWriteDict(self)
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return deepcopy(dict(dict.items(self)), memo)
+
+    def __reduce__(self):
+        return dict, (dict(dict.items(self)),)
+
+
+class CopyOnWriteList(list):
+
+    """
+    List that shares nested data with the list it was made of. Items are wrapped in copy-on-write containers when
+    they are read. Changes that move items make the list own all of its items first.
+    """
+
+    __slots__ = ('_owned',)
+
+    def __init__(self, data: list = None):
+        if data is None:
+            list.__init__(self)
+        elif type(data) is list:
+            list.__init__(self, data)
+        else:
+            list.__init__(self, list.__iter__(data))
+        # Indexes of items that belong to this list or True if all items belong to it.
+        self._owned = set() if list.__len__(self) > 0 else True
+
+    def _own(self, index):
+        value = list.__getitem__(self, index)
+        if self._owned is not True:
+            index = operator.index(index)
+            if index < 0:
+                index += list.__len__(self)
+            if index not in self._owned:
+                value = share(value)
+                list.__setitem__(self, index, value)
+                self._owned.add(index)
+        return value
+
+    def _own_all(self):
+        if self._owned is not True:
+            for index, value in enumerate(list.__iter__(self)):
+                if index not in self._owned:
+                    list.__setitem__(self, index, share(value))
+            self._owned = True
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            self._own_all()
+            return list.__getitem__(self, index)
+        return self._own(index)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice) or self._owned is True:
+            self._own_all()
+            list.__setitem__(self, index, value)
+        else:
+            list.__setitem__(self, index, value)
+            index = operator.index(index)
+            self._owned.add(index + list.__len__(self) if index < 0 else index)
+
+    def __delitem__(self, index):
+        self._own_all()
+        list.__delitem__(self, index)
+
+    def __iter__(self):
+        self._own_all()
+        return list.__iter__(self)
+
+    def __reversed__(self):
+        self._own_all()
+        return list.__reversed__(self)
+
+    def __add__(self, other):
+        self._own_all()
+        return list.__add__(self, other)
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __mul__(self, other):
+        self._own_all()
+        return list.__mul__(self, other)
+
+    __rmul__ = __mul__
+
+    def __imul__(self, other):
+        self._own_all()
+        return list.__imul__(self, other)
+
+    def append(self, value):
+        list.append(self, value)
+        if self._owned is not True:
+            self._owned.add(list.__len__(self) - 1)
+
+    def extend(self, values):
+        length = list.__len__(self)
+        list.extend(self, values)
+        if self._owned is not True:
+            self._owned.update(range(length, list.__len__(self)))
+
+    def insert(self, index, value):
+        self._own_all()
+        list.insert(self, index, value)
+
+    def pop(self, index=-1):
+        if self._owned is not True:
+            normalized_index = operator.index(index)
+            if normalized_index < 0:
+                normalized_index += list.__len__(self)
+            if normalized_index != list.__len__(self) - 1:
+                self._own_all()
+        value = self[index]
+        list.pop(self, index)
+        if self._owned is not True:
+            self._owned.discard(list.__len__(self))
+        return value
+
+    def remove(self, value):
+        self._own_all()
+        list.remove(self, value)
+
+    def sort(self, *args, **kwargs):
+        self._own_all()
+        list.sort(self, *args, **kwargs)
+
+    def reverse(self):
+        self._own_all()
+        list.reverse(self)
+
+    def clear(self):
+        list.clear(self)
+        self._owned = True
+
+    def copy(self):
+        return CopyOnWriteList(self)
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return deepcopy(list(list.__iter__(self)), memo)
+
+    def __reduce__(self):
+        return list, (list(list.__iter__(self)),)
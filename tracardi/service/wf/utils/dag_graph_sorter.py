@@ -1,30 +1,39 @@
-from collections import defaultdict
+from collections import defaultdict, deque
 
 
 class DagGraphSorter:
 
     def __init__(self, nodes):
         self.graph = defaultdict(list)
-        self.V = nodes
+        self.V = list(nodes)
 
     def add_edge(self, u, v):
         self.graph[u].append(v)
 
-    def _topological_sort(self, v, visited, stack):
-        visited[v] = True
-
-        for i in self.graph[v]:
-            if not visited[i]:
-                self._topological_sort(i, visited, stack)
+    def topological_sort(self):
+        """
+        Sorts nodes with Kahn's algorithm. Nodes that are part of a cycle can not be sorted and are
+        returned last in the order they were given.
+        """
 
-        stack.insert(0, v)
+        in_degree = {node: 0 for node in self.V}
+        for u in self.V:
+            for v in self.graph[u]:
+                in_degree[v] += 1
 
-    def topological_sort(self):
-        visited = {node: False for node in self.V}
+        queue = deque(node for node in self.V if in_degree[node] == 0)
         stack = []
 
-        for i in self.V:
-            if not visited[i]:
-                self._topological_sort(i, visited, stack)
+        while queue:
+            u = queue.popleft()
+            stack.append(u)
+            for v in self.graph[u]:
+                in_degree[v] -= 1
+                if in_degree[v] == 0:
+                    queue.append(v)
+
+        if len(stack) < len(self.V):
+            sorted_nodes = set(stack)
+            stack += [node for node in self.V if node not in sorted_nodes]
 
         return stack
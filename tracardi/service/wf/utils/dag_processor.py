@@ -1,4 +1,5 @@
-from typing import List, Union, Tuple
+from collections import defaultdict
+from typing import List, Union, Tuple, Dict
 
 from .dag_error import DagError, DagGraphError
 from ..domain.edge import Edge
@@ -21,15 +22,18 @@ class DagProcessor:
         self._edges.validate(self._nodes)
         self._last_nodes = set()
 
-    def _find_out_edges(self, node: Node) -> List[Tuple[str, Edge]]:
+        # Adjacency maps are built once, so finding edges of a node does not scan all edges.
+        self._out_edges: Dict[str, List[Tuple[str, Edge]]] = defaultdict(list)
+        self._in_edges: Dict[str, List[Tuple[str, Edge]]] = defaultdict(list)
         for _, edge in self._edges.items():  # type: str, Edge
-            if node.id == edge.source.node_id:
-                yield edge.source.param, edge
+            self._out_edges[edge.source.node_id].append((edge.source.param, edge))
+            self._in_edges[edge.target.node_id].append((edge.target.param, edge))
+
+    def _find_out_edges(self, node: Node) -> List[Tuple[str, Edge]]:
+        return self._out_edges.get(node.id, [])
 
     def _find_in_edges(self, node) -> List[Tuple[str, Edge]]:
-        for _, edge in self._edges.items():  # type: str, Edge
-            if node.id == edge.target.node_id:
-                yield edge.target.param, edge
+        return self._in_edges.get(node.id, [])
 
     def _find_node(self, node_id) -> Node:
         return self._nodes[node_id] if node_id in self._nodes else None
@@ -48,12 +52,20 @@ class DagProcessor:
                 yield node
 
     def _forward_pass(self, start_node_ids):
-        for start_node_id in start_node_ids:
-            node = self._find_node(start_node_id)  # type: Node
+        # Every node is visited once, even if it can be reached by many paths.
+        visited = set()
+        node_ids = list(start_node_ids)
+        while node_ids:
+            node_id = node_ids.pop()
+            if node_id in visited:
+                continue
+            visited.add(node_id)
+
+            node = self._find_node(node_id)  # type: Node
             if node:
 
                 # Get edges
-                edges = list(self._find_out_edges(node))
+                edges = self._find_out_edges(node)
 
                 if edges:
                     for edge_start_port, edge in edges:
@@ -61,23 +73,30 @@ class DagProcessor:
 
                             node.graph.out_edges.add(edge)
 
-                            self._forward_pass([edge.target.node_id])
+                            node_ids.append(edge.target.node_id)
                 else:
                     self._last_nodes.add(node.id)
             else:
-                self._last_nodes.add(start_node_id)
+                self._last_nodes.add(node_id)
 
         return self._last_nodes
 
     def _back_pass(self, last_node_ids):
-        for last_node_id in last_node_ids:
-            node = self._find_node(last_node_id)
+        visited = set()
+        node_ids = list(last_node_ids)
+        while node_ids:
+            node_id = node_ids.pop()
+            if node_id in visited:
+                continue
+            visited.add(node_id)
+
+            node = self._find_node(node_id)
             if node:
                 for edge_end_port, edge in self._find_in_edges(node):  # type: str, Edge
 
                     node.graph.in_edges.add(edge)
 
-                    self._back_pass([edge.source.node_id])
+                    node_ids.append(edge.source.node_id)
 
     def make_execution_dag(self, start_nodes, debug=False) -> GraphInvoker:
         self._last_nodes = set()
@@ -94,8 +113,7 @@ class DagProcessor:
         # Todo it sort all nodes except the nodes after start node
 
         # Sort graph
-        nodes = set(self._nodes.keys())
-        graph = DagGraphSorter(nodes)
+        graph = DagGraphSorter(self._nodes.keys())
         for _, edge in self._edges.items():  # type: Edge
             graph.add_edge(edge.source.node_id, edge.target.node_id)
 
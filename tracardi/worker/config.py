@@ -74,5 +74,27 @@ class ElasticSearchConfig:
         return config
 
 
+class ImportDispatcherConfig:
+
+    def __init__(self, env):
+        self.concurrency = int(env['IMPORT_CONCURRENCY']) if 'IMPORT_CONCURRENCY' in env else 10
+        self.retries = int(env['IMPORT_RETRIES']) if 'IMPORT_RETRIES' in env else 3
+        self.retry_backoff = float(env['IMPORT_RETRY_BACKOFF']) if 'IMPORT_RETRY_BACKOFF' in env else 0.5
+        self.timeout = float(env['IMPORT_TIMEOUT']) if 'IMPORT_TIMEOUT' in env else 30
+
+
+class MigrationConfig:
+
+    def __init__(self, env):
+        self.slices = int(env['MIGRATION_SLICES']) if 'MIGRATION_SLICES' in env else 4
+        self.batch_size = int(env['MIGRATION_BATCH_SIZE']) if 'MIGRATION_BATCH_SIZE' in env else 1000
+        self.chunk_size = int(env['MIGRATION_CHUNK_SIZE']) if 'MIGRATION_CHUNK_SIZE' in env else 500
+        self.progress_interval = float(
+            env['MIGRATION_PROGRESS_INTERVAL']) if 'MIGRATION_PROGRESS_INTERVAL' in env else 5
+        self.checkpoint_ttl = int(env['MIGRATION_CHECKPOINT_TTL']) if 'MIGRATION_CHECKPOINT_TTL' in env else 604800
+
+
 redis_config = RedisConfig(os.environ)
 elasticsearch_config = ElasticSearchConfig(os.environ)
+import_dispatcher_config = ImportDispatcherConfig(os.environ)
+migration_config = MigrationConfig(os.environ)
@@ -1,19 +1,81 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Optional, Tuple
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from tracardi.worker.config import import_dispatcher_config
+
+logger = logging.getLogger(__name__)
 
 
 class ImportDispatcher:
 
-    def __init__(self, credentials, importer, webhook_url: str):
+    """
+    Sends imported records to the collect endpoint. Importer yields batches of records. Records of a batch are
+    sent concurrently, at most `concurrency` at a time, over one pooled session, while the next batch is read
+    from the source. Failed requests are retried with exponential backoff. Progress is yielded per batch.
+    """
+
+    def __init__(self, credentials, importer, webhook_url: str, concurrency: int = None, retries: int = None,
+                 retry_backoff: float = None, timeout: float = None):
         self.importer = importer
         self.webhook_url = webhook_url
         self.credentials = credentials
+        self.concurrency = import_dispatcher_config.concurrency if concurrency is None else concurrency
+        self.retries = import_dispatcher_config.retries if retries is None else retries
+        self.retry_backoff = import_dispatcher_config.retry_backoff if retry_backoff is None else retry_backoff
+        self.timeout = import_dispatcher_config.timeout if timeout is None else timeout
+
+    def _get_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _post(self, session: requests.Session, url: str, data: dict) -> bool:
+        for attempt in range(self.retries + 1):
+            try:
+                response = session.post(url, json=data, verify=False, timeout=self.timeout)
+                # Client errors, except too many requests, will not pass on retry.
+                if response.status_code < 500 and response.status_code != 429:
+                    if not response.ok:
+                        logger.error(f"Record rejected by {url} with status {response.status_code}: "
+                                     f"{response.text}")
+                    return response.ok
+                error = f"status {response.status_code}"
+            except requests.RequestException as e:
+                error = str(e)
+
+            if attempt < self.retries:
+                time.sleep(self.retry_backoff * 2 ** attempt)
+            else:
+                logger.error(f"Could not send record to {url} after {attempt + 1} attempts. Reason: {error}")
+        return False
+
+    def _wait(self, futures: List[Future], progress: float, batch: int):
+        failed = sum(1 for future in futures if not future.result())
+        if failed:
+            logger.warning(f"{failed} of {len(futures)} records of batch {batch} were not imported.")
+        logger.info(f"Imported batch {batch}, progress {progress:.2f}%.")
 
     def run(self, tracardi_api_url):
         if tracardi_api_url[-1] == '/':
             tracardi_api_url = tracardi_api_url[:-1]
-        for data, progress, batch in self.importer.data(self.credentials):
-            url = f"{tracardi_api_url}{self.webhook_url}"
-            response = requests.post(url, json=data, verify=False)
-            print(url, response.json())
-            yield progress, batch
+        url = f"{tracardi_api_url}{self.webhook_url}"
+
+        pending: Optional[Tuple[List[Future], float, int]] = None
+        with self._get_session() as session, ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for records, progress, batch in self.importer.data(self.credentials):
+                futures = [executor.submit(self._post, session, url, data) for data in records]
+                if pending is not None:
+                    self._wait(*pending)
+                    yield pending[1], pending[2]
+                pending = futures, progress, batch
 
+            if pending is not None:
+                self._wait(*pending)
+                yield pending[1], pending[2]
@@ -4,6 +4,8 @@ from pydantic import BaseModel
 from ssl import create_default_context
 from tracardi.worker.domain.named_entity import NamedEntity
 
+SCROLL_TIME = "5m"
+
 
 class ElasticCredentials(BaseModel):
     url: Union[str, List[str]]
@@ -65,28 +67,40 @@ class ElasticImporter(BaseModel):
 
     def data(self, credentials: ElasticCredentials):
 
+        """
+        Reads the index with scroll, so there is no limit of `from` + `size` and every batch costs the same.
+        Yields batches of records, progress and batch number.
+        """
+
         client = Elasticsearch(**self._get_elastic_config(credentials))
+        scroll_id = None
 
-        result = client.count(body={
-            "query": {
-                "match_all": {}
-            }
-        }, index=self.index.id)
+        try:
+            result = client.count(body={
+                "query": {
+                    "match_all": {}
+                }
+            }, index=self.index.id)
 
-        number_of_records = result['count']
-        if number_of_records > 0:
-            for batch_number, start in enumerate(range(0, number_of_records, self.batch)):
-                query = {
+            number_of_records = result['count']
+            if number_of_records > 0:
+                result = client.search(body={
                     "query": {
                         "match_all": {}
                     },
-                    "from": start,
-                    "size": self.batch
-                }
-                result = client.search(body=query, index=self.index.id)
-                for record, data in enumerate(result['hits']['hits']):
-                    data = data['_source']
-                    progress = ((start + record + 1) / number_of_records) * 100
-                    yield data, progress, batch_number + 1
-
-        client.close()
+                    "sort": ["_doc"]
+                }, index=self.index.id, scroll=SCROLL_TIME, size=self.batch)
+
+                imported = 0
+                batch_number = 0
+                while result['hits']['hits']:
+                    scroll_id = result['_scroll_id']
+                    records = [data['_source'] for data in result['hits']['hits']]
+                    imported += len(records)
+                    batch_number += 1
+                    yield records, min((imported / number_of_records) * 100, 100), batch_number
+                    result = client.scroll(scroll_id=scroll_id, scroll=SCROLL_TIME)
+        finally:
+            if scroll_id is not None:
+                client.clear_scroll(scroll_id=scroll_id)
+            client.close()
@@ -0,0 +1,48 @@
+import logging
+from typing import Set
+
+import redis
+
+from tracardi.worker.config import redis_config, migration_config
+
+logger = logging.getLogger(__name__)
+
+
+class MigrationCheckpoint:
+
+    """
+    Keeps numbers of index slices that were migrated, so a failed migration is resumed from the slices
+    that did not finish. Checkpoint is kept in redis for `ttl` seconds. Migration works without it if redis
+    is not available.
+    """
+
+    def __init__(self, from_index: str, to_index: str, slices: int, client=None, ttl: int = None):
+        self.key = f"tracardi-migration-checkpoint:{from_index}:{to_index}:{slices}"
+        self.ttl = migration_config.checkpoint_ttl if ttl is None else ttl
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = redis.Redis.from_url(redis_config.get_redis_with_password())
+        return self._client
+
+    def finished_slices(self) -> Set[int]:
+        try:
+            return {int(slice_id) for slice_id in self.client.smembers(self.key)}
+        except redis.RedisError as e:
+            logger.warning(f"Could not read migration checkpoint {self.key}. Reason: {str(e)}")
+            return set()
+
+    def finish(self, slice_id: int):
+        try:
+            self.client.sadd(self.key, slice_id)
+            self.client.expire(self.key, self.ttl)
+        except redis.RedisError as e:
+            logger.warning(f"Could not save migration checkpoint {self.key}. Reason: {str(e)}")
+
+    def clear(self):
+        try:
+            self.client.delete(self.key)
+        except redis.RedisError as e:
+            logger.warning(f"Could not remove migration checkpoint {self.key}. Reason: {str(e)}")
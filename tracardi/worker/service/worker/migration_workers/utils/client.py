@@ -1,8 +1,8 @@
-from elasticsearch import Elasticsearch
+from elasticsearch import Elasticsearch, helpers
 
 from tracardi.worker.config import elasticsearch_config
 from tracardi.worker.domain.storage_record import StorageRecords, StorageRecord, RecordMetadata
-from typing import Optional
+from typing import Optional, Iterator, List, Tuple
 from elasticsearch.exceptions import NotFoundError
 
 
@@ -33,8 +33,26 @@ class ElasticClient:
         )
         return StorageRecords.build_from_elastic(result)
 
-    def upsert(self, index: str, record: StorageRecord, script: str) -> dict:
-        return self._client.update(index, record.get_meta_data().id, body={
+    def scroll_slice(self, index: str, slice_id: int, slices: int, size: int,
+                     scroll: str = "5m") -> Iterator[StorageRecords]:
+        body = {"query": {"match_all": {}}, "sort": ["_doc"]}
+        if slices > 1:
+            body["slice"] = {"id": slice_id, "max": slices}
+
+        result = self._client.search(body=body, index=index, scroll=scroll, size=size)
+        scroll_id = result.get('_scroll_id', None)
+        try:
+            while result['hits']['hits']:
+                yield StorageRecords.build_from_elastic(result)
+                result = self._client.scroll(scroll_id=scroll_id, scroll=scroll)
+                scroll_id = result.get('_scroll_id', scroll_id)
+        finally:
+            if scroll_id is not None:
+                self._client.clear_scroll(scroll_id=scroll_id)
+
+    @staticmethod
+    def _get_upsert_body(record: StorageRecord, script: str) -> dict:
+        return {
             "scripted_upsert": True,
             "script": {
                 "source": f"ctx._source = params.document;\n{script}",
@@ -43,7 +61,24 @@ class ElasticClient:
                 }
             },
             "upsert": {}
-        })
+        }
+
+    def bulk_upsert(self, index: str, records: List[StorageRecord], script: str,
+                    chunk_size: int = 500) -> Tuple[int, list]:
+        """
+        Upserts records the same way as `upsert` in bulk requests of `chunk_size` records.
+        Returns number of upserted records and errors.
+        """
+        actions = ({
+            "_op_type": "update",
+            "_index": index,
+            "_id": record.get_meta_data().id,
+            **self._get_upsert_body(record, script)
+        } for record in records)
+        return helpers.bulk(self._client, actions, chunk_size=chunk_size, raise_on_error=False)
+
+    def upsert(self, index: str, record: StorageRecord, script: str) -> dict:
+        return self._client.update(index, record.get_meta_data().id, body=self._get_upsert_body(record, script))
 
     def load(self, index: str, id: str) -> Optional[StorageRecord]:
         try:
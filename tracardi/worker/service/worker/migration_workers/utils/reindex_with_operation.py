@@ -1,10 +1,95 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from threading import Lock
+from typing import Callable, List
+
+from tracardi.worker.config import migration_config
 from tracardi.worker.domain.migration_schema import MigrationSchema
+from tracardi.worker.domain.storage_record import StorageRecord, StorageRecords
 from tracardi.worker.misc.update_progress import update_progress
 from tracardi.worker.misc.add_task import add_task
+from tracardi.worker.service.worker.migration_workers.utils.checkpoint import MigrationCheckpoint
 from tracardi.worker.service.worker.migration_workers.utils.migration_error import MigrationError
 import functools
 from .client import ElasticClient
 
+logger = logging.getLogger(__name__)
+
+
+class BulkReindex:
+
+    """
+    Copies index with parallel readers, one sliced scroll per slice. Every batch of `batch_size` records is
+    transformed and upserted with bulk requests of `chunk_size` records. Progress is reported every
+    `progress_interval` seconds. Slice is saved in checkpoint when all its records are moved, so the next run
+    of a failed migration moves only slices that did not finish.
+    """
+
+    def __init__(self,
+                 client: ElasticClient,
+                 schema: MigrationSchema,
+                 transform: Callable[[StorageRecords], List[StorageRecord]],
+                 checkpoint: MigrationCheckpoint = None,
+                 slices: int = None,
+                 batch_size: int = None,
+                 chunk_size: int = None,
+                 progress_interval: float = None):
+        self.client = client
+        self.from_index = schema.copy_index.from_index
+        self.to_index = schema.copy_index.to_index
+        self.script = schema.copy_index.script or ""
+        self.transform = transform
+        self.slices = max(1, migration_config.slices if slices is None else slices)
+        self.batch_size = migration_config.batch_size if batch_size is None else batch_size
+        self.chunk_size = migration_config.chunk_size if chunk_size is None else chunk_size
+        self.progress_interval = migration_config.progress_interval if progress_interval is None \
+            else progress_interval
+        self.checkpoint = MigrationCheckpoint(self.from_index, self.to_index, self.slices) if checkpoint is None \
+            else checkpoint
+        self.moved_records = 0
+        self._lock = Lock()
+
+    def _move_slice(self, slice_id: int):
+        for records in self.client.scroll_slice(self.from_index, slice_id, self.slices, self.batch_size):
+            records = self.transform(records)
+            _, errors = self.client.bulk_upsert(self.to_index, records, self.script, self.chunk_size)
+            if errors:
+                raise MigrationError(f"{len(errors)} of {len(records)} records of slice {slice_id} could not "
+                                     f"be moved. First error: {errors[0]}")
+            with self._lock:
+                self.moved_records += len(records)
+
+        self.checkpoint.finish(slice_id)
+
+    def run(self, celery_job):
+        doc_count = self.client.count(self.from_index)
+        finished_slices = self.checkpoint.finished_slices()
+        slices = [slice_id for slice_id in range(self.slices) if slice_id not in finished_slices]
+
+        if finished_slices:
+            logger.info(f"Resuming migration of {self.from_index}. Slices {sorted(finished_slices)} are "
+                        f"already moved.")
+            # Slices are of similar size. Exact number of moved records is not known.
+            self.moved_records = int(doc_count * len(finished_slices) / self.slices)
+
+        update_progress(celery_job, self.moved_records, doc_count)
+
+        if slices:
+            with ThreadPoolExecutor(max_workers=len(slices)) as executor:
+                futures = [executor.submit(self._move_slice, slice_id) for slice_id in slices]
+                not_done = futures
+                while not_done:
+                    _, not_done = wait(not_done, timeout=self.progress_interval)
+                    update_progress(celery_job, min(self.moved_records, doc_count), doc_count)
+
+            errors = [future.exception() for future in futures if future.exception() is not None]
+            if errors:
+                raise MigrationError(f"{len(errors)} of {len(slices)} slices of index {self.from_index} could "
+                                     f"not be moved and will be moved on the next run. Reason: {str(errors[0])}")
+
+        self.checkpoint.clear()
+        update_progress(celery_job, doc_count, doc_count)
+
 
 def reindex_with_operation(func):
     @functools.wraps(func)
@@ -17,36 +102,18 @@ def reindex_with_operation(func):
             schema.dict()
         )
 
-        def transform_func(data):
-            return func(celery_job, schema, url, task_index, data)
+        def transform_func(records: StorageRecords) -> List[StorageRecord]:
+            transformed_records = []
+            for record in records:
+                transformed_record = func(celery_job, schema, url, task_index, record)
+                if not isinstance(transformed_record, StorageRecord):
+                    transformed_record = StorageRecord(transformed_record)
+                transformed_records.append(transformed_record.set_meta_data(record.get_meta_data()))
+            return transformed_records
 
         try:
             with ElasticClient(hosts=[url]) as client:
-                update_progress(celery_job, 0, doc_count := client.count(schema.copy_index.from_index))
-                pagesize = 10
-                moved_records = 0
-
-                if schema.copy_index.script is None:
-                    schema.copy_index.script = ""
-
-                while records_to_move := client.load_records(
-                        index=schema.copy_index.from_index,
-                        start=moved_records,
-                        size=pagesize
-                ):
-
-                    records_to_move.transform_hits(transform_func)
-
-                    for number, record in enumerate(records_to_move):
-                        client.upsert(
-                            index=schema.copy_index.to_index,
-                            record=record,
-                            script=schema.copy_index.script
-                        )
-
-                        update_progress(celery_job, moved_records + number + 1, doc_count)
-
-                    moved_records += pagesize
+                BulkReindex(client, schema, transform_func).run(celery_job)
 
         except Exception as e:
             raise MigrationError(f"Index {schema.copy_index.from_index} could not be moved due to an error: {str(e)}")
@@ -1,11 +1,13 @@
-import json
 from datetime import datetime
+from typing import Iterator, List
 
 import mysql.connector
 from pydantic import BaseModel
 
 from tracardi.worker.domain.named_entity import NamedEntity
 
+_json_types = (str, int, float, bool, type(None))
+
 
 class MysqlConnectionConfig(BaseModel):
     user: str
@@ -27,12 +29,27 @@ class MySQLQueryImporter(BaseModel):
         else:
             return f"<<non-serializable: {type(value).__qualname__}>>"
 
+    def _to_json_data(self, data: dict) -> dict:
+        return {key: value if isinstance(value, _json_types) else self._default_none_serializable_data(value)
+                for key, value in data.items()}
+
     def count(self, cursor):
         sql = f"SELECT COUNT(1) as `count` FROM ({self.query}) AS tracardi_import_temporary_table"
         cursor.execute(sql)
         return int(cursor.fetchone()['count'])
 
+    def _read(self, cursor) -> Iterator[List[dict]]:
+        # Query is run once and read batch by batch.
+        cursor.execute(self.query)
+        rows = cursor.fetchmany(self.batch)
+        while rows:
+            yield rows
+            rows = cursor.fetchmany(self.batch)
+
     def data(self, credentials: MysqlConnectionConfig):
+        """
+        Yields batches of records, progress and batch number.
+        """
         connection = mysql.connector.connect(
             host=credentials.host,
             user=credentials.user,
@@ -41,15 +58,14 @@ class MySQLQueryImporter(BaseModel):
             database=self.database_name.id
         )
         cursor = connection.cursor(dictionary=True)
-        number_of_records = self.count(cursor)
-        if number_of_records > 0:
-            for batch_number, start in enumerate(range(0, number_of_records, self.batch)):
-                sql = f"{self.query} LIMIT {start}, {self.batch}"
-                cursor.execute(sql)
-                for record, data in enumerate(cursor):
-                    json_payload = json.dumps(data, default=self._default_none_serializable_data)
-                    data = json.loads(json_payload)
-                    progress = ((start + record + 1) / number_of_records) * 100
-                    yield data, progress, batch_number + 1
-        cursor.close()
-        connection.close()
+        try:
+            number_of_records = self.count(cursor)
+            if number_of_records > 0:
+                imported = 0
+                for batch_number, rows in enumerate(self._read(cursor)):
+                    imported += len(rows)
+                    yield [self._to_json_data(data) for data in rows], \
+                        min((imported / number_of_records) * 100, 100), batch_number + 1
+        finally:
+            cursor.close()
+            connection.close()
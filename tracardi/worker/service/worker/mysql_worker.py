@@ -1,11 +1,13 @@
-import json
 from datetime import datetime
+from typing import Iterator, List
 
 import mysql.connector
 from pydantic import BaseModel
 
 from tracardi.worker.domain.named_entity import NamedEntity
 
+_json_types = (str, int, float, bool, type(None))
+
 
 class MysqlConnectionConfig(BaseModel):
     user: str
@@ -27,12 +29,48 @@ class MySQLImporter(BaseModel):
         else:
             return f"<<non-serializable: {type(value).__qualname__}>>"
 
+    def _to_json_data(self, data: dict) -> dict:
+        return {key: value if isinstance(value, _json_types) else self._default_none_serializable_data(value)
+                for key, value in data.items()}
+
+    def _get_table(self) -> str:
+        return f"{self.database_name.id}.{self.table_name.id}"
+
     def count(self, cursor):
-        sql = f"SELECT COUNT(1) as `count` FROM {self.database_name.id}.{self.table_name.id}"
+        sql = f"SELECT COUNT(1) as `count` FROM {self._get_table()}"
         cursor.execute(sql)
         return int(cursor.fetchone()['count'])
 
+    def _get_primary_key(self, cursor) -> List[str]:
+        cursor.execute(f"SHOW KEYS FROM {self._get_table()} WHERE Key_name = 'PRIMARY'")
+        return [row['Column_name'] for row in sorted(cursor.fetchall(), key=lambda row: row['Seq_in_index'])]
+
+    def _read_by_key(self, cursor, key: List[str]) -> Iterator[List[dict]]:
+        # Keyset pagination: every batch starts after the last key of the previous batch.
+        columns = ", ".join(f"`{column}`" for column in key)
+        placeholders = ", ".join(["%s"] * len(key))
+
+        cursor.execute(f"SELECT * FROM {self._get_table()} ORDER BY {columns} LIMIT %s", (self.batch,))
+        rows = cursor.fetchall()
+        while rows:
+            yield rows
+            last_key = tuple(rows[-1][column] for column in key)
+            cursor.execute(f"SELECT * FROM {self._get_table()} WHERE ({columns}) > ({placeholders}) "
+                           f"ORDER BY {columns} LIMIT %s", (*last_key, self.batch))
+            rows = cursor.fetchall()
+
+    def _read(self, cursor) -> Iterator[List[dict]]:
+        # Tables without primary key are read with one query, batch by batch.
+        cursor.execute(f"SELECT * FROM {self._get_table()}")
+        rows = cursor.fetchmany(self.batch)
+        while rows:
+            yield rows
+            rows = cursor.fetchmany(self.batch)
+
     def data(self, credentials: MysqlConnectionConfig):
+        """
+        Yields batches of records, progress and batch number.
+        """
         connection = mysql.connector.connect(
             host=credentials.host,
             user=credentials.user,
@@ -40,15 +78,15 @@ class MySQLImporter(BaseModel):
             port=credentials.port
         )
         cursor = connection.cursor(dictionary=True)
-        number_of_records = self.count(cursor)
-        if number_of_records > 0:
-            for batch_number, start in enumerate(range(0, number_of_records, self.batch)):
-                sql = f"SELECT * FROM {self.database_name.id}.{self.table_name.id} LIMIT {start}, {self.batch}"
-                cursor.execute(sql)
-                for record, data in enumerate(cursor):
-                    json_payload = json.dumps(data, default=self._default_none_serializable_data)
-                    data = json.loads(json_payload)
-                    progress = ((start + record + 1) / number_of_records) * 100
-                    yield data, progress, batch_number + 1
-        cursor.close()
-        connection.close()
+        try:
+            number_of_records = self.count(cursor)
+            if number_of_records > 0:
+                key = self._get_primary_key(cursor)
+                imported = 0
+                for batch_number, rows in enumerate(self._read_by_key(cursor, key) if key else self._read(cursor)):
+                    imported += len(rows)
+                    yield [self._to_json_data(data) for data in rows], \
+                        min((imported / number_of_records) * 100, 100), batch_number + 1
+        finally:
+            cursor.close()
+            connection.close()